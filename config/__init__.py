@@ -1,3 +1,12 @@
-import config.settings as settings
+"""
+config.settings initialises on first use of `logger`, `ENV_CONFIG` or `getCustomLogger`,
+importing the package has no side effects (no data folders, .env, yaml or log files)
+"""
 
-settings.__init__()  # Start the programs initialisation sequence
+
+def __getattr__(name: str):
+    if name == "settings":  # `import config` then `config.settings`
+        import config.settings as settings
+
+        return settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
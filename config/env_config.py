@@ -0,0 +1,245 @@
+import ast
+import types
+from typing import Any, Callable, Literal, Union, get_args, get_origin, get_type_hints
+
+TRUE_STRINGS = {"true", "1", "yes", "on"}
+FALSE_STRINGS = {"false", "0", "no", "off"}
+NONE_STRINGS = {"", "none", "null"}
+
+
+class EnvConfig:
+    """EnvConfig
+    Immutable .env config, the schema fields are slots (ENV_CONFIG.LOGGING_LEVEL)
+    and any other variable is kept in a read only mapping.
+    Also supports the dict style reads of the previous ENV_CONFIG dict (ENV_CONFIG["LOGGING_LEVEL"], get, items),
+    served by a private dict of every variable so they cost a dict lookup as before
+    """
+
+    __slots__ = ("_extra", "_values", "defaults_used")
+    _fields: tuple[str, ...] = ()
+
+    def __init__(self, values: dict, extra: dict, defaults_used: tuple[str, ...] = ()):
+        for name in self._fields:
+            object.__setattr__(self, name, values[name])
+        object.__setattr__(self, "_extra", types.MappingProxyType(extra))
+        # Every variable for the dict style reads, never changed after __init__
+        object.__setattr__(
+            self, "_values", {**{name: values[name] for name in self._fields}, **extra}
+        )
+        # Fields missing from the .env that were set from the defaults
+        object.__setattr__(self, "defaults_used", defaults_used)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(
+            f"{type(self).__name__} is read only, '{name}' can not be set"
+        )
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(
+            f"{type(self).__name__} is read only, '{name}' can not be deleted"
+        )
+
+    def __getattr__(self, name: str):  # Only called for names that are not slots
+        try:
+            return object.__getattribute__(self, "_extra")[name]
+        except KeyError:
+            raise AttributeError(
+                f"{type(self).__name__} has no variable '{name}'"
+            ) from None
+
+    def __getitem__(self, name: str):
+        return self._values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def __iter__(self):
+        yield from self._fields
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self._fields) + len(self._extra)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())})"
+
+    def get(self, name: str, default=None):
+        return self._values.get(name, default)
+
+    def keys(self) -> list[str]:
+        return list(self)
+
+    def values(self) -> list:
+        return [getattr(self, name) for name in self]
+
+    def items(self) -> list[tuple[str, Any]]:
+        return [(name, getattr(self, name)) for name in self]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+
+def __literal_eval(value):
+    if isinstance(value, str):
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return value
+    return value
+
+
+def __build_converter(type_hint) -> Callable[[Any], Any]:
+    """__build_converter
+    Converter for one schema type, raises ValueError with the reason if the value does not fit
+
+    Args:
+        type_hint: Type of the schema field (str, int, float, bool, list, dict, Literal[...], X | None)
+
+    Returns:
+        Callable[[Any], Any]: Converts a raw .env value (or an already typed value)
+    """
+    origin = get_origin(type_hint)
+    type_args = get_args(type_hint)
+
+    if origin in (Union, types.UnionType):
+        converters = [
+            __build_converter(arg) for arg in type_args if arg is not type(None)
+        ]
+        optional = type(None) in type_args
+
+        def convert_union(value):
+            if optional and (
+                value is None
+                or (isinstance(value, str) and value.strip().lower() in NONE_STRINGS)
+            ):
+                return None
+            reasons = []
+            for converter in converters:
+                try:
+                    return converter(value)
+                except ValueError as e:
+                    reasons.append(str(e))
+            raise ValueError(" or ".join(reasons))
+
+        return convert_union
+
+    if origin is Literal:
+        allowed = type_args
+
+        def convert_literal(value):
+            if value in allowed:
+                return value
+            evaluated = __literal_eval(value)
+            if evaluated in allowed:
+                return evaluated
+            raise ValueError(f"{value!r} is not one of {list(allowed)}")
+
+        return convert_literal
+
+    if type_hint is bool:
+
+        def convert_bool(value):
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in TRUE_STRINGS:
+                return True
+            if text in FALSE_STRINGS:
+                return False
+            raise ValueError(f"{value!r} is not a valid bool")
+
+        return convert_bool
+
+    if type_hint in (int, float):
+
+        def convert_number(value):
+            if isinstance(value, bool):
+                raise ValueError(f"{value!r} is not a valid {type_hint.__name__}")
+            try:
+                return type_hint(value)
+            except (TypeError, ValueError):
+                raise ValueError(
+                    f"{value!r} is not a valid {type_hint.__name__}"
+                ) from None
+
+        return convert_number
+
+    if type_hint is str:
+
+        def convert_str(value):
+            if value is None:
+                raise ValueError("None is not a str")
+            return str(value)
+
+        return convert_str
+
+    expected_type = origin or type_hint
+
+    # list / dict / tuple / set written as python literals
+    def convert_evaluated(value):
+        evaluated = __literal_eval(value)
+        if not isinstance(evaluated, expected_type):
+            raise ValueError(f"{value!r} is not a valid {expected_type.__name__}")
+        return evaluated
+
+    return convert_evaluated
+
+
+def compile_env_schema(
+    schema: type, defaults: dict | None = None
+) -> Callable[[dict], EnvConfig]:
+    """compile_env_schema
+    Compiles a TypedDict schema once into a validator for the whole .env.
+    Every field gets a converter for its type and the config class gets a slot per field.
+
+    Args:
+        schema (type): TypedDict of the .env variables, required keys must be in the .env or defaults
+        defaults (dict | None, optional): Values of fields missing from the .env. Defaults to None.
+
+    Returns:
+        Callable[[dict], EnvConfig]: validate(raw_values) -> EnvConfig, raises one Exception listing every invalid variable
+    """
+    defaults = dict(defaults or {})
+    type_hints = get_type_hints(schema)
+    required_keys = getattr(schema, "__required_keys__", frozenset())
+    fields = tuple(type_hints)
+    field_converters = tuple(
+        (name, __build_converter(type_hints[name]), name in required_keys)
+        for name in fields
+    )
+    config_class = type(
+        schema.__name__.removesuffix("Type"),
+        (EnvConfig,),
+        {"__slots__": fields, "_fields": fields},
+    )
+
+    def validate(raw_values: dict) -> EnvConfig:
+        values = {}
+        errors = []
+        defaults_used = []
+        for name, converter, required in field_converters:
+            value = raw_values.get(name)
+            if value is None:
+                if name in defaults:
+                    values[name] = defaults[name]
+                    defaults_used.append(name)
+                elif required:
+                    errors.append(f"{name}: is required and has no default")
+                else:
+                    values[name] = None
+                continue
+            try:
+                values[name] = converter(value)
+            except ValueError as e:
+                errors.append(f"{name}: {e}")
+        if errors:
+            raise Exception(
+                f"Invalid .env, {len(errors)} variable(s) do not match {schema.__name__}:\n  - "
+                + "\n  - ".join(errors)
+            )
+        extra = {
+            name: value for name, value in raw_values.items() if name not in values
+        }
+        return config_class(values, extra, tuple(defaults_used))
+
+    return validate
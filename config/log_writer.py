@@ -0,0 +1,13 @@
+"""
+Log writer process for multi-process deployments
+The workers (LOGGING_MULTIPROCESS=worker) send their records here, this process owns rotation and retention
+python -m config.log_writer  or  config.settings.start_log_writer()
+"""
+
+import os
+
+from config.settings import run_log_writer
+
+if __name__ == "__main__":
+    os.environ.setdefault("LOGGING_MULTIPROCESS", "writer")
+    run_log_writer()
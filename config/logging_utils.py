@@ -1,21 +1,492 @@
 import os
+import re
+import abc
+import copy
+import gzip
+import json
+import mmap
 import time
+import queue
+import random
+import struct
+import marshal
+import pickle
 import logging
 import logging.handlers
-from typing import Literal
+import weakref
+import threading
+import socketserver
+from collections import OrderedDict, deque
+from operator import attrgetter
+from typing import Iterator, Literal
 from enum import Enum
 
+try:
+    from compression import zstd  # Python 3.14+ standard library
+except ImportError:
+    zstd = None
+
+try:  # Fastest JSON encoder available, checked once at import
+    import orjson
+
+    JSON_ENCODER_NAME = "orjson"
+
+    def json_encode(data: dict) -> str:
+        return orjson.dumps(data, default=str).decode("utf8")
+
+except ImportError:
+    try:
+        import ujson
+
+        JSON_ENCODER_NAME = "ujson"
+
+        def json_encode(data: dict) -> str:
+            return ujson.dumps(data, ensure_ascii=False, default=str)
+
+    except ImportError:
+        JSON_ENCODER_NAME = "json"
+        json_encode = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=str
+        ).encode
+
+ARCHIVE_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+ONE_DAY = 60 * 60 * 24  # (Seconds) Interval of 'when: midnight'
+
+### Binary log format, see BinaryPrefixedTimedRotatingFileHandler
+BINARY_LOG_MAGIC = b"PYLOGBIN1\n"
+BINARY_STRING, BINARY_RECORD, BINARY_RESET = 0, 1, 2
+BINARY_ENTRY = struct.Struct("<BI")  # kind, payload length
+BINARY_STRING_ID = struct.Struct("<I")
+# created, levelno, name / module / filename / funcName ids, lineno, message template id
+BINARY_RECORD_HEADER = struct.Struct("<dBIIIIII")
+BINARY_RESET_ENTRY = BINARY_ENTRY.pack(BINARY_RESET, 0)
+MARSHAL_TYPES = (str, int, float, bool, bytes, type(None))
+ARCHIVE_INDEX_EXTENSION = ".idx"
+
+
+def resolve_compression(compression: str | None) -> str | None:
+    """resolve_compression
+    zstd falls back to gzip when the standard library does not provide it
+
+    Args:
+        compression (str | None): "gzip" / "zstd" / None
+
+    Returns:
+        str | None: Compression that will be used
+    """
+    if compression is None:
+        return None
+    compression = compression.lower()
+    if compression not in ARCHIVE_EXTENSIONS:
+        raise Exception(f"Unknown log compression '{compression}'")
+    if compression == "zstd" and zstd is None:
+        return "gzip"
+    return compression
+
+
+def strip_archive_suffix(file_name: str) -> str:
+    """strip_archive_suffix
+    "<yyyy-mm-dd>.debug.log.gz.idx" -> "<yyyy-mm-dd>.debug.log"
+    """
+    for extension in (ARCHIVE_INDEX_EXTENSION, ".tmp"):
+        if file_name.endswith(extension):
+            file_name = file_name[: -len(extension)]
+    for extension in ARCHIVE_EXTENSIONS.values():
+        if file_name.endswith(extension):
+            return file_name[: -len(extension)]
+    return file_name
+
+
+class LogArchiver:
+    """LogArchiver
+    Compresses finished log files on a background thread so the logging thread never waits on it.
+    Each block of lines is compressed as its own gzip member / zstd frame (concatenated they are a
+    normal .gz / .zst file), and a '<archive>.idx' sidecar stores the byte offsets and time range
+    of every block so readers can seek to a time without decompressing the whole file.
+    """
+
+    BLOCK_SIZE = 1024 * 1024  # (Bytes) Uncompressed size of each block
+    TIMESTAMP_LENGTH = 19  # "%Y-%m-%d %H:%M:%S" at the start of the text formats
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, path: str, compression: str) -> None:
+        """submit
+        Queue a closed log file to be compressed and removed
+        """
+        with self._lock:
+            if path in self._pending:
+                return
+            self._pending.add(path)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._worker, name="log_archiver", daemon=True
+                )
+                self._thread.start()
+        self.queue.put((path, compression))
+
+    def join(self, timeout: float | None = None) -> bool:
+        """join
+        Wait for the queued files to be compressed
+
+        Returns:
+            bool: True if everything was compressed before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def remove(self, path: str) -> bool:
+        """remove
+        Removes a log file for retention unless it is queued / being compressed,
+        the check and the removal hold the lock of submit so the two never overlap
+
+        Returns:
+            bool: False if the file is being archived (its archive is removed on a later rollover)
+        """
+        with self._lock:
+            if path in self._pending:
+                return False
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Already replaced by its archive
+            return True
+
+    def _worker(self) -> None:
+        while True:
+            path, compression = self.queue.get()
+            try:
+                self.compress(path, compression)
+            except FileNotFoundError:
+                pass  # Removed by retention before it was compressed
+            except Exception as e:
+                print(f"[logging][LogArchiver] Failed to compress {path}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(path)
+                self.queue.task_done()
+
+    def compress(self, path: str, compression: str) -> str:
+        """compress
+        Compress a log file block by block, write its index then remove the original file
+
+        Args:
+            path (str): Finished log file
+            compression (str): "gzip" / "zstd"
+
+        Returns:
+            str: Path of the archive
+        """
+        compression = resolve_compression(compression)
+        compress = (
+            zstd.compress if compression == "zstd" else gzip.compress
+        )  # Each call is a complete gzip member / zstd frame
+        archive_path = path + ARCHIVE_EXTENSIONS[compression]
+        blocks = []
+        offset = raw_offset = 0
+        with open(path, "rb") as source, open(archive_path + ".tmp", "wb") as target:
+            lines, start, end = [], None, None
+            for line in source:
+                lines.append(line)
+                timestamp = self._get_timestamp(line)
+                if timestamp is not None:
+                    start = start or timestamp
+                    end = timestamp
+                if source.tell() - raw_offset >= self.BLOCK_SIZE:
+                    offset, raw_offset = self._write_block(
+                        target, compress, lines, start, end, offset, raw_offset, blocks
+                    )
+                    lines, start, end = [], None, None
+            if lines:
+                self._write_block(
+                    target, compress, lines, start, end, offset, raw_offset, blocks
+                )
+
+        with open(archive_path + ARCHIVE_INDEX_EXTENSION + ".tmp", "w") as index_file:
+            json.dump({"compression": compression, "blocks": blocks}, index_file)
+        os.replace(archive_path + ".tmp", archive_path)
+        os.replace(
+            archive_path + ARCHIVE_INDEX_EXTENSION + ".tmp",
+            archive_path + ARCHIVE_INDEX_EXTENSION,
+        )
+        os.remove(path)
+        log_retention.replace(
+            path, [archive_path, archive_path + ARCHIVE_INDEX_EXTENSION]
+        )
+        return archive_path
+
+    def _get_timestamp(self, line: bytes) -> str | None:
+        timestamp = line[: self.TIMESTAMP_LENGTH]
+        if len(timestamp) == self.TIMESTAMP_LENGTH and timestamp[:2].isdigit():
+            return timestamp.decode("ascii", "replace")
+        return None  # e.g. traceback lines
+
+    def _write_block(
+        self, target, compress, lines, start, end, offset, raw_offset, blocks
+    ) -> tuple[int, int]:
+        raw = b"".join(lines)
+        data = compress(raw)
+        target.write(data)
+        blocks.append(
+            {
+                "offset": offset,
+                "length": len(data),
+                "raw_offset": raw_offset,
+                "raw_length": len(raw),
+                "lines": len(lines),
+                "start": start,
+                "end": end,
+            }
+        )
+        return offset + len(data), raw_offset + len(raw)
+
+
+log_archiver = LogArchiver()  # One background worker shared by every handler
+
+
+class LogRetentionManager:
+    """LogRetentionManager
+    Process wide manifest of the log directories shared by every PrefixedTimedRotatingFileHandler.
+    A directory is scanned once (single os.scandir pass) per rollover prefix instead of once per handler,
+    each handler then looks up its own '<LOG_TYPE>.log' files in O(1).
+    Files removed / archived / created by the handlers are kept up to date in the manifest.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # directory -> (prefix the scan was done for, {"<LOG_TYPE>.log": {"<prefix>.<LOG_TYPE>.log": [paths]}})
+        self._manifests: dict[str, tuple[str, dict[str, dict[str, list[str]]]]] = {}
+
+    @staticmethod
+    def _split(file_name: str) -> tuple[str, str] | None:
+        """_split
+        "<yyyy-mm-dd>.debug.log.gz" -> ("debug.log", "<yyyy-mm-dd>.debug.log")
+        """
+        log_name = strip_archive_suffix(file_name)
+        parts = log_name.split(".", 1)
+        if len(parts) != 2 or "." not in parts[1]:
+            return None
+        return parts[1], log_name
+
+    def _scan(self, directory: str) -> dict[str, dict[str, list[str]]]:
+        manifest = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                split = self._split(entry.name)
+                if split is None:
+                    continue
+                log_base, log_name = split
+                manifest.setdefault(log_base, {}).setdefault(log_name, []).append(
+                    os.path.join(directory, entry.name)
+                )
+        return manifest
+
+    def get_rotated_files(
+        self, directory: str, prefix: str, log_base: str
+    ) -> dict[str, list[str]]:
+        """get_rotated_files
+        Files of one log type, the directory is only scanned when no handler has scanned it for this prefix
+
+        Args:
+            directory (str): Log directory
+            prefix (str): Current rollover prefix of the handler e.g. <yyyy-mm-dd>
+            log_base (str): "<LOG_TYPE>.log"
+
+        Returns:
+            dict[str, list[str]]: "<prefix>.<LOG_TYPE>.log" to the paths of that period (log / archive / index)
+        """
+        with self._lock:
+            manifest = self._manifests.get(directory)
+            if manifest is None or manifest[0] != prefix:
+                manifest = (prefix, self._scan(directory))
+                self._manifests[directory] = manifest
+            return {
+                log_name: list(paths)
+                for log_name, paths in manifest[1].get(log_base, {}).items()
+            }
+
+    def add(self, path: str) -> None:
+        """add
+        Record a file created after the directory was scanned
+        """
+        directory, file_name = os.path.split(path)
+        split = self._split(file_name)
+        with self._lock:
+            if directory not in self._manifests or split is None:
+                return
+            paths = (
+                self._manifests[directory][1]
+                .setdefault(split[0], {})
+                .setdefault(split[1], [])
+            )
+            if path not in paths:
+                paths.append(path)
+
+    def discard(self, path: str) -> None:
+        """discard
+        Record a file removed after the directory was scanned
+        """
+        directory, file_name = os.path.split(path)
+        split = self._split(file_name)
+        with self._lock:
+            if directory not in self._manifests or split is None:
+                return
+            log_names = self._manifests[directory][1].get(split[0], {})
+            paths = log_names.get(split[1], [])
+            if path in paths:
+                paths.remove(path)
+            if not paths:
+                log_names.pop(split[1], None)
+
+    def replace(self, path: str, new_paths: list[str]) -> None:
+        """replace
+        Record a log file replaced by its archive files
+        """
+        self.discard(path)
+        for new_path in new_paths:
+            self.add(new_path)
+
+
+log_retention = LogRetentionManager()  # Shared by every handler in the process
+
+
+def iter_archived_lines(
+    archive_path: str, start: str | None = None, end: str | None = None
+) -> Iterator[str]:
+    """iter_archived_lines
+    Lines of a compressed log, only decompressing the blocks that overlap start - end
+
+    Args:
+        archive_path (str): '.gz' / '.zst' archive written by LogArchiver
+        start (str | None, optional): "%Y-%m-%d %H:%M:%S" or a prefix of it. Defaults to None.
+        end (str | None, optional): "%Y-%m-%d %H:%M:%S" or a prefix of it. Defaults to None.
+
+    Yields:
+        Iterator[str]: Decoded lines (with line endings)
+    """
+    index_path = archive_path + ARCHIVE_INDEX_EXTENSION
+    if not os.path.exists(index_path):  # Fall back to reading everything
+        if archive_path.endswith(ARCHIVE_EXTENSIONS["zstd"]):
+            opener = zstd.open
+        else:
+            opener = gzip.open
+        with opener(archive_path, "rt", encoding="utf8", errors="replace") as f:
+            yield from f
+        return
+
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    decompress = zstd.decompress if index["compression"] == "zstd" else gzip.decompress
+    with open(archive_path, "rb") as archive:
+        for block in index["blocks"]:
+            if (
+                end is not None
+                and block["start"] is not None
+                and block["start"][: len(end)] > end
+            ):
+                break
+            if (
+                start is not None
+                and block["end"] is not None
+                and block["end"][: len(start)] < start
+            ):
+                continue
+            archive.seek(block["offset"])
+            raw = decompress(archive.read(block["length"]))
+            yield from raw.decode("utf8", "replace").splitlines(keepends=True)
+
+
+class IntervalFlusher:
+    """IntervalFlusher
+    Background thread writing the buffers of the handlers with a flush_interval,
+    so a logger that goes quiet still has its last records written within flush_interval.
+    Also writes the pending summaries of the KeyedLogFilters every summary_interval.
+    Handlers / filters are held weakly and unregister on close.
+    """
+
+    MIN_WAIT = 0.05  # (Seconds) Shortest sleep between two checks
+
+    def __init__(self):
+        self._handlers = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def register(
+        self, handler: "PrefixedTimedRotatingFileHandler | KeyedLogFilter"
+    ) -> None:
+        with self._lock:
+            self._handlers.add(handler)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._worker, name="log_interval_flusher", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()  # A shorter interval than the current sleep
+
+    def unregister(
+        self, handler: "PrefixedTimedRotatingFileHandler | KeyedLogFilter"
+    ) -> None:
+        with self._lock:
+            self._handlers.discard(handler)
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                handlers = list(self._handlers)
+            now = time.time()
+            wait = None
+            for handler in handlers:
+                due = handler._last_flush + handler.flush_interval
+                if handler._buffer and now >= due:
+                    try:
+                        handler.flush()
+                    except Exception as e:
+                        print(
+                            f"[logging][IntervalFlusher] Failed to flush {getattr(handler, 'baseFilename', handler)}: {e}"
+                        )
+                    due = now + handler.flush_interval
+                elif now >= due:
+                    due = now + handler.flush_interval  # Empty, checked again later
+                wait = due - now if wait is None else min(wait, due - now)
+            del handlers
+            self._wakeup.wait(None if wait is None else max(wait, self.MIN_WAIT))
+            self._wakeup.clear()
+
+
+interval_flusher = IntervalFlusher()  # One thread shared by every buffered handler
+
 
 class PrefixedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
     """PrefixedTimedRotatingFileHandler
     This version of file handler will append the date before the .log file extension.
     The Default TimedRotatingFileHandler will append the date at the end on the file name.
+    The prefix follows the 'when' suffix format e.g. <yyyy-mm-dd> for midnight, <yyyy-mm-dd_HH> for h.
+
+    Writes are buffered when any of buffer_size / buffer_records / flush_interval is set,
+    the buffer is written once a threshold is reached, a record >= flush_level arrives,
+    flush_interval seconds after the last write (by the IntervalFlusher thread if no record arrives),
+    on rollover and on flush / close.
+
+    With compression ("gzip" / "zstd") the finished files are compressed by the background LogArchiver.
+    With delay the file is not opened (or the directory scanned) until the first record is written.
 
     Args:
         logging (_type_): Default logging handler time rotating file handlers function
     """
 
     LOG_TYPES = ["debug", "info", "warning", "error", "critical"]
+    buffer_joiner = ""  # Joins the buffered records
 
     def __init__(
         self,
@@ -28,23 +499,46 @@ class PrefixedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler
         utc=False,
         atTime=None,
         errors=None,
+        buffer_size: int = 0,
+        buffer_records: int = 0,
+        flush_interval: float = 0,
+        flush_level: int | str = logging.ERROR,
+        compression: str | None = None,
         **kwargs,
     ):
         self.log_type = self.__get_log_type(kwargs, filename)
-        self.prefix = self.__get_date_prefix()
-        self.current_date = time.strftime("%Y-%m-%d")
+        self.compression = resolve_compression(compression)
+        self.buffer_size = buffer_size  # (Bytes) 0 = no size threshold
+        self.buffer_records = buffer_records  # 0 = no record count threshold
+        self.flush_interval = flush_interval  # (Seconds) 0 = no time threshold
+        self.flush_level = (
+            logging.getLevelName(flush_level.upper())
+            if isinstance(flush_level, str)
+            else flush_level
+        )
+        self.buffered = bool(buffer_size or buffer_records or flush_interval)
+        self._buffer: list[str] = []
+        self._buffered_bytes = 0
+        self._last_flush = time.time()
         super().__init__(
-            self.__generate_filename(filename),
+            filename,
             when,
             interval,
             backupCount,
             encoding,
-            delay,
+            True,  # Stream is opened by doRollover with the prefixed filename
             utc,
             atTime,
             errors,
         )
-        self.doRollover()
+        self.delay = delay
+        if delay:  # The first record runs the rollover, opening the file and applying retention
+            self.prefix = self.__get_date_prefix(time.time())
+            self.rolloverAt = 0
+        else:
+            self.doRollover()
+        if flush_interval:
+            interval_flusher.register(self)
 
     def __get_log_type(self, init_kwargs, filename):
         if "level" in init_kwargs:
@@ -55,8 +549,11 @@ class PrefixedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler
                 return lgType.lower()
         raise Exception(f"LogType was not defined for {filename}")
 
-    def __get_date_prefix(self) -> str:
-        return time.strftime("%Y-%m-%d")
+    def __get_date_prefix(self, current_time: float) -> str:
+        time_tuple = (
+            time.gmtime(current_time) if self.utc else time.localtime(current_time)
+        )
+        return time.strftime(self.suffix, time_tuple)
 
     def __generate_filename(self, filename: str) -> str:
         """__generate_filename
@@ -74,73 +571,1356 @@ class PrefixedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler
         base_name = ".".join(base_name.split(".")[-2:])
         return os.path.normpath(os.path.join(directory, self.prefix + "." + base_name))
 
+    def __compute_next_rollover(self, current_time: int) -> int:
+        """__compute_next_rollover
+        Epoch time of the next rollover based on when / interval / utc / atTime,
+        with the same DST adjustment as logging.handlers.TimedRotatingFileHandler
+
+        Args:
+            current_time (int): Time of the current rollover
+
+        Returns:
+            int: Epoch time of the next rollover
+        """
+        next_rollover = self.computeRollover(current_time)
+        while next_rollover <= current_time:
+            next_rollover = next_rollover + self.interval
+        # 'when: midnight' with 'interval: N' rolls over every N days (the next midnight / atTime
+        # ends the first day), unless computeRollover already added them
+        if self.when == "MIDNIGHT" and next_rollover - current_time <= ONE_DAY + 3600:
+            next_rollover += self.interval - ONE_DAY
+        if (self.when == "MIDNIGHT" or self.when.startswith("W")) and not self.utc:
+            dst_now = time.localtime(current_time)[-1]
+            dst_at_rollover = time.localtime(next_rollover)[-1]
+            if dst_now != dst_at_rollover:
+                next_rollover += -3600 if not dst_now else 3600
+        return next_rollover
+
     def shouldRollover(self, record) -> bool:
         """shouldRollover
         Overwrites logging.handlers.TimedRotatingFileHandler shouldRollover function
-        Sets the new filename based on new prefix and check if you should roll over
+        The next rollover time is computed once in doRollover, so this is a single comparison
 
         Args:
-            record : record is not used, as we are just comparing times, but it is needed so
-                      the method signatures are the same
+            record : Log record, its creation time is compared against the rollover time
 
         Returns:
             bool: If the log file should roll over
         """
-        current_date = time.strftime("%Y-%m-%d")
-        if current_date != self.current_date:
-            self.prefix = self.__get_date_prefix()
-            self.baseFilename = self.__generate_filename(self.baseFilename)
-            self.current_date = current_date
-            return True
-        return False
+        return record.created >= self.rolloverAt
 
     def doRollover(self) -> None:
         """doRollover
         Closes the current logging stream
-        Sets up new stream to log to
+        Sets up new stream to log to and computes the next rollover time
         """
+        if self._buffer:
+            self.flush()  # Buffered records belong to the current file
         if self.stream:
             self.stream.close()
-        self.prefix = self.__get_date_prefix()
+            self.stream = None
+        current_time = int(time.time())
+        self.prefix = self.__get_date_prefix(current_time)
         self.baseFilename = self.__generate_filename(self.baseFilename)
-        self.current_date = time.strftime("%Y-%m-%d")
-        self.stream = self._open()
+        self.rolloverAt = self.__compute_next_rollover(current_time)
+        if not self.delay:
+            self.stream = self._open()
+        log_retention.add(self.baseFilename)
         if self.backupCount > 0:
             for s in self.getFilesToDelete():
+                if not log_archiver.remove(s):
+                    continue  # Still being compressed
                 print(
-                    f"[logging][doRollOver] Removing out of date ({self.backupCount}) files {s}"
+                    f"[logging][doRollOver] Removed out of date ({self.backupCount}) files {s}"
                 )
-                os.remove(s)
+                log_retention.discard(s)
+        if self.compression is not None:
+            for s in self.getFilesToArchive():
+                log_archiver.submit(s, self.compression)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            self._write(self.format(record), record)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _write(self, message: str, record: logging.LogRecord) -> None:
+        """_write
+        Writes an already formatted message, directly or through the buffer
+
+        Args:
+            message (str): Formatted record without the terminator
+            record (logging.LogRecord): Record the message was formatted from
+        """
+        self._append(message + self.terminator, record)
+
+    def _append(self, data: str | bytes, record: logging.LogRecord) -> None:
+        """_append
+        Writes data to the stream, or adds it to the buffer and flushes if a threshold is reached
+
+        Args:
+            data (str | bytes): Data to write (including the terminator)
+            record (logging.LogRecord): Record the data came from
+        """
+        if not self.buffered:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(data)
+            self.stream.flush()
+            return
+
+        self._buffer.append(data)
+        self._buffered_bytes += len(data)
+        if (
+            record.levelno >= self.flush_level
+            or (self.buffer_size and self._buffered_bytes >= self.buffer_size)
+            or (self.buffer_records and len(self._buffer) >= self.buffer_records)
+            or (
+                self.flush_interval
+                and record.created - self._last_flush >= self.flush_interval
+            )
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """flush
+        Writes the buffered records with a single write then flushes the stream
+        """
+        self.acquire()
+        try:
+            if self._buffer:
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write(self.buffer_joiner.join(self._buffer))
+                self._buffer.clear()
+                self._buffered_bytes = 0
+            self._last_flush = time.time()
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """close
+        Writes the buffer before closing, logging.FileHandler.close only flushes an open stream
+        (with delay the file may not be open yet while records are buffered)
+        """
+        interval_flusher.unregister(self)
+        try:
+            self.flush()
+        finally:
+            super().close()
+
+    def __get_rotated_files(self) -> dict[str, list[str]]:
+        """__get_rotated_files
+        Files of this log type grouped by their plain log name,
+        so a day's archive and index belong to the same day as its '.log'.
+        Uses the directory manifest shared by every handler in the process.
+
+        Returns:
+            dict[str, list[str]]: "<yyyy-mm-dd>.<LOG_TYPE>.log" to the paths for that day
+        """
+        dirName, baseName = os.path.split(self.baseFilename)  # dir, log_file
+        _, log_base = baseName.split(".", 1)  # <LOG_TYPE>.log
+        rotated_files = log_retention.get_rotated_files(dirName, self.prefix, log_base)
+        return {
+            logName: paths
+            for logName, paths in rotated_files.items()
+            if self.extMatch.match(logName.split(".", 1)[0])
+        }
 
     def getFilesToDelete(self):
         """
         Determine the files to delete when rolling over.
         """
+        days = self.__get_rotated_files()
+        if len(days) < self.backupCount:
+            return []
         result = []
-        dirName, baseName = os.path.split(self.baseFilename)  # dir, log_file
-        fileNames = os.listdir(dirName)  # All logs
-        n, e = os.path.splitext(baseName)
-        _, log_type = n.split(".")
+        for logName in sorted(days)[: len(days) - self.backupCount]:
+            result.extend(days[logName])
+        return result
 
-        for fileName in fileNames:
-            if (
-                not fileName.endswith(e)
-                # or self.log_type not in fileName.lower()
-                or f".{log_type}" not in fileName
-            ):  # does have .log
-                continue
+    def getFilesToArchive(self) -> list[str]:
+        """getFilesToArchive
+        Plain log files of this log type that are finished (not the current file) and not compressed yet
+        """
+        dirName, current = os.path.split(self.baseFilename)
+        result = []
+        for logName, paths in self.__get_rotated_files().items():
+            plain_path = os.path.join(dirName, logName)
+            if logName != current and plain_path in paths:
+                result.append(plain_path)
+        return result
 
-            parts = fileName.split(".")
-            for part in parts:
-                if self.extMatch.match(part):
-                    result.append(os.path.join(dirName, fileName))
-                    break
-        if len(result) < self.backupCount:
-            result = []
+
+class BinaryPrefixedTimedRotatingFileHandler(PrefixedTimedRotatingFileHandler):
+    """BinaryPrefixedTimedRotatingFileHandler
+    PrefixedTimedRotatingFileHandler that writes compact binary records instead of formatted text,
+    the formatting is done later by `python -m custom_utils.log_decoder <file>`.
+
+    File layout: BINARY_LOG_MAGIC then length prefixed entries (kind byte + payload length)
+        STRING: id + utf8 text, logger / module / file / function names and message templates
+                are written once per file and referenced by id afterwards
+        RECORD: created, level byte, string ids, line number + marshal of (args, exc_text, stack_info)
+        RESET:  written when appending to an existing file, the string ids start again
+    """
+
+    buffer_joiner = b""
+
+    def _open(self):
+        stream = open(self.baseFilename, "ab")
+        self._string_ids: dict[str, int] = {}
+        stream.write(BINARY_LOG_MAGIC if stream.tell() == 0 else BINARY_RESET_ENTRY)
+        return stream
+
+    def __intern(self, value: str, entries: list[bytes]) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._string_ids)
+            encoded = value.encode("utf8", "replace")
+            entries.append(
+                BINARY_ENTRY.pack(BINARY_STRING, 4 + len(encoded))
+                + BINARY_STRING_ID.pack(string_id)
+                + encoded
+            )
+        return string_id
+
+    def encode_record(self, record: logging.LogRecord) -> bytes:
+        """encode_record
+        Binary entries for a record, preceded by any string it uses for the first time in this file
+
+        Args:
+            record (logging.LogRecord): Log record data
+
+        Returns:
+            bytes: Entries to append to the file
+        """
+        if self.stream is None:
+            self.stream = self._open()
+        entries = []
+        header = BINARY_RECORD_HEADER.pack(
+            record.created,
+            min(record.levelno, 255),
+            self.__intern(record.name, entries),
+            self.__intern(record.module, entries),
+            self.__intern(record.filename, entries),
+            self.__intern(record.funcName or "", entries),
+            record.lineno or 0,
+            self.__intern(str(record.msg), entries),
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        try:  # Arguments are kept as they are when marshal can store them
+            extra = marshal.dumps(
+                (record.args or (), record.exc_text, record.stack_info)
+            )
+        except ValueError:
+            extra = marshal.dumps(
+                (_marshal_args(record.args), record.exc_text, record.stack_info)
+            )
+        entries.append(
+            BINARY_ENTRY.pack(BINARY_RECORD, len(header) + len(extra)) + header + extra
+        )
+        return b"".join(entries)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            self._append(self.encode_record(record), record)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+def _marshal_args(args):
+    """_marshal_args
+    Keeps the arguments that marshal can store, anything else is stored as its str()
+    """
+    if not args:
+        return ()
+    if isinstance(args, dict):
+        return {
+            str(key): value if type(value) in MARSHAL_TYPES else str(value)
+            for key, value in args.items()
+        }
+    return tuple(arg if type(arg) in MARSHAL_TYPES else str(arg) for arg in args)
+
+
+def iter_binary_log_records(path: str) -> Iterator[logging.LogRecord]:
+    """iter_binary_log_records
+    Read the records of a file written by BinaryPrefixedTimedRotatingFileHandler
+
+    Args:
+        path (str): Binary log file
+
+    Yields:
+        Iterator[logging.LogRecord]: Records that can be formatted by any logging.Formatter
+    """
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_LOG_MAGIC)) != BINARY_LOG_MAGIC:
+            raise Exception(f"{path} is not a binary log file")
+        strings = {}
+        while True:
+            entry = f.read(BINARY_ENTRY.size)
+            if len(entry) < BINARY_ENTRY.size:
+                return
+            kind, length = BINARY_ENTRY.unpack(entry)
+            payload = f.read(length)
+            if len(payload) < length:
+                return  # Incomplete last record
+            if kind == BINARY_STRING:
+                (string_id,) = BINARY_STRING_ID.unpack_from(payload)
+                strings[string_id] = payload[BINARY_STRING_ID.size :].decode("utf8")
+            elif kind == BINARY_RESET:
+                strings = {}
+            elif kind == BINARY_RECORD:
+                (
+                    created,
+                    levelno,
+                    name_id,
+                    module_id,
+                    filename_id,
+                    func_id,
+                    lineno,
+                    template_id,
+                ) = BINARY_RECORD_HEADER.unpack_from(payload)
+                args, exc_text, stack_info = marshal.loads(
+                    payload[BINARY_RECORD_HEADER.size :]
+                )
+                record = logging.makeLogRecord(
+                    {
+                        "name": strings[name_id],
+                        "msg": strings[template_id],
+                        "args": args or None,
+                        "levelno": levelno,
+                        "levelname": logging.getLevelName(levelno),
+                        "pathname": strings[filename_id],
+                        "filename": strings[filename_id],
+                        "module": strings[module_id],
+                        "funcName": strings[func_id],
+                        "lineno": lineno,
+                        "created": created,
+                        "msecs": int((created - int(created)) * 1000) + 0.0,
+                        "exc_text": exc_text,
+                        "stack_info": stack_info,
+                    }
+                )
+                yield record
+
+
+class MmapLogFile:
+    """MmapLogFile
+    Append only file written through a memory map, used as the stream of MmapPrefixedTimedRotatingFileHandler.
+    The file is grown in chunk_size steps, a write is a copy into the mapping with no syscall,
+    and close truncates the file to the written length.
+
+    A process that dies before close leaves the unused part of the last chunk as NUL bytes,
+    and possibly a partly copied record. Both are trimmed when the file is opened again.
+
+    Args:
+        path (str): Log file path
+        chunk_size (int): (Bytes) Size the file is grown by each time the mapping is full
+        encoding (str | None): Encoding used for str writes
+        errors (str | None): Encoding error handling
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunk_size: int = 4194304,
+        encoding: str | None = None,
+        errors: str | None = None,
+    ):
+        self.name = path
+        self.encoding = encoding or "utf8"
+        self.errors = errors or "strict"
+        self.chunk_size = max(mmap.ALLOCATIONGRANULARITY, chunk_size)
+        self._file = open(path, "a+b")
+        self.position = recover_log_tail(self._file)
+        self._mmap = None
+        self._map(self.position + self.chunk_size)
+
+    def _map(self, size: int) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+
+    def write(self, data: str | bytes) -> int:
+        if isinstance(data, str):
+            data = data.encode(self.encoding, self.errors)
+        end = self.position + len(data)
+        if end > len(self._mmap):
+            self._map(end + self.chunk_size)
+        self._mmap[self.position : end] = data
+        self.position = end
+        return len(data)
+
+    def flush(self) -> None:
+        """flush
+        The mapping shares the page cache, written records are already visible to readers
+        """
+        return
+
+    def sync(self) -> None:
+        """sync
+        Flushes the mapping to disk (msync)
+        """
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def tell(self) -> int:
+        return self.position
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._mmap.close()
+        self._mmap = None
+        self._file.truncate(self.position)
+        self._file.close()
+
+
+def recover_log_tail(file, terminator: bytes = b"\n") -> int:
+    """recover_log_tail
+    Trims the end of a text log file that was not closed cleanly:
+    the NUL bytes preallocated by MmapLogFile and any record cut off before its terminator
+
+    Args:
+        file: File opened in binary read / write mode
+        terminator (bytes): Terminator every complete record ends with
+
+    Returns:
+        int: Length of the file after trimming
+    """
+    size = file.seek(0, os.SEEK_END)
+    end = size
+    while end > 0:  # Last byte that is not preallocation
+        start = max(0, end - 65536)
+        file.seek(start)
+        block = file.read(end - start).rstrip(b"\0")
+        end = start + len(block)
+        if block:
+            break
+    complete = end
+    while complete > 0:  # Last complete record
+        start = max(0, complete - 65536)
+        file.seek(start)
+        block = file.read(complete - start)
+        if block.endswith(terminator):
+            break
+        index = block.rfind(terminator)
+        if index != -1:
+            complete = start + index + len(terminator)
+            break
+        complete = start
+    if complete != size:
+        if complete != end:
+            print(
+                f"[logging][recover_log_tail] Trimmed {end - complete} bytes of a torn record from {file.name}"
+            )
+        file.truncate(complete)
+    file.seek(complete)
+    return complete
+
+
+class MmapPrefixedTimedRotatingFileHandler(PrefixedTimedRotatingFileHandler):
+    """MmapPrefixedTimedRotatingFileHandler
+    PrefixedTimedRotatingFileHandler that writes the day file through a MmapLogFile,
+    so appending a record is a memory copy instead of a write syscall.
+    The file is preallocated in mmap_chunk_size steps and truncated to its real length on rollover / close,
+    a file left by a crash is trimmed to its last complete record the next time it is opened.
+
+    Written records reach the page cache straight away, use sync() to force them to disk.
+    """
+
+    def __init__(self, *args, mmap_chunk_size: int = 4194304, **kwargs):
+        self.mmap_chunk_size = mmap_chunk_size
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        return MmapLogFile(
+            self.baseFilename, self.mmap_chunk_size, self.encoding, self.errors
+        )
+
+    def sync(self) -> None:
+        self.acquire()
+        try:
+            self.flush()
+            if self.stream:
+                self.stream.sync()
+        finally:
+            self.release()
+
+
+LEVEL_METHODS = {
+    logging.DEBUG: ["debug"],
+    logging.INFO: ["info"],
+    logging.WARNING: ["warning"],
+    logging.ERROR: ["error", "exception"],
+    logging.CRITICAL: ["critical", "fatal"],
+}
+
+
+def _disabled_level(*args, **kwargs) -> None:
+    """_disabled_level
+    Replaces the method of a disabled level, the call returns before a record is created
+    """
+    return
+
+
+__gated_loggers = weakref.WeakSet()  # Loggers passed to apply_level_gate
+
+
+def __gate_logger(logger: logging.Logger) -> None:
+    effective_level = logger.getEffectiveLevel()
+    for level, methods in LEVEL_METHODS.items():
+        enabled = (
+            level >= effective_level
+            and not logger.disabled
+            and level > logger.manager.disable
+        )
+        for method in methods:
+            if enabled:
+                logger.__dict__.pop(method, None)  # Back to the logging.Logger method
+            else:
+                setattr(logger, method, _disabled_level)
+        setattr(logger, f"{methods[0]}_enabled", enabled)
+
+
+def apply_level_gate(logger: logging.Logger) -> None:
+    """apply_level_gate
+    Replaces the level methods (debug / info / ...) that can not produce a record with a no-op,
+    so a disabled call does not check the level or create a record.
+    Also sets logger.<level>_enabled for a guard around messages that are expensive to build,
+    the arguments of a call are evaluated even when the level is disabled:
+        if logger.debug_enabled:
+            logger.debug(f"{expensive()}")
+    The gates are applied again by the settings when they change levels (config reload / custom loggers),
+    after any other setLevel (of the logger or a parent), logging.disable or logger.disabled call regate_loggers().
+
+    Args:
+        logger (logging.Logger): Logger to gate
+    """
+    __gated_loggers.add(logger)
+    __gate_logger(logger)
+
+
+def regate_loggers() -> None:
+    """regate_loggers
+    Applies the gate of every logger passed to apply_level_gate again, after their levels changed
+    """
+    for gated_logger in list(__gated_loggers):
+        __gate_logger(gated_logger)
+
+
+class KeyedLogFilter(logging.Filter, abc.ABC):
+    """KeyedLogFilter
+    Base of the filters for floods of records from hot loops (RateLimitFilter / SamplingFilter / DuplicateFilter).
+    State is kept per key in an LRU of max_keys, lookups are O(1) and the least recently used key is dropped once full.
+    The decision is stored on the record, so a filter shared by several handlers (or the level files of a
+    MultiLevelFileHandler) counts each record once.
+    The count of filtered records is written as its own summary record (the filtered records are not changed),
+    only to the handlers / logger using the filter that the records of its logger reach.
+    Summaries are written before the next record of the key that passes, every summary_interval
+    (IntervalFlusher) and on close (shutdown_logging / config reload), so the count of a flood that stopped is not lost.
+    Attach from the yaml with 'filters: [<name>]' on a handler or a logger.
+
+    Args:
+        logging (_type_): Default logging Filter
+    """
+
+    SUMMARY_FORMAT = "%s (%d similar messages filtered)"
+    SUMMARY_ATTR = "filtered_records"  # Count on the summary records, they always pass
+
+    def __init__(
+        self,
+        name: str = "",
+        exempt_level: int | str = logging.ERROR,
+        max_keys: int = 1024,
+        summary_interval: float = 10,
+    ):
+        """__init__
+
+        Args:
+            name (str, optional): Only filter records of this logger and its children. Defaults to "".
+            exempt_level (int | str, optional): Records at or above this level always pass. Defaults to logging.ERROR.
+            max_keys (int, optional): Keys kept before the least recently used is dropped. Defaults to 1024.
+            summary_interval (float, optional): (Seconds) Pending summaries are written at least this often,
+                0 only writes them with the next record of the key / on close. Defaults to 10.
+        """
+        super().__init__(name)
+        self.exempt_level = (
+            logging.getLevelName(exempt_level.upper())
+            if isinstance(exempt_level, str)
+            else exempt_level
+        )
+        self.max_keys = max(1, max_keys)
+        self.keys = OrderedDict()
+        self.passed = 0
+        self.filtered = 0
+        self._buffer = OrderedDict()  # key -> [filtered count, last filtered record]
+        self._released = []  # Summaries to write once the lock is released
+        self._lock = threading.Lock()
+        self._decision_attr = f"_filter_{id(self)}"
+        self.flush_interval = summary_interval
+        self._last_flush = time.time()
+        if summary_interval:
+            interval_flusher.register(self)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if (
+            record.levelno >= self.exempt_level
+            or self.SUMMARY_ATTR in record.__dict__
+            or not super().filter(record)
+        ):
+            return True
+        decision = record.__dict__.get(self._decision_attr)
+        if decision is None:
+            with self._lock:
+                decision = self.allow(record, time.monotonic())
+                if decision:
+                    self.passed += 1
+                else:
+                    self.filtered += 1
+                released, self._released = self._released, []
+            setattr(record, self._decision_attr, decision)
+            if released:  # Written before the record that passed
+                self.write_summaries(released)
+        return decision
+
+    @abc.abstractmethod
+    def allow(self, record: logging.LogRecord, now: float) -> bool:
+        """allow
+        Decides if the record is written, called under the filter lock once per record
+        """
+
+    def get_state(self, key, default_factory):
+        """get_state
+        State of the key (marked as most recently used), created with default_factory() when missing
+        """
+        state = self.keys.get(key)
+        if state is None:
+            state = self.keys[key] = default_factory()
+            if len(self.keys) > self.max_keys:
+                self.keys.popitem(last=False)
         else:
-            result.sort()
-            result = result[: len(result) - self.backupCount]
-        return result
+            self.keys.move_to_end(key)
+        return state
+
+    def suppress(self, key, record: logging.LogRecord) -> None:
+        """suppress
+        Counts a filtered record of the key for its summary, called from allow
+        """
+        pending = self._buffer.get(key)
+        if pending is None:
+            self._buffer[key] = [1, record]
+            if len(self._buffer) > self.max_keys:
+                self._released.append(self._buffer.popitem(last=False)[1])
+        else:
+            pending[0] += 1
+            pending[1] = record
+
+    def release(self, key) -> None:
+        """release
+        A record of the key passes, its filtered count is written first, called from allow
+        """
+        pending = self._buffer.pop(key, None)
+        if pending is not None:
+            self._released.append(pending)
+
+    def summary_record(
+        self, count: int, record: logging.LogRecord
+    ) -> logging.LogRecord:
+        """summary_record
+        New record with the level / location of the last filtered record and the filtered count
+        """
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = str(record.msg)
+        summary = logging.LogRecord(
+            record.name,
+            record.levelno,
+            record.pathname,
+            record.lineno,
+            self.SUMMARY_FORMAT,
+            (message, count),
+            None,
+            record.funcName,
+        )
+        setattr(summary, self.SUMMARY_ATTR, count)
+        return summary
+
+    def summary_targets(self, logger_name: str) -> list:
+        """summary_targets
+        Handlers using the filter on the way of the records of the logger (as Logger.callHandlers),
+        or the first logger using it (its handlers and parents get the summary like the records)
+        """
+        targets = []
+        current = logging.getLogger(logger_name)
+        while current:
+            if self in current.filters:
+                return targets + [current]
+            for handler in current.handlers:
+                for target in self.__filtering_handlers(handler):
+                    if target not in targets:
+                        targets.append(target)
+            if not current.propagate:
+                break
+            current = current.parent
+        return targets
+
+    def __filtering_handlers(self, handler: logging.Handler) -> list:
+        if self in handler.filters:
+            return [handler]
+        if isinstance(handler, MultiLevelFileHandler):
+            return [sink for sink in handler.sinks if self in sink.filters]
+        if isinstance(handler, BatchingQueueHandler) and handler.listener is not None:
+            return [
+                target
+                for queued in handler.listener.handlers
+                for target in self.__filtering_handlers(queued)
+            ]
+        return []
+
+    def write_summaries(self, pending: list[list]) -> None:
+        """write_summaries
+        Writes a summary record per [count, last filtered record]
+        """
+        for count, record in pending:
+            summary = self.summary_record(count, record)
+            for target in self.summary_targets(record.name):
+                if (
+                    isinstance(target, logging.Handler)
+                    and summary.levelno < target.level
+                ):
+                    continue
+                try:
+                    target.handle(summary)
+                except Exception as e:
+                    print(
+                        f"[logging][{type(self).__name__}] Failed to write a summary: {e}"
+                    )
+
+    def flush(self) -> None:
+        """flush
+        Writes the summaries of every key with filtered records
+        """
+        with self._lock:
+            pending = list(self._buffer.values())
+            self._buffer.clear()
+            self._last_flush = time.time()
+        if pending:
+            self.write_summaries(pending)
+
+    def close(self) -> None:
+        """close
+        Stops the periodic summaries and writes the pending ones
+        """
+        interval_flusher.unregister(self)
+        self.flush()
+
+    def stats(self) -> dict:
+        """stats
+        Returns:
+            dict: Records passed, filtered and keys currently tracked
+        """
+        return {
+            "filter": type(self).__name__,
+            "passed": self.passed,
+            "filtered": self.filtered,
+            "keys": len(self.keys),
+        }
+
+
+class RateLimitFilter(KeyedLogFilter):
+    """RateLimitFilter
+    Token bucket per logger and level, allows 'rate' records a second with bursts of up to 'burst' records.
+    The first record after a limited period is preceded by a summary of how many were dropped.
+    """
+
+    SUMMARY_FORMAT = "%s (%d similar messages rate limited)"
+
+    def __init__(self, rate: float = 10, burst: int = 50, **kwargs):
+        super().__init__(**kwargs)
+        self.rate = rate
+        self.burst = max(1, burst)
+
+    def allow(self, record: logging.LogRecord, now: float) -> bool:
+        key = (record.name, record.levelno)
+        # tokens, last update
+        bucket = self.get_state(key, lambda: [self.burst, now])
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            self.suppress(key, record)
+            return False
+        bucket[0] = tokens - 1
+        self.release(key)
+        return True
+
+
+class SamplingFilter(KeyedLogFilter):
+    """SamplingFilter
+    Keeps a random 'rate' fraction of the records below exempt_level (DEBUG / INFO by default)
+    """
+
+    def __init__(
+        self, rate: float = 0.1, exempt_level: int | str = logging.WARNING, **kwargs
+    ):
+        kwargs.setdefault(
+            "summary_interval", 0
+        )  # No summaries, nothing is counted per key
+        super().__init__(exempt_level=exempt_level, **kwargs)
+        self.rate = rate
+
+    def allow(self, record: logging.LogRecord, now: float) -> bool:
+        return random.random() < self.rate
+
+
+class DuplicateFilter(KeyedLogFilter):
+    """DuplicateFilter
+    Passes one record per message every 'window' seconds, the first record of the next window
+    is preceded by a summary of how many similar messages were suppressed.
+    Messages are matched by logger, level and 'key':
+        template: the message before the arguments are applied ("Processed %d items")
+        message: the formatted message
+        location: the logging call (file and line), also matches f-string messages
+    """
+
+    SUMMARY_FORMAT = "%s (%d similar messages suppressed)"
+    KEY_GETTERS = {
+        "template": lambda record: str(record.msg),
+        "message": logging.LogRecord.getMessage,
+        "location": lambda record: (record.pathname, record.lineno),
+    }
+
+    def __init__(
+        self,
+        window: float = 10,
+        key: Literal["template", "message", "location"] = "template",
+        **kwargs,
+    ):
+        kwargs.setdefault("summary_interval", window)
+        super().__init__(**kwargs)
+        if key not in self.KEY_GETTERS:
+            raise Exception(
+                f"DuplicateFilter key '{key}' is not one of {list(self.KEY_GETTERS)}"
+            )
+        self.window = window
+        self._get_key = self.KEY_GETTERS[key]
+
+    def allow(self, record: logging.LogRecord, now: float) -> bool:
+        key = (record.name, record.levelno, self._get_key(record))
+        window_start = self.get_state(key, lambda: [float("-inf")])
+        if now - window_start[0] < self.window:
+            self.suppress(key, record)
+            return False
+        self.release(key)
+        window_start[0] = now
+        return True
+
+
+class MultiLevelFileHandler(logging.Handler):
+    """MultiLevelFileHandler
+    Single handler that replaces the five per level PrefixedTimedRotatingFileHandler of a logger.
+    Each record is formatted once per distinct formatter and written to every level file it applies to,
+    under one lock and with one rollover check.
+    The level files keep their own '<yyyy-mm-dd>.<name>_<level>.log' names and retention.
+
+    Args:
+        logging (_type_): Default logging handler
+    """
+
+    def __init__(self, handlers: list[PrefixedTimedRotatingFileHandler]):
+        if not handlers:
+            raise Exception("MultiLevelFileHandler needs at least one file handler")
+        super().__init__(level=min(handler.level for handler in handlers))
+        self.sinks = sorted(handlers, key=lambda handler: handler.level)
+        self.rolloverAt = min(sink.rolloverAt for sink in self.sinks)
+
+        # Level files using the same format share one formatter, so it only runs once
+        shared_formatters = {}
+        for sink in self.sinks:
+            formatter = sink.formatter or logging.Formatter()
+            key = formatter
+            if type(formatter) is logging.Formatter:
+                key = (formatter._fmt, formatter.datefmt)
+            sink.formatter = shared_formatters.setdefault(key, formatter)
+
+    def shouldRollover(self, record) -> bool:
+        return record.created >= self.rolloverAt
+
+    def doRollover(self) -> None:
+        now = time.time()
+        for sink in self.sinks:
+            if now >= sink.rolloverAt:
+                sink.acquire()
+                try:
+                    sink.doRollover()
+                finally:
+                    sink.release()
+        self.rolloverAt = min(sink.rolloverAt for sink in self.sinks)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            formatted = {}
+            for sink in self.sinks:
+                if record.levelno < sink.level:
+                    break  # Sinks are sorted by level, none of the rest apply
+                if sink.filters and not sink.filter(record):
+                    continue
+                if isinstance(sink, BinaryPrefixedTimedRotatingFileHandler):
+                    data = sink.encode_record(record)
+                else:
+                    message = formatted.get(sink.formatter)
+                    if message is None:
+                        message = formatted[sink.formatter] = sink.format(record)
+                    data = message + sink.terminator
+                # The lock of the level file, also taken by its flush (IntervalFlusher / shutdown)
+                sink.acquire()
+                try:
+                    sink._append(data, record)
+                finally:
+                    sink.release()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def setFormatter(self, fmt) -> None:
+        """setFormatter
+        Formatters are kept per level file, use the formatter of the file handlers instead
+        """
+        return
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            for sink in self.sinks:
+                sink.close()
+            super().close()
+        finally:
+            self.release()
+
+
+# Renders tracebacks before records are queued
+_exception_formatter = logging.Formatter()
+
+
+class BatchingQueueHandler(logging.handlers.QueueHandler):
+    """BatchingQueueHandler
+    Non-blocking handler that only puts records onto a bounded queue.
+    The formatting / writing is done by a BatchingQueueListener on a background thread,
+    records keep their msg / args (binary handler templates, DuplicateFilter 'key: template').
+    Records that do not fit in the queue are dropped and counted instead of blocking the caller.
+
+    Args:
+        logging (_type_): Default logging QueueHandler
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.listener = None  # Set by QueueLoggingPipeline
+        self.stopped_listener = (
+            None  # Set once the listener stopped, records are then handled directly
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stopped_listener is not None:
+                self.stopped_listener.handle(record)
+                return
+            self.enqueue(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1  # Never block the calling thread
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """prepare
+        Unlike QueueHandler.prepare the message is not formatted on the calling thread,
+        only the traceback is rendered (exc_text) so its frames are not kept alive in the queue.
+        stack_info is already a string.
+
+        Args:
+            record (logging.LogRecord): Log record data
+
+        Returns:
+            logging.LogRecord: The record itself, or a shallow copy without exc_info
+        """
+        if not record.exc_info:
+            return record
+        record = copy.copy(record)  # Other handlers of the logger still see exc_info
+        if not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """BatchingQueueListener
+    Background thread that drains the queue in batches and passes the records to the real handlers
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        *handlers: logging.Handler,
+        batch_size: int = 256,
+        respect_handler_level: bool = True,
+    ):
+        super().__init__(
+            log_queue, *handlers, respect_handler_level=respect_handler_level
+        )
+        self.batch_size = max(1, batch_size)
+        self.processed = 0
+
+    def _monitor(self) -> None:
+        """_monitor
+        Blocks for the first record of a batch, then takes up to batch_size more without blocking
+        """
+        q = self.queue
+        while True:
+            batch = [self.dequeue(True)]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.dequeue(False))
+            except queue.Empty:
+                pass
+
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                    continue
+                self.handle(record)
+            self.processed += len(batch) - stop
+            for _ in batch:
+                q.task_done()
+            if stop:
+                break
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)  # Wait for space so the listener always stops
+
+    def stop(self) -> None:
+        """stop
+        Drains the remaining records, stops the thread and flushes the handlers
+        """
+        if self._thread is not None:
+            super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+class QueueLoggingPipeline:
+    """QueueLoggingPipeline
+    Moves the handlers of a logger behind one BatchingQueueHandler and starts the listener thread
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        maxsize: int = 10000,
+        batch_size: int = 256,
+    ):
+        self.logger = logger
+        self.handlers = list(logger.handlers)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.queue_handler = BatchingQueueHandler(self.queue)
+        self.queue_handler.name = "queue_handler"
+        self.listener = BatchingQueueListener(
+            self.queue, *self.handlers, batch_size=batch_size
+        )
+        self.queue_handler.listener = self.listener
+        self._lock = threading.Lock()
+
+        for handler in self.handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(self.queue_handler)
+        self.listener.start()
+
+    def stats(self) -> dict:
+        """stats
+        Returns:
+            dict: Records processed, dropped (queue full) and still waiting in the queue
+        """
+        return {
+            "logger": self.logger.name,
+            "processed": self.listener.processed,
+            "dropped": self.queue_handler.dropped,
+            "backlog": self.queue.qsize(),
+        }
+
+    def stop(self, restore_handlers: bool = True) -> dict:
+        """stop
+        Stops enqueueing, drains the backlog to the real handlers and flushes them.
+        Safe to call more than once.
+
+        Args:
+            restore_handlers (bool, optional): Put the handlers back on the logger, False when the
+                logger already has its replacement handlers (config reload). Defaults to True.
+
+        Returns:
+            dict: Final stats of the pipeline
+        """
+        with self._lock:
+            self.logger.removeHandler(self.queue_handler)
+            self.listener.stop()
+            # A logging call that still holds the queue handler writes straight to the handlers
+            with self.queue_handler.lock:
+                self.queue_handler.stopped_listener = self.listener
+            while True:  # Records enqueued after the listener stopped
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is not self.listener._sentinel:
+                    self.listener.handle(record)
+            if restore_handlers:
+                for (
+                    handler
+                ) in self.handlers:  # Later records go straight to the handlers
+                    if handler not in self.logger.handlers:
+                        self.logger.addHandler(handler)
+            return self.stats()
+
+
+def parse_socket_address(address: str) -> tuple[str, int | None]:
+    """parse_socket_address
+    "localhost:9020" -> ("localhost", 9020), "/tmp/logs.sock" -> ("/tmp/logs.sock", None) (unix socket)
+    """
+    host, _, port = str(address).rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return str(address), None
+
+
+class BufferingSocketHandler(logging.handlers.SocketHandler):
+    """BufferingSocketHandler
+    Sends records to the log writer process (see LogRecordSocketReceiver).
+    While the writer is down the records are kept in a bounded local backlog,
+    they are sent in order before any new record once the writer is reachable again.
+    Records are dropped (and counted) only when the backlog is full.
+
+    Args:
+        logging (_type_): Default logging SocketHandler
+    """
+
+    def __init__(self, address: str, backlog_size: int = 10000):
+        host, port = parse_socket_address(address)
+        super().__init__(host, port)
+        self.backlog = deque()
+        self.backlog_size = backlog_size
+        self.dropped = 0
+
+    def _send(self, data: bytes) -> bool:
+        if self.sock is None:
+            self.createSocket()  # Retries with the SocketHandler back off
+        if self.sock is None:
+            return False
+        try:
+            self.sock.sendall(data)
+            return True
+        except OSError:
+            self.sock.close()
+            self.sock = None
+            return False
+
+    def _send_backlog(self) -> bool:
+        while self.backlog:
+            if not self._send(self.backlog[0]):
+                return False
+            self.backlog.popleft()
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = self.makePickle(record)
+            if self._send_backlog() and self._send(data):
+                return
+            if len(self.backlog) >= self.backlog_size:
+                self.backlog.popleft()
+                self.dropped += 1
+            self.backlog.append(data)
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            self.retryTime = None  # Last attempt to deliver the backlog
+            self._send_backlog()
+            if self.backlog:
+                print(
+                    f"[logging][BufferingSocketHandler] Log writer unreachable, {len(self.backlog)} records not sent"
+                )
+        finally:
+            self.release()
+        super().close()
+
+
+class LogRecordStreamHandler(socketserver.StreamRequestHandler):
+    """LogRecordStreamHandler
+    Reads the length prefixed pickled records of one worker connection
+    """
+
+    def handle(self) -> None:
+        while True:
+            header = self.rfile.read(4)
+            if len(header) < 4:
+                break
+            (length,) = struct.unpack(">L", header)
+            data = self.rfile.read(length)
+            if len(data) < length:
+                break
+            self.server.dispatch(logging.makeLogRecord(pickle.loads(data)))
+
+
+class LogRecordSocketReceiver(socketserver.ThreadingTCPServer):
+    """LogRecordSocketReceiver
+    Log writer side, receives the records of every worker and passes them to dispatch.
+    Records are pickled so only bind it to localhost / a unix socket.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = False  # server_close waits for the workers to finish sending
+
+    def __init__(self, address: tuple[str, int], dispatch):
+        super().__init__(address, LogRecordStreamHandler)
+        self.dispatch = dispatch
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class UnixLogRecordSocketReceiver(socketserver.ThreadingUnixStreamServer):
+        """UnixLogRecordSocketReceiver
+        LogRecordSocketReceiver listening on a unix socket path
+        """
+
+        daemon_threads = False
+
+        def __init__(self, path: str, dispatch):
+            if os.path.exists(path):
+                os.remove(path)
+            super().__init__(path, LogRecordStreamHandler)
+            self.dispatch = dispatch
+
+
+def create_log_record_receiver(address: str, dispatch) -> socketserver.BaseServer:
+    """create_log_record_receiver
+    Args:
+        address (str): "host:port" or a unix socket path
+        dispatch (Callable[[logging.LogRecord], None]): Called with every received record
+
+    Returns:
+        socketserver.BaseServer: Server, run with serve_forever()
+    """
+    host, port = parse_socket_address(address)
+    if port is None:
+        return UnixLogRecordSocketReceiver(host, dispatch)
+    return LogRecordSocketReceiver((host, port), dispatch)
+
+
+class JsonLoggingFormatter(logging.Formatter):
+    """JsonLoggingFormatter
+    Formats records as one JSON object per line (NDJSON).
+    Only the configured fields are read from the record, static fields (host / environment / logger name)
+    are encoded once and reused as the start of every line.
+    Select per handler in the yaml with 'formatter: json'.
+    """
+
+    DEFAULT_FIELDS = [
+        "asctime",
+        "levelname",
+        "name",
+        "module",
+        "funcName",
+        "lineno",
+        "message",
+    ]
+
+    def __init__(
+        self,
+        fields: list[str] | None = None,
+        static_fields: dict | None = None,
+        datefmt: str | None = None,
+    ):
+        """__init__
+
+        Args:
+            fields (list[str] | None, optional): LogRecord attributes to include, "asctime" and "message" are
+                                                 formatted like logging.Formatter. Defaults to DEFAULT_FIELDS.
+            static_fields (dict | None, optional): Fields that are the same for every record. Defaults to None.
+            datefmt (str | None, optional): Date format of "asctime". Defaults to None.
+        """
+        super().__init__(datefmt=datefmt)
+        self.fields = list(fields or self.DEFAULT_FIELDS)
+        self.static_fields = {}
+        self._static_prefix = "{"
+        self.set_static_fields(static_fields or {})
+
+    def set_static_fields(self, static_fields: dict) -> None:
+        """set_static_fields
+        Adds fields that are the same for every record, static fields are not read from the record again
+        """
+        self.static_fields.update(static_fields)
+        if self.static_fields:
+            self._static_prefix = json_encode(self.static_fields)[:-1] + ","
+        self._getters = [
+            (field, self.__get_field_getter(field))
+            for field in self.fields
+            if field not in self.static_fields
+        ]
+
+    def __get_field_getter(self, field: str):
+        if field == "message":
+            return logging.LogRecord.getMessage
+        if field == "asctime":
+            return lambda record: self.formatTime(record, self.datefmt)
+        return attrgetter(field)
+
+    def format(self, record: logging.LogRecord) -> str:
+        """format
+        Args:
+            record (logging.LogRecord): Log record data
+
+        Returns:
+            str: JSON line (without the terminator)
+        """
+        data = {field: getter(record) for field, getter in self._getters}
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        if record.stack_info:
+            data["stack_info"] = self.formatStack(record.stack_info)
+        encoded = json_encode(data)
+        if len(encoded) == 2:  # "{}"
+            return self._static_prefix.rstrip(",") + "}"
+        return self._static_prefix + encoded[1:]
 
 
 class LoggingColours(str, Enum):
@@ -164,8 +1944,13 @@ class ColouredLoggingFormatter(logging.Formatter):
     """ColouredLoggingFormatter
     Based on logging.Formatter class
     Changes the colour of the Critical, Error and Warning logs
+    The colour codes are put into one format string per level when created,
+    so formatting a record is a single % interpolation
     """
 
+    LEVEL_NAME_PATTERN = re.compile(r"%\(levelname\)[#0+ -]*\d*(?:\.\d+)?[sr]")
+    LOGGER_NAME_PATTERN = re.compile(r"%\(name\)[#0+ -]*\d*(?:\.\d+)?[sr]")
+
     def __init__(
         self,
         fmt: str,
@@ -202,6 +1987,16 @@ class ColouredLoggingFormatter(logging.Formatter):
                 "reset": LoggingColours.RESET,
             }
         )
+        self._level_formatters = {
+            levelno: logging.Formatter(
+                self.__build_level_format(fmt, colour, logging.getLevelName(levelno))
+            )
+            for levelno, colour in self.level_colour_mapping.items()
+            if isinstance(levelno, int)
+        }
+        self._default_formatter = logging.Formatter(
+            self.__build_level_format(fmt, self.level_colour_mapping["default"])
+        )
 
     def _get_colored_format(self, levelno: int) -> str:
         """_get_colored_format
@@ -215,66 +2010,95 @@ class ColouredLoggingFormatter(logging.Formatter):
         """
         return self.level_colour_mapping[levelno]
 
-    def __color_format_section(self, section: str, colour: str) -> str:
-        """__color_format_section
-            formats a section of string according to the levelno
+    def __build_level_format(
+        self, fmt: str, level_colour: str, level_name: str | None = None
+    ) -> str:
+        """__build_level_format
+            Embeds the colour codes for one level into the format string
 
         Args:
-            section:(str): section of string
-            levelno (int): log level
+            fmt (str): Format for the coloured formatter
+            level_colour (str): Colour of the level
+            level_name (str | None, optional): Name of the level, written into the format
+                                               so only the name (not the padding) is coloured
 
         Returns:
-            str: section with colour format
+            str: Format string with the colour codes
         """
-        return colour + section + self.level_colour_mapping["reset"]
+        reset = self.level_colour_mapping["reset"]
+
+        def colour_level_name(match: re.Match) -> str:
+            if level_name is None:
+                return level_colour + match.group(0) + reset
+            spec = match.group(0)[len("%(levelname)") :]
+            padded = ("%" + spec) % level_name
+            name = level_name if spec.endswith("s") else repr(level_name)
+            return padded.replace(name, level_colour + name + reset, 1).replace(
+                "%", "%%"
+            )
+
+        if self.colour_level == "level":
+            # Colour the level with corresponding colour
+            fmt = self.LEVEL_NAME_PATTERN.sub(colour_level_name, fmt, count=1)
+            fmt = self.__colour_logger_name(fmt, self.logger_colour + "%s" + reset)
+
+        elif self.colour_level == "line":
+            # Colour whole line with corresponding colour
+            fmt = self.__colour_logger_name(
+                fmt,
+                self.logger_colour
+                + "%s"
+                + reset
+                + level_colour,  # the rest of the line needs to continue that colour
+            )
+            fmt = level_colour + fmt + reset
+        return fmt
+
+    def __colour_logger_name(self, fmt: str, coloured_name: str) -> str:
+        """__colour_logger_name
+            Colours the first logger name of the line, either the name added by getCustomLogger
+            (inside its '[]') or the '%(name)s' placeholder, whichever comes first
+
+        Args:
+            fmt (str): Format string
+            coloured_name (str): Colour codes around '%s' for the name
+
+        Returns:
+            str: Format string with the logger name coloured
+        """
+        if self.logger_name is None:
+            return fmt
+        logger_name_fmt = self.logger_name.replace("%", "%%")
+        literal_name = f"[{logger_name_fmt}]"
+        if literal_name not in fmt:
+            literal_name = logger_name_fmt
+        literal_index = fmt.find(literal_name) if literal_name else -1
+        placeholder = self.LOGGER_NAME_PATTERN.search(fmt)
+        if placeholder is not None and (
+            literal_index == -1 or placeholder.start() < literal_index
+        ):
+            return (
+                fmt[: placeholder.start()]
+                + coloured_name % placeholder.group(0)
+                + fmt[placeholder.end() :]
+            )
+        if literal_index == -1:
+            return fmt
+        if literal_name != logger_name_fmt:
+            coloured = "[" + coloured_name % logger_name_fmt + "]"
+        else:
+            coloured = coloured_name % logger_name_fmt
+        return fmt.replace(literal_name, coloured, 1)
 
     def format(self, record: logging.LogRecord) -> str:
         """format
-          Adds colour and colour reset to log string
+          Formats the record with the format string of its level (colours already included)
         Args:
             record (logging.LogRecord): Log record data
 
         Returns:
             str: Returns the string to be outputted in console
         """
-
-        log_message = super().format(record)
-        if self.colour_level is None and self.logger_colour is None:
-            return log_message
-
-        if self.colour_level == "level":
-            # Replace the level with corresponding colour
-            log_message = log_message.replace(
-                record.levelname,
-                self.__color_format_section(
-                    record.levelname, self.level_colour_mapping[record.levelno]
-                ),
-                1,
-            )
-            if self.logger_name is not None:
-                log_message = log_message.replace(
-                    self.logger_name,
-                    self.__color_format_section(self.logger_name, self.logger_colour),
-                    1,
-                )
-
-        elif self.colour_level == "line":
-            # Replace whole line with corresponding colour
-            log_message = (
-                self._get_colored_format(record.levelno)
-                + log_message
-                + LoggingColours.RESET
-            )
-            if self.logger_name is not None:
-                log_message = log_message.replace(
-                    self.logger_name,
-                    self.logger_colour
-                    + self.logger_name
-                    + LoggingColours.RESET
-                    + self._get_colored_format(
-                        record.levelno
-                    ),  # the rest of the line needs to continue that colour
-                    1,
-                )
-
-        return log_message
+        return self._level_formatters.get(
+            record.levelno, self._default_formatter
+        ).format(record)
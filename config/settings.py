@@ -7,17 +7,51 @@ import os
 import sys
 import logging
 from typing import Literal
-import yaml
 import socket
 import ast
+import marshal
+import atexit
+import signal
+import threading
+import functools
+import subprocess
 
-import logging.config
-from dotenv import dotenv_values
-from .logging_utils import ColouredLoggingFormatter, PrefixedTimedRotatingFileHandler
+from .logging_utils import (
+    BinaryPrefixedTimedRotatingFileHandler,
+    BufferingSocketHandler,
+    ColouredLoggingFormatter,
+    JsonLoggingFormatter,
+    KeyedLogFilter,
+    log_archiver,
+    MmapPrefixedTimedRotatingFileHandler,
+    MultiLevelFileHandler,
+    PrefixedTimedRotatingFileHandler,
+    QueueLoggingPipeline,
+    apply_level_gate,
+    regate_loggers,
+    create_log_record_receiver,
+)
+from .env_config import EnvConfig, compile_env_schema
 from .parse_arguments import parse_arguments
+from custom_types.envConfigType import EnvConfigType, env_config_defaults
+from custom_utils.path_utils import ensure_folders
 
 
 file_path = os.path.dirname(os.path.realpath(__file__))
+# Background logging threads to drain and flush on exit
+queue_pipelines: list[QueueLoggingPipeline] = []
+# Loggers rebuilt by reload_logging, the main logger (logger_init) and the getCustomLogger settings by name
+main_logger_settings: dict = {}
+custom_loggers: dict[str, dict] = {}
+applied_logging_config: dict = {}  # .env and yaml currently applied
+# Filters of the logging yaml by name, shared by the yaml loggers / handlers and the custom loggers
+logging_filters: dict[str, logging.Filter] = {}
+reload_lock = threading.RLock()
+config_watcher_stop = threading.Event()
+# .env schema compiled once at import
+validate_env_config = compile_env_schema(EnvConfigType, env_config_defaults)
+# Parsed yaml configs by path, (cache key, marshal of the config)
+yaml_config_cache: dict[str, tuple[tuple, bytes]] = {}
 
 
 # ==============================================================================================================
@@ -26,10 +60,8 @@ file_path = os.path.dirname(os.path.realpath(__file__))
 def create_data_folder():
     data_path = os.path.join(os.path.dirname(file_path), "data")
     sub_folders = ["config", "logs", "csv", "images", "json", "models", "database"]
-    sub_folder_paths = [os.path.join(data_path, folder) for folder in sub_folders]
-    for paths in sub_folder_paths:
-        if not os.path.exists(paths):
-            os.makedirs(paths)
+    # One batch, safe when other processes create them at the same time
+    ensure_folders(*[os.path.join(data_path, folder) for folder in sub_folders])
 
 
 def handle_exception(exc_type, exc_value, exc_traceback):
@@ -41,8 +73,12 @@ def handle_exception(exc_type, exc_value, exc_traceback):
     )
 
 
-def __get_yaml_format(yaml_dict: dict, logger_name: str | None = "ALL") -> str:
-    yaml_format = "%(asctime)s | [%(levelname)8s][%(module)s - %(funcName)s] | %(message)s"  # Standard format
+def __get_yaml_console_formatter(
+    yaml_dict: dict, logger_name: str | None = "ALL"
+) -> str | None:
+    """__get_yaml_console_formatter
+    Formatter name of the console handler with the level of the logger, None if there is none
+    """
     for valid_handlers in [
         yaml_handlers
         for yaml_handlers in yaml_dict["handlers"]
@@ -52,27 +88,402 @@ def __get_yaml_format(yaml_dict: dict, logger_name: str | None = "ALL") -> str:
             yaml_dict["handlers"][valid_handlers]["level"]
             == yaml_dict["loggers"][logger_name]["level"]
         ):
-            formatter_type = yaml_dict["handlers"][valid_handlers]["formatter"]
-            yaml_format = yaml_dict["formatters"][formatter_type]["format"]
-            break
+            return yaml_dict["handlers"][valid_handlers]["formatter"]
+    return None
+
+
+def __get_yaml_format(yaml_dict: dict, logger_name: str | None = "ALL") -> str | None:
+    """__get_yaml_format
+    Format string of the console handler of the logger, None if its formatter has no format string
+    (e.g. 'formatter: json'), the console is then not coloured
+    """
+    yaml_format = "%(asctime)s | [%(levelname)8s][%(module)s - %(funcName)s] | %(message)s"  # Standard format
+    formatter_type = __get_yaml_console_formatter(yaml_dict, logger_name)
+    if formatter_type is not None:
+        yaml_format = yaml_dict["formatters"][formatter_type].get("format")
     return yaml_format
 
 
-def logger_init(
-    name: str | None,
-    colour_logging_level: Literal[None, "level", "line"] = "level",
-):
+@functools.cache
+def __json_host() -> str:
+    """__json_host
+    Host of the JSON log lines, looked up once per process (gethostbyname can block on DNS)
+    """
+    try:
+        return get_ip()
+    except OSError:
+        return socket.gethostname()
+
+
+def __json_static_fields() -> dict:
+    """__json_static_fields
+    Fields that are the same for every JSON log line of this process
+    """
+    return {
+        "host": __json_host(),
+        "environment": globals().get("ENV_CONFIG", {}).get("ENV_TYPE"),
+    }
+
+
+def __get_pipeline_option(yaml_dict: dict, option: str, default=None):
+    """__get_pipeline_option
+    Reads an option from the 'pipeline' section of the logging yaml.
+    The .env variable LOGGING_<OPTION> overwrites the yaml value if it is defined,
+    a process environment variable LOGGING_<OPTION> overwrites both (e.g. for one worker process).
+
+    Args:
+        yaml_dict (dict): Logging yaml config
+        option (str): Name of the option within 'pipeline'
+        default (optional): Value used when neither the yaml or .env defines it. Defaults to None.
+    """
+    value = (yaml_dict.get("pipeline") or {}).get(option, default)
+    env_name = f"LOGGING_{option.upper()}"
+    env_value = os.environ.get(env_name, globals().get("ENV_CONFIG", {}).get(env_name))
+    if env_value is not None:
+        try:
+            value = (
+                ast.literal_eval(env_value) if isinstance(env_value, str) else env_value
+            )
+        except (ValueError, SyntaxError):
+            value = env_value
+    return value
+
+
+def __combine_file_handlers(logger: logging.Logger, yaml_dict: dict) -> None:
+    """__combine_file_handlers
+    Replaces the per level file handlers of the logger with one MultiLevelFileHandler
+    if 'pipeline.multi_level_files' is enabled
+    """
+    if not __get_pipeline_option(yaml_dict, "multi_level_files", False):
+        return
+    file_handlers = [
+        handler
+        for handler in logger.handlers
+        if isinstance(handler, PrefixedTimedRotatingFileHandler)
+    ]
+    if not file_handlers:
+        return
+    for handler in file_handlers:
+        logger.removeHandler(handler)
+    multi_level_handler = MultiLevelFileHandler(file_handlers)
+    multi_level_handler.name = "multi_level_file_handler"
+    logger.addHandler(multi_level_handler)
+
+
+def __strip_file_handlers(yaml_dict: dict) -> None:
+    """__strip_file_handlers
+    Removes the file handlers from the yaml before dictConfig so a worker process never opens the log files
+    """
+    file_handlers = [
+        handler_name
+        for handler_name, handler_config in yaml_dict["handlers"].items()
+        if "filename" in handler_config
+    ]
+    for handler_name in file_handlers:
+        del yaml_dict["handlers"][handler_name]
+    for logger_config in yaml_dict["loggers"].values():
+        logger_config["handlers"] = [
+            handler_name
+            for handler_name in logger_config.get("handlers", [])
+            if handler_name not in file_handlers
+        ]
+
+
+def __apply_multiprocess_role(logger: logging.Logger, yaml_dict: dict) -> None:
+    """__apply_multiprocess_role
+    'pipeline.multiprocess'
+        worker: records are sent to the log writer process (file handlers are never created)
+        writer: only the file handlers are kept (console / stream handlers are removed),
+                the workers already write to their own console
+    """
+    multiprocess_role = __get_pipeline_option(yaml_dict, "multiprocess", None)
+    if multiprocess_role == "worker":
+        socket_handler = BufferingSocketHandler(
+            __get_pipeline_option(yaml_dict, "multiprocess_address", "localhost:9020"),
+            backlog_size=__get_pipeline_option(
+                yaml_dict, "multiprocess_backlog", 10000
+            ),
+        )
+        socket_handler.name = "log_writer_socket"
+        logger.addHandler(socket_handler)
+    elif multiprocess_role == "writer":
+        for handler in logger.handlers[:]:
+            if "console" in str(handler.name) or (
+                isinstance(handler, logging.StreamHandler)
+                and not isinstance(handler, logging.FileHandler)
+            ):
+                logger.removeHandler(handler)
+
+
+def run_log_writer() -> None:
+    """run_log_writer
+    Runs this process as the log writer for the worker processes (blocking, until SIGTERM / SIGINT).
+    Every received record is handled by the logger of the same name, custom loggers are created on first use.
+    """
+    __ensure_initialised()
+    yaml_config = __load_logging_yaml()
+    if __get_pipeline_option(yaml_config, "multiprocess", None) != "writer":
+        raise Exception(
+            "The log writer must run with LOGGING_MULTIPROCESS=writer so it owns the log files"
+        )
+    address = __get_pipeline_option(
+        yaml_config, "multiprocess_address", "localhost:9020"
+    )
+    writer_loggers = set(yaml_config["loggers"])
+    writer_loggers_lock = threading.Lock()  # One thread per connected worker
+
+    def dispatch(record: logging.LogRecord) -> None:
+        if record.name not in writer_loggers:
+            with writer_loggers_lock:
+                if record.name not in writer_loggers:
+                    if not logging.getLogger(record.name).handlers:
+                        getCustomLogger(record.name, colour_logging_level=None)
+                    writer_loggers.add(record.name)
+        logging.getLogger(record.name).handle(record)
+
+    server = create_log_record_receiver(address, dispatch)
+
+    def stop_server(signum, frame):
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop_server)
+    signal.signal(signal.SIGINT, stop_server)
+    logger.warning(f"[logging] Log writer listening on {address}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()  # Waits for the connected workers to finish
+        shutdown_logging()
+
+
+def start_log_writer() -> subprocess.Popen:
+    """start_log_writer
+    Starts the log writer (`python -m config.log_writer`) as a separate process
+
+    Returns:
+        subprocess.Popen: Log writer process, stop with terminate()
+    """
+    return subprocess.Popen(
+        [sys.executable, "-m", "config.log_writer"],
+        cwd=os.path.dirname(file_path),
+        env={**os.environ, "LOGGING_MULTIPROCESS": "writer"},
+    )
+
+
+def __attach_queue_pipeline(logger: logging.Logger, yaml_dict: dict) -> None:
+    """__attach_queue_pipeline
+    Puts the handlers of the logger behind a background queue if 'pipeline.queue' is enabled
+    """
+    if not __get_pipeline_option(yaml_dict, "queue", False):
+        return
+    queue_pipelines.append(
+        QueueLoggingPipeline(
+            logger,
+            maxsize=__get_pipeline_option(yaml_dict, "queue_maxsize", 10000),
+            batch_size=__get_pipeline_option(yaml_dict, "queue_batch_size", 256),
+        )
+    )
+
+
+def shutdown_logging() -> list[dict]:
+    """shutdown_logging
+    Drains and stops every background logging queue then flushes all handlers.
+    Call before os._exit as atexit / logging.shutdown will not run.
+
+    Returns:
+        list[dict]: Processed / dropped / backlog counts of each queue
+    """
+    config_watcher_stop.set()
+    pipeline_stats = [pipeline.stop() for pipeline in queue_pipelines]
+    for stats in pipeline_stats:
+        message = f"[logging] Queue '{stats['logger']}' processed {stats['processed']} records, dropped {stats['dropped']}, backlog {stats['backlog']}"
+        if stats["dropped"] or stats["backlog"]:
+            logger.warning(message)
+        else:
+            logger.info(message)
+    queue_pipelines.clear()
+    for log_filter in logging_filters.values():
+        if isinstance(log_filter, KeyedLogFilter):
+            log_filter.close()  # Counts of the floods still being filtered
+    logging.shutdown()
+    log_archiver.join(timeout=5)  # Unfinished archives are redone on the next start
+    return pipeline_stats
+
+
+def __read_config_snapshot(snapshot_path: str, key: tuple) -> bytes | None:
+    try:
+        with open(snapshot_path, "rb") as f:
+            snapshot_key, serialised = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return serialised if tuple(snapshot_key) == key else None
+
+
+def __write_config_snapshot(snapshot_path: str, key: tuple, serialised: bytes) -> None:
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        with open(temp_path, "wb") as f:
+            marshal.dump((key, serialised), f)
+        os.replace(
+            temp_path, snapshot_path
+        )  # Other processes never read a partial file
+    except OSError as e:
+        print(f"[logging][config_snapshot] Could not write {snapshot_path}: {e}")
+
+
+def load_yaml_config(yaml_path: str) -> dict:
+    """load_yaml_config
+    Parsed yaml config, cached per process by path and modification time.
+    The C CSafeLoader is used when PyYAML was built with it.
+    A marshal snapshot is kept in data/config so a cold start skips the yaml parsing when the file is unchanged,
+    disable it with LOGGING_CONFIG_SNAPSHOT=False.
+
+    Args:
+        yaml_path (str): Path to the yaml file
+
+    Returns:
+        dict: New copy of the config, safe to modify (dictConfig changes the dict it is given)
+    """
+    yaml_path = os.path.realpath(yaml_path)
+    stat = os.stat(yaml_path)
+    key = (yaml_path, stat.st_mtime_ns, stat.st_size, sys.version_info[:2])
+    cached = yaml_config_cache.get(yaml_path)
+    if cached is not None and cached[0] == key:
+        return marshal.loads(cached[1])
+
+    use_snapshot = __get_pipeline_option({}, "config_snapshot", True)
+    snapshot_path = os.path.join(
+        os.path.dirname(file_path),
+        "data",
+        "config",
+        f"{os.path.basename(yaml_path)}.marshal",
+    )
+    serialised = __read_config_snapshot(snapshot_path, key) if use_snapshot else None
+    if serialised is None:
+        import yaml  # Only needed when the snapshot can not be used
+
+        with open(yaml_path, "r") as f:
+            yaml_config = yaml.load(
+                f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            )
+        try:
+            serialised = marshal.dumps(yaml_config)
+        except ValueError:  # Values marshal can not store are parsed every time
+            return yaml_config
+        if use_snapshot:
+            __write_config_snapshot(snapshot_path, key, serialised)
+    yaml_config_cache[yaml_path] = (key, serialised)
+    return marshal.loads(serialised)
+
+
+def __load_logging_yaml() -> dict:
     logging_yaml_path = os.path.join(file_path, "prefixed_logger_setting.yaml")
     # logging_yaml_path = os.path.join(file_path, "logger_setting.yaml")
-    with open(logging_yaml_path, "r") as f:
-        yaml_config = yaml.full_load(f)
+    return load_yaml_config(logging_yaml_path)
+
+
+def __handler_source(handler_config: dict) -> dict:
+    """__handler_source
+    Handler options that need a new handler when they change,
+    the level, formatter and filters are applied to the existing handler instead
+    """
+    return {
+        option: value
+        for option, value in handler_config.items()
+        if option not in ("level", "formatter", "filters")
+    }
+
+
+def __build_yaml_handlers(
+    yaml_config: dict, reusable: dict[str, logging.Handler]
+) -> dict[str, logging.Handler]:
+    """__build_yaml_handlers
+    Handlers of the logging yaml (as logging.config.dictConfig creates them) without attaching them to a logger.
+    A handler in reusable with the same options is kept (its file stays open) and only gets the new level / formatter / filters.
+    Filters with unchanged options are kept as well (with their rate limit / duplicate state) and stored in logging_filters.
+
+    Args:
+        yaml_config (dict): Logging yaml config (modified)
+        reusable (dict[str, logging.Handler]): Current handlers by name
+
+    Returns:
+        dict[str, logging.Handler]: Handler name to handler
+    """
+    import logging.config  # Imported on initialisation, not with the module
 
-    logging.config.dictConfig(config=yaml_config)
-    logger = logging.getLogger(name=name)
-    logging.root.setLevel(logger.level)
+    sources = {
+        handler_name: __handler_source(handler_config)
+        for handler_name, handler_config in yaml_config.get("handlers", {}).items()
+    }
+    filter_sources = {
+        filter_name: dict(filter_config)
+        for filter_name, filter_config in yaml_config.get("filters", {}).items()
+    }
+    configurator = logging.config.DictConfigurator(yaml_config)
+    config = configurator.config
+    formatters = config.get("formatters", {})
+    for formatter_name in formatters:
+        formatters[formatter_name] = configurator.configure_formatter(
+            formatters[formatter_name]
+        )
+    filters = config.get("filters", {})
+    for filter_name in filters:
+        log_filter = logging_filters.get(filter_name)
+        if getattr(log_filter, "source_config", None) != filter_sources[filter_name]:
+            log_filter = configurator.configure_filter(filters[filter_name])
+            log_filter.source_config = filter_sources[filter_name]
+        filters[filter_name] = log_filter
+    logging_filters.clear()
+    logging_filters.update(filters)
+
+    handlers = {}
+    for handler_name in config.get("handlers", {}):
+        handler_config = config["handlers"][handler_name]
+        handler = reusable.get(handler_name)
+        if getattr(handler, "source_config", None) == sources[handler_name]:
+            handler.setLevel(handler_config.get("level", logging.NOTSET))
+            if "formatter" in handler_config:
+                handler.setFormatter(formatters[handler_config["formatter"]])
+            handler.filters = [
+                filters[filter_name]
+                for filter_name in handler_config.get("filters", [])
+            ]
+        else:
+            handler = configurator.configure_handler(handler_config)
+            handler.source_config = sources[handler_name]
+        handler.name = handler_name
+        if isinstance(handler.formatter, JsonLoggingFormatter):
+            handler.formatter.set_static_fields(__json_static_fields())
+        handlers[handler_name] = handler
+    return handlers
+
+
+def __build_yaml_logger(
+    staging: logging.Logger,
+    yaml_config: dict,
+    yaml_logger_name: str,
+    handlers: dict[str, logging.Handler],
+) -> None:
+    logger_config = yaml_config["loggers"][yaml_logger_name]
+    staging.setLevel(logger_config.get("level", logging.NOTSET))
+    staging.propagate = logger_config.get("propagate", True)
+    for handler_name in logger_config.get("handlers", []):
+        staging.addHandler(handlers[handler_name])
+    for filter_name in logger_config.get("filters", []):
+        staging.addFilter(logging_filters[filter_name])
 
+
+def __build_main_logger(
+    staging: logging.Logger,
+    yaml_config: dict,
+    yaml_logger_name: str,
+    colour_logging_level: Literal[None, "level", "line"],
+    handlers: dict[str, logging.Handler],
+) -> None:
+    __build_yaml_logger(staging, yaml_config, yaml_logger_name, handlers)
     if colour_logging_level is not None:
-        coloured_handler_fmt = __get_yaml_format(yaml_config, name)
+        coloured_handler_fmt = __get_yaml_format(yaml_config, yaml_logger_name)
         if coloured_handler_fmt is not None:
             coloured_handler = logging.StreamHandler()
             coloured_handler.name = "coloured_console"
@@ -85,22 +496,27 @@ def logger_init(
                     level_colour_mapping={},
                 )
             )
-            for handler in logger.handlers[:]:
+            for handler in staging.handlers[:]:
                 # Removes the current console handler replaces with coloured
                 if "console" in str(handler.name):
-                    logger.removeHandler(handler)  # Remove the yaml logger (no colour)
-            logger.addHandler(coloured_handler)  # Add colour logger
+                    staging.removeHandler(handler)  # Remove the yaml logger (no colour)
+            staging.addHandler(coloured_handler)  # Add colour logger
 
-    sys.excepthook = handle_exception  # Exception handler
-    return logger
+    __apply_multiprocess_role(staging, yaml_config)
+    __combine_file_handlers(staging, yaml_config)
+    __attach_queue_pipeline(staging, yaml_config)
 
 
-def getCustomLogger(
+def __build_custom_logger(
+    staging: logging.Logger,
+    yaml_config: dict,
     logger_name: str,
-    logging_level=logging.DEBUG,
-    colour_logging_level: Literal[None, "level", "line"] = "level",
-    text_colour: str | None = None,
-):
+    logging_level,
+    colour_logging_level: Literal[None, "level", "line"],
+    text_colour: str | None,
+    reusable: dict[str, logging.Handler],
+    root_level: int,
+) -> None:
     level_converter = {
         "DEBUG": logging.DEBUG,
         "INFO": logging.INFO,
@@ -115,24 +531,38 @@ def getCustomLogger(
             logger_name_fmt = fmt.replace(" | ", f" | [{logger_name}]", 1)
         return logger_name_fmt
 
-    logging_yaml_path = os.path.join(file_path, "prefixed_logger_setting.yaml")
-    with open(logging_yaml_path, "r") as f:
-        yaml_config = yaml.full_load(f)
+    def build_formatter(formatter_name: str) -> logging.Formatter:
+        formatter_config = yaml_config["formatters"][formatter_name]
+        if "format" in formatter_config:
+            return logging.Formatter(adjust_logger_fmt(formatter_config["format"]))
+        # JSON formatter, the logger name is the same for every record
+        return JsonLoggingFormatter(
+            fields=formatter_config.get("fields"),
+            static_fields={**__json_static_fields(), "name": logger_name},
+            datefmt=formatter_config.get("datefmt"),
+        )
 
-    custom_logger = logging.getLogger(logger_name)
-    for handler_type in [
+    file_handler_types = [
         "debug_file_handler",
         "info_file_handler",
         "warning_file_handler",
         "error_file_handler",
         "critical_file_handler",
-    ]:
-        file_type = handler_type.split("_file_handler")[0]
+    ]
+    # Plain console format when not coloured (same as the last file handler)
+    handler_formatter = yaml_config["handlers"][file_handler_types[-1]]["formatter"]
+    if __get_pipeline_option(yaml_config, "multiprocess", None) == "worker":
+        file_handler_types = []  # The log writer process owns the files
+
+    for handler_type in file_handler_types:
         handler_formatter = yaml_config["handlers"][handler_type]["formatter"]
         handler_level = yaml_config["handlers"][handler_type]["level"]
+        handler_directory, handler_filename = os.path.split(
+            yaml_config["handlers"][handler_type]["filename"]
+        )
         PreFixTimeHandlerArgs = {
-            "filename": yaml_config["handlers"][handler_type]["filename"].replace(
-                f"{file_type}.log", logger_name + f"_{file_type}.log"
+            "filename": os.path.join(
+                handler_directory, f"{logger_name}_{handler_filename}"
             ),
             "when": yaml_config["handlers"][handler_type]["when"],
             "interval": yaml_config["handlers"][handler_type]["interval"],
@@ -140,24 +570,60 @@ def getCustomLogger(
             "encoding": yaml_config["handlers"][handler_type]["encoding"],
             "level": yaml_config["handlers"][handler_type].get("level", "INFO"),
         }
-        file_handler = PrefixedTimedRotatingFileHandler(**PreFixTimeHandlerArgs)
-        file_handler.setFormatter(
-            logging.Formatter(
-                adjust_logger_fmt(
-                    yaml_config["formatters"][handler_formatter]["format"]
-                )
-            )
-        )
+        for optional_arg in [
+            "buffer_size",
+            "buffer_records",
+            "flush_interval",
+            "flush_level",
+            "compression",
+            "mmap_chunk_size",
+            "delay",
+        ]:
+            if optional_arg in yaml_config["handlers"][handler_type]:
+                PreFixTimeHandlerArgs[optional_arg] = yaml_config["handlers"][
+                    handler_type
+                ][optional_arg]
+        handler_class = PrefixedTimedRotatingFileHandler
+        for file_handler_class in [
+            BinaryPrefixedTimedRotatingFileHandler,
+            MmapPrefixedTimedRotatingFileHandler,
+        ]:
+            if yaml_config["handlers"][handler_type]["class"].endswith(
+                file_handler_class.__name__
+            ):
+                handler_class = file_handler_class
+        handler_source = {
+            **__handler_source(PreFixTimeHandlerArgs),
+            "class": handler_class.__name__,
+        }
+        file_handler = reusable.get(handler_type)
+        if getattr(file_handler, "source_config", None) != handler_source:
+            file_handler = handler_class(**PreFixTimeHandlerArgs)
+            file_handler.source_config = handler_source
+        file_handler.setFormatter(build_formatter(handler_formatter))
         file_handler.setLevel(level_converter[handler_level])
+        file_handler.filters = [
+            logging_filters[filter_name]
+            for filter_name in yaml_config["handlers"][handler_type].get("filters", [])
+        ]
         file_handler.name = handler_type
-        custom_logger.addHandler(file_handler)
+        staging.addHandler(file_handler)
 
     coloured_handler = logging.StreamHandler(sys.stdout)
-    if colour_logging_level is not None:
-        coloured_handler_fmt = adjust_logger_fmt(
-            __get_yaml_format(yaml_config, ENV_CONFIG["LOGGING_LEVEL"])
+    coloured_handler.name = "console"  # Removed by the log writer role
+    console_format = (
+        __get_yaml_format(yaml_config, ENV_CONFIG.LOGGING_LEVEL)
+        if colour_logging_level is not None
+        else None
+    )
+    if colour_logging_level is not None and console_format is None:
+        # Console formatter without a format string (json) is used as it is, not coloured
+        handler_formatter = __get_yaml_console_formatter(
+            yaml_config, ENV_CONFIG.LOGGING_LEVEL
         )
-        coloured_handler = logging.StreamHandler(sys.stdout)
+        coloured_handler.setLevel(logging_level)
+    if console_format is not None:
+        coloured_handler_fmt = adjust_logger_fmt(console_format)
         coloured_handler.setLevel(logging_level)
         coloured_handler.name = "coloured_console"
         coloured_handler.setFormatter(
@@ -170,21 +636,306 @@ def getCustomLogger(
             )
         )
     else:
-        coloured_handler.setFormatter(
-            logging.Formatter(
-                adjust_logger_fmt(
-                    yaml_config["formatters"][handler_formatter]["format"]
-                )
-            )
+        coloured_handler.setFormatter(build_formatter(handler_formatter))
+    staging.addHandler(coloured_handler)  # Add colour logger
+    # Same logger filters as the main logger
+    for filter_name in yaml_config["loggers"][ENV_CONFIG.LOGGING_LEVEL].get(
+        "filters", []
+    ):
+        staging.addFilter(logging_filters[filter_name])
+    __apply_multiprocess_role(staging, yaml_config)
+    __combine_file_handlers(staging, yaml_config)
+    __attach_queue_pipeline(staging, yaml_config)
+    # Lowest level any handler writes (not below the main logger), lower records are never created
+    handler_levels = [handler.level for handler in __base_handlers(staging)]
+    staging.setLevel(max(root_level, min(handler_levels, default=logging.NOTSET)))
+
+
+def __base_handlers(logger: logging.Logger) -> list[logging.Handler]:
+    """__base_handlers
+    Handlers of the logger with the queue / multi level wrappers replaced by the handlers they write to
+    """
+    pipelines = {pipeline.queue_handler: pipeline for pipeline in queue_pipelines}
+    base_handlers = []
+    pending = list(logger.handlers)
+    while pending:
+        handler = pending.pop(0)
+        if handler in pipelines:
+            pending.extend(pipelines[handler].handlers)
+        elif isinstance(handler, MultiLevelFileHandler):
+            pending.extend(handler.sinks)
+        else:
+            base_handlers.append(handler)
+    return base_handlers
+
+
+def __swap_loggers(staged: list[tuple[logging.Logger, logging.Logger]]) -> None:
+    """__swap_loggers
+    Moves the handlers built on each staging logger to its live logger.
+    The handler list is replaced by one assignment, a logging call uses either the old or the new list.
+    The old queues are drained into the old handlers afterwards, then the handlers that were not reused are flushed and closed,
+    so no record is lost or written twice.
+
+    Args:
+        staged (list[tuple[logging.Logger, logging.Logger]]): (live logger, staging logger) pairs
+    """
+    old_handlers = {}
+    for live, _ in staged:
+        old_handlers.update((id(h), h) for h in __base_handlers(live))
+    old_pipelines = [
+        pipeline
+        for pipeline in queue_pipelines
+        if any(pipeline.logger is live for live, _ in staged)
+    ]
+    for live, staging in staged:
+        for pipeline in queue_pipelines:
+            if pipeline.logger is staging:
+                pipeline.logger = live
+        live.setLevel(staging.level)
+        live.propagate = staging.propagate
+        live.handlers = staging.handlers  # Atomic swap
+        live.filters = staging.filters
+        apply_level_gate(live)
+    regate_loggers()  # Parents swapped after their children, gated loggers outside of staged
+
+    for pipeline in old_pipelines:
+        pipeline.stop(restore_handlers=False)
+        queue_pipelines.remove(pipeline)
+    kept_handlers = set()
+    for live, _ in staged:
+        kept_handlers.update(id(h) for h in __base_handlers(live))
+    for handler_id, handler in old_handlers.items():
+        if handler_id not in kept_handlers:
+            try:
+                handler.flush()  # Records still buffered by the replaced handler
+            finally:
+                handler.close()
+
+
+def __configure_loggers(yaml_config: dict) -> None:
+    """__configure_loggers
+    (Re)builds the loggers of the logging yaml, the main logger and every custom logger, then swaps them in
+    """
+    if __get_pipeline_option(yaml_config, "multiprocess", None) == "worker":
+        __strip_file_handlers(yaml_config)
+
+    yaml_loggers = [logging.getLogger(name) for name in yaml_config["loggers"]]
+    main_logger = main_logger_settings["logger"]
+    reusable = {}
+    for live in [main_logger, *yaml_loggers]:
+        reusable.update((h.name, h) for h in __base_handlers(live) if h.name)
+    previous_filters = list(logging_filters.values())
+    for log_filter in previous_filters:
+        if isinstance(log_filter, KeyedLogFilter):
+            log_filter.flush()  # While the current handlers still use it
+    handlers = __build_yaml_handlers(yaml_config, reusable)
+
+    staged = []
+    for live in yaml_loggers:
+        if live is not main_logger:
+            staging = logging.Logger(live.name)
+            __build_yaml_logger(staging, yaml_config, live.name, handlers)
+            staged.append((live, staging))
+    staging = logging.Logger(main_logger.name)
+    __build_main_logger(
+        staging,
+        yaml_config,
+        main_logger_settings["yaml_logger"],
+        main_logger_settings["colour_logging_level"],
+        handlers,
+    )
+    staged.append((main_logger, staging))
+    root_level = staging.level
+    for logger_name, logger_settings in custom_loggers.items():
+        live = logging.getLogger(logger_name)
+        staging = logging.Logger(logger_name)
+        reusable = {h.name: h for h in __base_handlers(live) if h.name}
+        __build_custom_logger(
+            staging,
+            yaml_config,
+            logger_name,
+            **logger_settings,
+            reusable=reusable,
+            root_level=root_level,
         )
-    custom_logger.addHandler(coloured_handler)  # Add colour logger
+        staged.append((live, staging))
+    logging.root.setLevel(root_level)
+    __swap_loggers(staged)
+    for log_filter in previous_filters:
+        if isinstance(log_filter, KeyedLogFilter) and not any(
+            log_filter is kept for kept in logging_filters.values()
+        ):
+            log_filter.close()  # Replaced, summaries only reach the handlers still using it
+
+
+def logger_init(
+    name: str | None,
+    colour_logging_level: Literal[None, "level", "line"] = "level",
+):
+    with reload_lock:
+        main_logger_settings.update(
+            logger=logging.getLogger(name=name),
+            yaml_logger=name,
+            colour_logging_level=colour_logging_level,
+        )
+        __configure_loggers(__load_logging_yaml())
+    sys.excepthook = handle_exception  # Exception handler
+    return main_logger_settings["logger"]
+
+
+def getCustomLogger(
+    logger_name: str,
+    logging_level=logging.DEBUG,
+    colour_logging_level: Literal[None, "level", "line"] = "level",
+    text_colour: str | None = None,
+):
+    __ensure_initialised()
+    logger_settings = {
+        "logging_level": logging_level,
+        "colour_logging_level": colour_logging_level,
+        "text_colour": text_colour,
+    }
+    custom_logger = logging.getLogger(logger_name)
+    with reload_lock:
+        custom_loggers[logger_name] = logger_settings  # Rebuilt by reload_logging
+        staging = logging.Logger(logger_name)
+        reusable = {h.name: h for h in __base_handlers(custom_logger) if h.name}
+        __build_custom_logger(
+            staging,
+            __load_logging_yaml(),
+            logger_name,
+            **logger_settings,
+            reusable=reusable,
+            root_level=logging.root.level,
+        )
+        __swap_loggers([(custom_logger, staging)])
     return custom_logger
 
 
+def __get_dot_env_path(args: argparse.Namespace) -> str:
+    dot_env_path = os.path.normpath(f"environments/{args.env}.env")
+    return dot_env_path if os.path.exists(dot_env_path) else ".env"
+
+
+def __logging_config_diff(applied: dict, current: dict) -> list[str]:
+    """__logging_config_diff
+    Returns:
+        list[str]: Changed .env variables and yaml entries (e.g. "handlers.debug_file_handler")
+    """
+    changes = []
+    for name in sorted(set(applied["env"]) | set(current["env"])):
+        if applied["env"].get(name) != current["env"].get(name):
+            changes.append(
+                f".env {name} '{applied['env'].get(name)}' -> '{current['env'].get(name)}'"
+            )
+    for section in sorted(set(applied["yaml"]) | set(current["yaml"])):
+        old_section = applied["yaml"].get(section)
+        new_section = current["yaml"].get(section)
+        if old_section == new_section:
+            continue
+        if isinstance(old_section, dict) and isinstance(new_section, dict):
+            changes.extend(
+                f"yaml {section}.{entry}"
+                for entry in sorted(set(old_section) | set(new_section))
+                if old_section.get(entry) != new_section.get(entry)
+            )
+        else:
+            changes.append(f"yaml {section}")
+    return changes
+
+
+def reload_logging() -> list[str]:
+    """reload_logging
+    Re-reads the .env and the logging yaml and applies what changed without restarting:
+    ENV_CONFIG is replaced, logger levels / formatters / handlers are swapped while logging continues.
+    File handlers whose options did not change keep their open file.
+    An invalid .env or yaml is reported and the current config is kept.
+    Called by the config watcher ('pipeline: reload_interval') and on SIGHUP in main.py.
+
+    Returns:
+        list[str]: Changes that were applied, empty if nothing changed
+    """
+    global ENV_CONFIG
+    __ensure_initialised()
+    with reload_lock:
+        try:
+            env_config = load_env_config(load_dot_env(args=arguments), arguments)
+            current = {"env": env_config.to_dict(), "yaml": __load_logging_yaml()}
+        except Exception as e:
+            logger.error(
+                f"[logging][reload] Invalid config, keeping the current one: {e}"
+            )
+            return []
+        changes = __logging_config_diff(applied_logging_config, current)
+        if not changes:
+            return []
+        previous_env_config = ENV_CONFIG
+        ENV_CONFIG = env_config
+        main_logger_settings["yaml_logger"] = env_config.LOGGING_LEVEL
+        try:
+            __configure_loggers(__load_logging_yaml())
+        except Exception as e:
+            ENV_CONFIG = previous_env_config
+            main_logger_settings["yaml_logger"] = previous_env_config.LOGGING_LEVEL
+            logger.error(f"[logging][reload] Failed to apply the new config: {e}")
+            return []
+        applied_logging_config.update(current)
+    logger.warning(f"[logging][reload] Applied {', '.join(changes)}")
+    return changes
+
+
+def __watch_logging_config(interval: float) -> None:
+    watched_paths = [
+        os.path.join(file_path, "prefixed_logger_setting.yaml"),
+        __get_dot_env_path(arguments),
+    ]
+
+    def modified_times() -> list[int | None]:
+        times = []
+        for path in watched_paths:
+            try:
+                times.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                times.append(None)
+        return times
+
+    last_modified = modified_times()
+    while not config_watcher_stop.wait(interval):
+        modified = modified_times()
+        if modified != last_modified:
+            last_modified = modified
+            reload_logging()
+
+
+def start_config_watcher(interval: float) -> threading.Thread | None:
+    """start_config_watcher
+    Background thread that checks the .env and logging yaml every interval seconds and reloads on change
+
+    Args:
+        interval (float): (Seconds) Time between checks, 0 does not start the watcher
+
+    Returns:
+        threading.Thread | None: Watcher thread, stopped by shutdown_logging
+    """
+    if not interval:
+        return None
+    config_watcher_stop.clear()
+    watcher = threading.Thread(
+        target=__watch_logging_config,
+        args=(interval,),
+        name="logging_config_watcher",
+        daemon=True,
+    )
+    watcher.start()
+    return watcher
+
+
 # ==============================================================================================================
 ### Manage global variables under "env_config"
 # ==============================================================================================================
 def load_dot_env(args: argparse.Namespace):
+    from dotenv import dotenv_values  # Imported on initialisation, not with the module
+
     func_name = sys._getframe(0).f_code.co_name
     dot_env_path = os.path.normpath(f"environments/{args.env}.env")
     try:
@@ -202,72 +953,30 @@ def load_dot_env(args: argparse.Namespace):
     return dotenv_config
 
 
-def env_get(
-    variable_name: str, variable_type: type = str, default: str | None = None
-) -> None:
-    """env_get
-    Get values from the .ENV file
-    Args:
-        variable_name (str): .ENV name
-        default (str): default value if not defined
-        type (str, optional): Expected type for the .ENV variable. Defaults to string.
-    """
-    env_value = ENV_CONFIG.get(variable_name, None)  # Get config if it exists
-    if env_value is None and default is None:
-        raise Exception(
-            f"Failed to start program as .ENV Variable [{variable_name}] was not defined and no default value was given."
-        )
-
-    if not isinstance(default, variable_type):  # Default is incorrect type
-        message = f"\n\n .[.env] Variable ({variable_name}) Default Value ({default}) does not match Default Type ({variable_type})\n"
-        try:
-            logger.error(message)
-        except Exception:
-            print(message)
-        raise Exception(message)
-
-    if env_value is None:
-        ENV_CONFIG[variable_name] = default
-        message = f"[.env] MISSING '{variable_name}' - Setting to default {type(ENV_CONFIG[variable_name])}:'{ENV_CONFIG[variable_name]}'"
-        try:
-            logger.error(message)  # Using Default
-        except Exception:
-            print("\t\t\t\t   ", message)
-        return
+def load_env_config(dotenv_config: dict, args: argparse.Namespace) -> EnvConfig:
+    """load_env_config
+    Validates the .env against EnvConfigType in one pass, the global mappings and arguments are added on top.
+    Every invalid variable is reported in a single Exception.
 
-    if not isinstance(env_value, variable_type):
-        # try:
-        env_value = ast.literal_eval(env_value)
-        # except Exception:
-        if not isinstance(env_value, variable_type):
-            ENV_CONFIG[variable_name] = default
-            message = f"[.env] '{variable_name}' has incorrect Type ({variable_type}) - Setting to default {type(ENV_CONFIG[variable_name])}:'{ENV_CONFIG[variable_name]}'"
-            try:
-                logger.error(message)
-            except Exception:
-                print("\t\t\t\t   ", message)
-            return
+    Args:
+        dotenv_config (dict): Raw .env values
+        args (argparse.Namespace): Arguments (overwrite all Environment variables)
 
-    ENV_CONFIG[variable_name] = env_value
-    message = f"[.env] Setting '{variable_name}' to {type(ENV_CONFIG[variable_name])}:'{ENV_CONFIG[variable_name]}'"
-    try:
-        if env_value is not None:
-            logger.info(
-                f"[.env] Setting '{variable_name}' to {type(ENV_CONFIG[variable_name])}:'{ENV_CONFIG[variable_name]}'"
-            )
-        else:
-            logger.warning(
-                f"[.env] MISSING '{variable_name}' - Setting to {type(ENV_CONFIG[variable_name])}:'{ENV_CONFIG[variable_name]}'"
-            )
-    except Exception:
-        if env_value is not None:
-            print(
-                f"\t\t\t\t   [.env] | Setting '{variable_name}' to {type(ENV_CONFIG[variable_name])}:'{ENV_CONFIG[variable_name]}'"
-            )
-        else:
-            print(
-                f"\t\t\t\t   [.env] | MISSING '{variable_name}' - Setting to {type(ENV_CONFIG[variable_name])}:'{ENV_CONFIG[variable_name]}'"
+    Returns:
+        EnvConfig: Immutable config, read with ENV_CONFIG.LOGGING_LEVEL or ENV_CONFIG["LOGGING_LEVEL"]
+    """
+    raw_values = dict(dotenv_config)
+    global_variable_mappings(raw_values)
+    raw_values.update(vars(args))  # Arguments overwrites all Environment variables
+    env_config = validate_env_config(raw_values)
+    if env_config.defaults_used:
+        print(
+            "\t\t\t\t    [.env] MISSING - Setting to default "
+            + ", ".join(
+                f"{name}:'{env_config[name]}'" for name in env_config.defaults_used
             )
+        )
+    return env_config
 
 
 def global_variable_mappings(env_config: dict):
@@ -299,6 +1008,39 @@ def get_ip():
 # ==============================================================================================================
 ### Initialisation Sequence
 # ==============================================================================================================
+initialised = False
+initialising = False  # Nested accesses during __init__ do not start it again
+initialise_lock = threading.RLock()
+LAZY_ATTRIBUTES = ["logger", "ENV_CONFIG"]  # Set by __init__ on first access
+
+
+def __ensure_initialised() -> None:
+    global initialised, initialising
+    if initialised:
+        return
+    with initialise_lock:  # Other threads wait for the initialisation to finish
+        if initialised or initialising:
+            return
+        initialising = True
+        try:
+            __init__()
+            initialised = True
+        finally:
+            initialising = False
+
+
+def __getattr__(name: str):
+    """__getattr__
+    Module attribute fallback, `from config.settings import logger, ENV_CONFIG` runs the
+    initialisation sequence the first time instead of on import
+    """
+    if name in LAZY_ATTRIBUTES:
+        __ensure_initialised()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def __init__():  # On initialisation
     print(
         "\n\n\n\n======================================== config.settings.py Setup ============================================"
@@ -307,19 +1049,23 @@ def __init__():  # On initialisation
 
     global logger
     global ENV_CONFIG
+    global arguments
 
-    args = parse_arguments(load_arguments=False)  # Get input arguments
-    ENV_CONFIG = load_dot_env(args=args)
-
-    env_get("LOGGING_LEVEL", default="ALL", variable_type=str)
-    logger = logger_init(ENV_CONFIG["LOGGING_LEVEL"], colour_logging_level="level")
-    logger.info(f"Current logging level set to '{ENV_CONFIG['LOGGING_LEVEL']}'")
-    global_variable_mappings(ENV_CONFIG)
+    arguments = parse_arguments(load_arguments=False)  # Get input arguments
     ### ========================================================================
-    ### Add .ENV variables here (overwrite mappings)
+    ### Add .ENV variables to custom_types/envConfigType.py (type and default)
 
     ### ========================================================================
-    ENV_CONFIG.update(vars(args))  # Arguments overwrites all Environment variables
+    ENV_CONFIG = load_env_config(load_dot_env(args=arguments), arguments)
+
+    logger = logger_init(ENV_CONFIG.LOGGING_LEVEL, colour_logging_level="level")
+    # Compared against by reload_logging
+    applied_logging_config.update(env=ENV_CONFIG.to_dict(), yaml=__load_logging_yaml())
+    start_config_watcher(
+        __get_pipeline_option(__load_logging_yaml(), "reload_interval", 0)
+    )
+    atexit.register(shutdown_logging)
+    logger.info(f"Current logging level set to '{ENV_CONFIG.LOGGING_LEVEL}'")
     print(
         "======================================== Settings complete ====================================================\n"
     )
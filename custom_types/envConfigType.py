@@ -0,0 +1,31 @@
+from typing import Literal, TypedDict
+
+
+# Types should be PascalCase
+class EnvConfigType(TypedDict, total=False):
+    """EnvConfigType
+    Schema of the .env variables, compiled by config.env_config.compile_env_schema.
+    Keys not listed here are kept as they are, keys listed here are converted to their type
+    (a missing key uses env_config_defaults, or None if it has no default).
+    """
+
+    ENV_TYPE: Literal["DEV", "STAGING", "UAT", "PROD"] | None
+    LOGGING_LEVEL: Literal[
+        "ALL", "DEV", "PROD"
+    ]  # Logger in prefixed_logger_setting.yaml
+    LOGGING_QUEUE: bool | None  # Overwrites 'pipeline: queue'
+    LOGGING_MULTI_LEVEL_FILES: bool | None  # Overwrites 'pipeline: multi_level_files'
+    LOGGING_MULTIPROCESS: Literal["worker", "writer"] | None
+    LOGGING_MULTIPROCESS_ADDRESS: str | None
+    LOGGING_CONFIG_SNAPSHOT: bool | None
+    TEST_ENV_STRING: str | None
+    FLASK_IP: str
+    FLASK_PORT: int
+
+
+# Variables have all lowercase + underscores
+env_config_defaults: EnvConfigType = {
+    "LOGGING_LEVEL": "ALL",
+    "FLASK_IP": "localhost",
+    "FLASK_PORT": 8080,
+}
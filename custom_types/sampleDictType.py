@@ -1,5 +1,7 @@
 from typing import TypedDict
 
+from custom_types.slottedType import slotted_class
+
 
 # Types should be PascalCase
 class NestedDictType(TypedDict):
@@ -16,8 +18,13 @@ class SampleDictType(TypedDict):
     dictionary: NestedDictType
 
 
+# Slotted classes of the types (sample.string is a native attribute, a typo raises AttributeError)
+NestedDict = slotted_class(NestedDictType)
+SampleDict = slotted_class(SampleDictType)
+
+
 class DotDict(dict):
-    """allows for dot.notation access to dictionary attributes"""
+    """allows for dot.notation access to dictionary attributes, a missing key returns None (see SampleDict)"""
 
     __getattr__ = dict.get
     __setattr__ = dict.__setitem__
@@ -30,3 +37,13 @@ sample_dict["string"] = "hello"
 # Returns suggestive keys
 
 new_sample_dict = DotDict(sample_dict)
+sample = SampleDict.from_dict(
+    {
+        "string": "hello",
+        "integer": 1,
+        "float": 1.0,
+        "boolean": True,
+        "list": [],
+        "dictionary": {"test": "test", "nested": "nested"},
+    }
+)
@@ -0,0 +1,239 @@
+import types
+import dataclasses
+from operator import attrgetter, itemgetter
+from typing import Callable, Union, get_args, get_origin, get_type_hints, is_typeddict
+
+__slotted_classes: dict[tuple[type, bool], type] = {}  # (schema, frozen) -> class
+
+
+def __nested_converter(type_hint) -> tuple[str, type | None]:
+    """__nested_converter
+    How a field of the schema is converted by from_dict
+
+    Returns:
+        tuple[str, type | None]: ("value" | "nested" | "optional" | "list", slotted class of the nested TypedDict)
+    """
+    if is_typeddict(type_hint):
+        return "nested", type_hint
+    origin = get_origin(type_hint)
+    type_args = get_args(type_hint)
+    if origin in (Union, types.UnionType):
+        nested = [arg for arg in type_args if arg is not type(None)]
+        if len(nested) == 1 and is_typeddict(nested[0]):
+            return "optional", nested[0]
+    if origin is list and len(type_args) == 1 and is_typeddict(type_args[0]):
+        return "list", type_args[0]
+    return "value", None
+
+
+def __field_converters(
+    kind: str, nested_class: type | None, required: bool
+) -> tuple[Callable | None, Callable | None]:
+    """__field_converters
+    Returns:
+        tuple[Callable | None, Callable | None]: (from_dict, to_dict) conversion of one field value, None keeps it as it is
+    """
+    if kind == "value":
+        return None, None
+    from_dict = nested_class.from_dict
+    if kind == "list":
+
+        def convert(value):
+            return [from_dict(item) for item in value]
+
+        def export(value):
+            return [item.to_dict() for item in value]
+
+    else:
+        convert, export = from_dict, nested_class.to_dict
+    if kind == "optional" or not required:
+        convert_value, export_value = convert, export
+
+        def convert(value):
+            return None if value is None else convert_value(value)
+
+        def export(value):
+            return None if value is None else export_value(value)
+
+    return convert, export
+
+
+def __compose(outer: Callable, inner: Callable) -> Callable:
+    """__compose
+    outer(inner(value)), the to_dict getter of a nested field
+    """
+
+    def composed(value):
+        return outer(inner(value))
+
+    return composed
+
+
+def __key_error(
+    name: str, data, field_names: frozenset, required_keys: frozenset
+) -> Exception | None:
+    """__key_error
+    Exception for data with unknown / missing keys, None when the keys are valid
+    """
+    if not isinstance(data, dict):
+        return None
+    keys = data.keys()
+    if not keys <= field_names:
+        return Exception(f"{name} has no field(s) {sorted(keys - field_names)}")
+    if not required_keys <= keys:
+        return Exception(
+            f"{name} is missing the required key(s) {sorted(required_keys - keys)}"
+        )
+    return None
+
+
+def __build_methods(
+    slotted: type,
+    fields: tuple[str, ...],
+    required_keys: frozenset,
+    converters: dict[str, tuple[str, type | None]],
+    frozen: bool,
+) -> None:
+    """__build_methods
+    from_dict / to_dict as closures over a plan made once per class,
+    only the nested fields are converted one by one
+    """
+    field_names = frozenset(fields)
+    name = slotted.__name__
+    # Nested fields (field, from_dict of the value), a required nested key must be in the data
+    required_nested, optional_nested = [], []
+    # Every field (field, getter of the value as it is put in to_dict)
+    export_plan = []
+    for field in fields:
+        kind, nested = converters[field]
+        nested_class = slotted_class(nested, frozen) if nested is not None else None
+        required = field in required_keys
+        convert, export = __field_converters(kind, nested_class, required)
+        get_value = attrgetter(field)
+        if convert is not None:
+            (required_nested if required else optional_nested).append((field, convert))
+            get_value = __compose(export, get_value)
+        export_plan.append((field, get_value))
+    required_nested, optional_nested = tuple(required_nested), tuple(optional_nested)
+    nested_fields = required_nested + optional_nested
+    export_plan = tuple(export_plan)
+    optional_fields = tuple(field for field in fields if field not in required_keys)
+
+    if not frozen:
+
+        def from_dict(cls, data: dict):
+            try:
+                if nested_fields:
+                    data = dict(data)
+                    for field, convert in required_nested:
+                        data[field] = convert(data[field])
+                    for field, convert in optional_nested:
+                        data[field] = convert(data.get(field))
+                return cls(**data)
+            except (TypeError, KeyError):  # Unknown / missing keys
+                error = __key_error(name, data, field_names, required_keys)
+                if error is None:
+                    raise
+                raise error from None
+
+    else:
+        # A frozen __init__ sets each field with object.__setattr__, the slots are set directly instead
+        set_slots = tuple(getattr(slotted, field).__set__ for field in fields)
+        # attrgetter / itemgetter of one field does not return a tuple, the first is repeated (zip stops first)
+        get_items = itemgetter(*fields, *fields[:1]) if fields else lambda data: ()
+        defaults = dict.fromkeys(optional_fields)
+        field_count = len(fields)
+        new_instance = object.__new__
+
+        def from_dict(cls, data: dict):
+            try:
+                values = {**defaults, **data} if defaults or nested_fields else data
+                if len(values) != field_count:
+                    raise KeyError  # Unknown keys
+                for field, convert in nested_fields:
+                    values[field] = convert(values[field])
+                values = get_items(values)
+            except (TypeError, KeyError):  # Not a dict / missing required keys
+                error = __key_error(name, data, field_names, required_keys)
+                if error is None:
+                    raise
+                raise error from None
+            instance = new_instance(cls)
+            for set_slot, value in zip(set_slots, values):
+                set_slot(instance, value)
+            return instance
+
+    if not optional_fields:
+
+        def to_dict(self) -> dict:
+            return {field: get_value(self) for field, get_value in export_plan}
+
+    else:
+
+        def to_dict(self) -> dict:
+            data = {field: get_value(self) for field, get_value in export_plan}
+            for field in optional_fields:
+                if data[field] is None:
+                    del data[field]  # Missing keys of the TypedDict stay missing
+            return data
+
+    from_dict.__qualname__ = f"{slotted.__qualname__}.from_dict"
+    to_dict.__qualname__ = f"{slotted.__qualname__}.to_dict"
+    slotted.from_dict = classmethod(from_dict)
+    slotted.to_dict = to_dict
+
+
+def slotted_class(schema: type, frozen: bool = False) -> type:
+    """slotted_class
+    Generates a dataclass with __slots__ from a TypedDict, attributes are read as native slots
+    (no __getattr__, a typo raises AttributeError) and an instance has no __dict__.
+    Nested TypedDicts (also 'X | None' and 'list[X]') become their own slotted classes.
+    Values are not validated or copied, from_dict / to_dict share lists and dicts with the input.
+
+    Args:
+        schema (type): TypedDict, required keys must be in from_dict data, the others default to None
+        frozen (bool, optional): Read only instances (hashable if their values are). Defaults to False.
+
+    Returns:
+        type: Class named like the schema without 'Type' (SampleDictType -> SampleDict) with
+            from_dict(data) / to_dict() and a keyword only __init__
+    """
+    cached = __slotted_classes.get((schema, frozen))
+    if cached is not None:
+        return cached
+    if not is_typeddict(schema):
+        raise Exception(f"{schema!r} is not a TypedDict")
+
+    type_hints = get_type_hints(schema)
+    required_keys = getattr(schema, "__required_keys__", frozenset(type_hints))
+    fields = tuple(type_hints)
+    for name in fields:
+        if not name.isidentifier():
+            raise Exception(f"{schema.__name__} key '{name}' is not a valid attribute")
+    converters = {name: __nested_converter(type_hints[name]) for name in fields}
+    dataclass_fields = []
+    for name in fields:
+        kind, nested = converters[name]
+        field_type = type_hints[name]
+        if kind == "nested":
+            field_type = slotted_class(nested, frozen)
+        elif kind == "optional":
+            field_type = slotted_class(nested, frozen) | None
+        elif kind == "list":
+            field_type = list[slotted_class(nested, frozen)]
+        if name in required_keys:
+            dataclass_fields.append((name, field_type))
+        else:
+            dataclass_fields.append((name, field_type, dataclasses.field(default=None)))
+
+    slotted = dataclasses.make_dataclass(
+        schema.__name__.removesuffix("Type"),
+        dataclass_fields,
+        frozen=frozen,
+        slots=True,
+        kw_only=True,
+    )
+    slotted.__module__ = schema.__module__
+    __build_methods(slotted, fields, required_keys, converters, frozen)
+    __slotted_classes[(schema, frozen)] = slotted
+    return slotted
@@ -0,0 +1,93 @@
+"""
+Decode files written by BinaryPrefixedTimedRotatingFileHandler back into the text log formats
+python -m custom_utils.log_decoder data/logs/<yyyy-mm-dd>.debug.blog --format detailed
+"""
+
+import os
+import sys
+import argparse
+import logging
+from typing import Iterator
+
+import yaml
+
+from config.logging_utils import iter_binary_log_records
+
+LOGGING_YAML_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    "config",
+    "prefixed_logger_setting.yaml",
+)
+
+
+def get_yaml_formats(yaml_path: str = LOGGING_YAML_PATH) -> dict[str, str]:
+    """get_yaml_formats
+    Returns:
+        dict[str, str]: Formatter name to format string e.g. "detailed" / "simple"
+    """
+    with open(yaml_path, "r") as f:
+        yaml_config = yaml.safe_load(f)
+    return {
+        name: formatter["format"]
+        for name, formatter in yaml_config["formatters"].items()
+        if "format" in formatter
+    }
+
+
+def decode_binary_log(
+    path: str, fmt: str, show_logger_name: bool = False
+) -> Iterator[str]:
+    """decode_binary_log
+    Lazily formats the records of a binary log file
+
+    Args:
+        path (str): Binary log file
+        fmt (str): logging format string
+        show_logger_name (bool, optional): Add '[<logger name>]' after the time like getCustomLogger. Defaults to False.
+
+    Yields:
+        Iterator[str]: Formatted lines (without line endings)
+    """
+    if show_logger_name and " | " in fmt:
+        fmt = fmt.replace(" | ", " | [%(name)s]", 1)
+    formatter = logging.Formatter(fmt)
+    for record in iter_binary_log_records(path):
+        try:
+            yield formatter.format(record)
+        except (TypeError, ValueError):  # Arguments that did not survive as str()
+            record.msg, record.args = f"{record.msg} {record.args}", None
+            yield formatter.format(record)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Read arguments from a command line."""
+    parser = argparse.ArgumentParser(description="Decode binary log files to text")
+    parser.add_argument("files", nargs="+", help="Binary log files to decode")
+    parser.add_argument(
+        "--format",
+        type=str,
+        required=False,
+        default="detailed",
+        help="Formatter name from prefixed_logger_setting.yaml or a logging format string",
+    )
+    parser.add_argument(
+        "--show-logger-name",
+        action="store_true",
+        help="Add '[<logger name>]' to each line like getCustomLogger",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    fmt = get_yaml_formats().get(args.format, args.format)
+    try:
+        for path in args.files:
+            for line in decode_binary_log(path, fmt, args.show_logger_name):
+                sys.stdout.write(line + "\n")
+    except BrokenPipeError:  # e.g. piped into head
+        sys.stderr.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,584 @@
+"""
+Search the '<yyyy-mm-dd>.<name>_<level>.log' files written by PrefixedTimedRotatingFileHandler
+python -m custom_utils.log_search --start "2024-01-31 12:00" --end "2024-01-31 13:00" --logger customLogger --level ERROR
+
+Each text log gets an index in '<log dir>/.search_index/' that is kept up to date incrementally (only the lines
+appended since the last search are read):
+    blocks: byte offset of every time bucket (one minute, at most BLOCK_SIZE bytes)
+    tokens: blocks containing each logger / level / module / function / file name
+A query only reads the blocks that match its time range and fields. Files without an up to date index are
+indexed in parallel processes while the results of the first files are already streamed.
+Compressed logs are searched through the block index of LogArchiver, binary logs are not searched
+(decode them with `python -m custom_utils.log_decoder`).
+"""
+
+import os
+import re
+import sys
+import json
+import logging
+import argparse
+import concurrent.futures
+from typing import Iterator
+
+import yaml
+
+from config.logging_utils import (
+    ARCHIVE_INDEX_EXTENSION,
+    iter_archived_lines,
+    strip_archive_suffix,
+)
+
+LOGGING_YAML_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    "config",
+    "prefixed_logger_setting.yaml",
+)
+
+INDEX_DIRECTORY = ".search_index"
+INDEX_VERSION = 1
+BLOCK_SIZE = 256 * 1024  # (Bytes) A time bucket is split into blocks of about this size
+BUCKET_LENGTH = 16  # "%Y-%m-%d %H:%M", at most one minute per block
+HEAD_LENGTH = 64  # Bytes compared to detect a file replaced under the same name
+LEVEL_FILES = ["debug", "info", "warning", "error", "critical"]
+# Logger name of the '<yyyy-mm-dd>.<level>.log' files of the main logger
+MAIN_LOGGER = "main"
+TOKEN_FIELDS = ("logger", "level", "module", "func", "file")
+
+# "<asctime> | [<logger>][<levelname>][<module> - <funcName>] | " (detailed) or "[<levelname>][<filename>]" (simple),
+# '[<logger>]' is only added by getCustomLogger
+TEXT_LINE = re.compile(
+    rb"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})[,.\d]* \| (?:\[([^\]]*)\])?\[\s*([A-Z]+)\]\[([^\]]*)\] \| "
+)
+
+
+def parse_log_file_name(file_name: str) -> tuple[str, str, str | None] | None:
+    """parse_log_file_name
+    "<yyyy-mm-dd>.customLogger_error.log(.gz)" -> ("<yyyy-mm-dd>", "customLogger", "error"),
+    "<yyyy-mm-dd>.debug.log" -> ("<yyyy-mm-dd>", MAIN_LOGGER, "debug")
+
+    Returns:
+        tuple[str, str, str | None] | None: Date, logger and level of the file, None if it is not a text log
+    """
+    log_name = strip_archive_suffix(file_name)
+    parts = log_name.split(".")
+    if len(parts) != 3 or parts[2] != "log" or not parts[0][:4].isdigit():
+        return None
+    date, log_type = parts[0], parts[1]
+    if log_type in LEVEL_FILES:
+        return date, MAIN_LOGGER, log_type
+    logger_name, _, level = log_type.rpartition("_")
+    if logger_name and level in LEVEL_FILES:
+        return date, logger_name, level
+    return date, log_type, None
+
+
+def detailed_level_files(yaml_path: str = LOGGING_YAML_PATH) -> list[str]:
+    """detailed_level_files
+    Level files written with the module and function of the record ('detailed' / json formatter),
+    the 'simple' format only has the file name
+
+    Returns:
+        list[str]: Levels of LEVEL_FILES, ["debug"] if the logging yaml can not be read
+    """
+    try:
+        with open(yaml_path, "r") as f:
+            yaml_config = yaml.safe_load(f)
+        formatters = yaml_config["formatters"]
+        detailed = []
+        for level in LEVEL_FILES:
+            handler = yaml_config["handlers"].get(f"{level}_file_handler") or {}
+            formatter = formatters.get(handler.get("formatter"), {})
+            fmt = formatter.get("format", "")
+            fields = formatter.get("fields", [])
+            if ("%(module)s" in fmt and "%(funcName)s" in fmt) or (
+                "module" in fields and "funcName" in fields
+            ):
+                detailed.append(level)
+        return detailed
+    except (OSError, KeyError, TypeError, AttributeError, yaml.YAMLError):
+        return ["debug"]
+
+
+def parse_line(line: bytes, file_logger: str | None = None) -> dict | None:
+    """parse_line
+    Fields of the first line of a record in the text or JSON formats of prefixed_logger_setting.yaml
+
+    Args:
+        line (bytes): Log line
+        file_logger (str | None, optional): Logger of the file, the main logger lines have no logger name. Defaults to None.
+
+    Returns:
+        dict | None: time ("%Y-%m-%d %H:%M:%S"), level, logger, module, func, file. None for the continuation
+                     lines of a record (e.g. a traceback)
+    """
+    if line[:1] == b"{":
+        try:
+            data = json.loads(line)
+            return {
+                "time": str(data["asctime"])[:19],
+                "level": data.get("levelname"),
+                "logger": file_logger or data.get("name"),
+                "module": data.get("module"),
+                "func": data.get("funcName"),
+                "file": data.get("filename"),
+            }
+        except (ValueError, KeyError, TypeError):
+            return None
+    match = TEXT_LINE.match(line)
+    if match is None:
+        return None
+    time_text, logger_name, level, source = match.groups()
+    fields = {
+        "time": time_text.decode("ascii"),
+        "level": level.decode("ascii"),
+        "logger": logger_name.decode("utf8", "replace") if logger_name else file_logger,
+        "module": None,
+        "func": None,
+        "file": None,
+    }
+    source = source.decode("utf8", "replace").strip()
+    if " - " in source:
+        fields["module"], fields["func"] = source.split(" - ", 1)
+    else:
+        fields["file"] = source
+    return fields
+
+
+def __iter_complete_lines(
+    f, offset: int, stop: int | None = None, chunk_size: int = 1024 * 1024
+) -> Iterator[tuple[int, bytes]]:
+    """__iter_complete_lines
+    (offset, line) of every line between offset and stop that ends with a newline,
+    stops at the NUL padding of a file written by MmapPrefixedTimedRotatingFileHandler
+    """
+    f.seek(offset)
+    remaining = None if stop is None else stop - offset
+    pending = b""
+    while remaining is None or remaining > 0:
+        chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        padding = chunk.find(b"\x00")
+        if padding != -1:
+            chunk, remaining = chunk[:padding], 0
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()  # Not terminated yet
+        for line in lines:
+            yield offset, line + b"\n"
+            offset += len(line) + 1
+
+
+def __index_path(path: str) -> str:
+    directory, file_name = os.path.split(path)
+    return os.path.join(directory, INDEX_DIRECTORY, file_name + ".json")
+
+
+def __read_index(index_path: str) -> dict | None:
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == INDEX_VERSION else None
+
+
+def __new_index(head: bytes) -> dict:
+    return {
+        "version": INDEX_VERSION,
+        "head": head.hex(),
+        "end": 0,
+        "blocks": [],
+        "tokens": {},
+    }
+
+
+def update_index(path: str, rebuild: bool = False) -> dict:
+    """update_index
+    Adds the lines appended since the last update to the index of a text log,
+    the index is rebuilt when the file was replaced or truncated
+
+    Args:
+        path (str): '.log' file
+        rebuild (bool, optional): Ignore the current index. Defaults to False.
+
+    Returns:
+        dict: Index {"end": bytes indexed, "blocks": [[start time, offset]], "tokens": {"<field>:<value>": [block ids]}}
+    """
+    index_path = __index_path(path)
+    file_name_fields = parse_log_file_name(os.path.basename(path))
+    file_logger = file_name_fields[1] if file_name_fields else None
+    with open(path, "rb") as f:
+        head = f.read(HEAD_LENGTH).split(b"\x00", 1)[0]
+        size = os.fstat(f.fileno()).st_size
+        index = None if rebuild else __read_index(index_path)
+        if (
+            index is None
+            or size < index["end"]
+            or not head.startswith(bytes.fromhex(index["head"]))
+        ):
+            index = __new_index(head)
+        if size == index["end"]:
+            return index
+
+        start_end = index["end"]
+        index["head"] = head.hex()
+        blocks, tokens = index["blocks"], index["tokens"]
+        for offset, line in __iter_complete_lines(f, index["end"]):
+            index["end"] = offset + len(line)
+            fields = parse_line(line, file_logger)
+            if fields is None:  # Continuation line, stays in the block of its record
+                if not blocks:
+                    blocks.append(["", offset])
+                continue
+            last_block = blocks[-1] if blocks else None
+            if (
+                last_block is None
+                or last_block[0][:BUCKET_LENGTH] != fields["time"][:BUCKET_LENGTH]
+                or offset - last_block[1] >= BLOCK_SIZE
+            ):
+                blocks.append([fields["time"], offset])
+            block_id = len(blocks) - 1
+            for field in TOKEN_FIELDS:
+                if fields[field]:
+                    postings = tokens.setdefault(f"{field}:{fields[field]}", [])
+                    if not postings or postings[-1] != block_id:
+                        postings.append(block_id)
+
+    if index["end"] != start_end:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with open(index_path + ".tmp", "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(index_path + ".tmp", index_path)
+    return index
+
+
+def __update_index_worker(path: str, rebuild: bool) -> None:
+    update_index(path, rebuild)  # Written to disk, read again by the searching process
+
+
+def __index_is_stale(path: str) -> bool:
+    """__index_is_stale
+    Index missing or older than the last write to the log file
+    """
+    try:
+        return os.stat(__index_path(path)).st_mtime_ns < os.stat(path).st_mtime_ns
+    except OSError:
+        return True
+
+
+def __candidate_ranges(
+    index: dict, start: str | None, end: str | None, token_groups: list[list[str]]
+) -> list[tuple[int, int]]:
+    """__candidate_ranges
+    Byte ranges of the blocks that overlap start - end and contain a token of every group
+
+    Args:
+        index (dict): Index of the file
+        start (str | None): "%Y-%m-%d %H:%M:%S" or a prefix of it
+        end (str | None): "%Y-%m-%d %H:%M:%S" or a prefix of it
+        token_groups (list[list[str]]): A block matches a group if it contains any of its tokens
+
+    Returns:
+        list[tuple[int, int]]: (start, end) offsets, adjacent blocks are merged
+    """
+    blocks = index["blocks"]
+    block_ids = None
+    for tokens in token_groups:
+        postings = set()
+        for token in tokens:
+            postings.update(index["tokens"].get(token, []))
+        block_ids = postings if block_ids is None else block_ids & postings
+    if block_ids is None:
+        block_ids = range(len(blocks))
+
+    ranges = []
+    for block_id in sorted(block_ids):
+        block_start = blocks[block_id][0]
+        next_start = blocks[block_id + 1][0] if block_id + 1 < len(blocks) else None
+        if end is not None and block_start[: len(end)] > end:
+            continue
+        if (
+            start is not None
+            and next_start  # The last block may continue to the end of the day
+            and next_start[: len(start)] < start
+        ):
+            continue
+        range_start = blocks[block_id][1]
+        range_end = blocks[block_id + 1][1] if next_start is not None else index["end"]
+        if ranges and ranges[-1][1] == range_start:
+            ranges[-1] = (ranges[-1][0], range_end)
+        else:
+            ranges.append((range_start, range_end))
+    return ranges
+
+
+def __iter_records(lines: Iterator[bytes], file_logger: str | None):
+    """__iter_records
+    (fields, text) of every record, continuation lines (tracebacks) are kept with their record
+    """
+    fields, record_lines = None, []
+    for line in lines:
+        line_fields = parse_line(line, file_logger)
+        if line_fields is not None:
+            if record_lines:
+                yield fields, b"".join(record_lines)
+            fields, record_lines = line_fields, []
+        record_lines.append(line)
+    if record_lines:
+        yield fields, b"".join(record_lines)
+
+
+def select_log_files(
+    log_dir: str,
+    start: str | None = None,
+    end: str | None = None,
+    logger_name: str | None = None,
+    level: str | None = None,
+    detailed: bool = False,
+) -> list[str]:
+    """select_log_files
+    Log files that can contain the matching records, one level file per date and logger:
+    the '<level>' file of the requested level (or the closest lower one) as it also holds every higher level.
+    Indexes of removed log files are deleted.
+
+    Args:
+        log_dir (str): Directory of the log files
+        start (str | None, optional): "%Y-%m-%d %H:%M:%S" or a prefix of it. Defaults to None.
+        end (str | None, optional): "%Y-%m-%d %H:%M:%S" or a prefix of it. Defaults to None.
+        logger_name (str | None, optional): Only this logger (MAIN_LOGGER for the main logger). Defaults to None.
+        level (str | None, optional): Minimum level e.g. "ERROR". Defaults to None (DEBUG).
+        detailed (bool, optional): Only files with the module / function of the records (detailed_level_files),
+            the lower levels are then filtered by the caller. Defaults to False.
+
+    Returns:
+        list[str]: Paths sorted by date
+    """
+    wanted_level = LEVEL_FILES.index(level.lower()) if level else 0
+    detailed_keys = (
+        {LEVEL_FILES.index(name) for name in detailed_level_files()}
+        if detailed
+        else None
+    )
+    groups: dict[tuple[str, str], dict] = {}
+    names = set()
+    with os.scandir(log_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            names.add(entry.name)
+            fields = parse_log_file_name(entry.name)
+            if fields is None or entry.name.endswith((".tmp", ARCHIVE_INDEX_EXTENSION)):
+                continue
+            date, file_logger, file_level = fields
+            if start is not None and date < start[:10]:
+                continue
+            if end is not None and date > end[:10]:
+                continue
+            if logger_name is not None and file_logger != logger_name:
+                continue
+            files = groups.setdefault((date, file_logger), {})
+            key = LEVEL_FILES.index(file_level) if file_level else -1
+            # The text log is kept over its archive while it is still being compressed
+            rank = 0 if entry.name.endswith(".log") else 1
+            if key not in files or rank < files[key][0]:
+                files[key] = (rank, entry.path)
+
+    index_directory = os.path.join(log_dir, INDEX_DIRECTORY)
+    if os.path.isdir(index_directory):
+        for index_name in os.listdir(index_directory):
+            if (
+                index_name.endswith(".json")
+                and index_name.removesuffix(".json") not in names
+            ):
+                os.remove(os.path.join(index_directory, index_name))
+
+    selected = []
+    for (date, file_logger), files in sorted(groups.items()):
+        candidates = list(files)
+        if detailed_keys is not None:
+            # A lower level file with the fields is read over the level file without them
+            candidates = [key for key in files if key in detailed_keys] or candidates
+        lower = [key for key in candidates if key <= wanted_level]
+        selected.append(files[max(lower) if lower else min(candidates)][1])
+    return selected
+
+
+def search_logs(
+    log_dir: str,
+    start: str | None = None,
+    end: str | None = None,
+    logger_name: str | None = None,
+    level: str | None = None,
+    module: str | None = None,
+    func: str | None = None,
+    pattern: str | None = None,
+    workers: int | None = None,
+    rebuild: bool = False,
+) -> Iterator[tuple[str, str]]:
+    """search_logs
+    Lazily yields the matching records, files are indexed in parallel processes when needed
+
+    Args:
+        log_dir (str): Directory of the log files
+        start (str | None, optional): "%Y-%m-%d %H:%M:%S" or a prefix of it. Defaults to None.
+        end (str | None, optional): "%Y-%m-%d %H:%M:%S" or a prefix of it. Defaults to None.
+        logger_name (str | None, optional): Logger name (MAIN_LOGGER for the main logger). Defaults to None.
+        level (str | None, optional): Minimum level e.g. "ERROR". Defaults to None.
+        module (str | None, optional): Module of the 'detailed' format. Defaults to None.
+        func (str | None, optional): Function of the 'detailed' format. Defaults to None.
+        pattern (str | None, optional): Regex searched in the record text. Defaults to None.
+        workers (int | None, optional): Indexing processes, 1 indexes in this process. Defaults to None (cpu count).
+        rebuild (bool, optional): Rebuild the indexes. Defaults to False.
+
+    Yields:
+        Iterator[tuple[str, str]]: (path, record text with line endings)
+    """
+    paths = select_log_files(
+        log_dir, start, end, logger_name, level, detailed=bool(module or func)
+    )
+    min_level = logging.getLevelName(level.upper()) if level else logging.NOTSET
+    query = {"logger": logger_name, "module": module, "func": func}
+    token_groups = [[f"{field}:{value}"] for field, value in query.items() if value]
+    if level:
+        token_groups.append(
+            [
+                f"level:{name.upper()}"
+                for name in LEVEL_FILES[LEVEL_FILES.index(level.lower()) :]
+            ]
+        )
+    regex = re.compile(pattern.encode("utf8")) if pattern else None
+
+    def matches(fields: dict | None, text: bytes) -> bool:
+        if fields is None:
+            return not any(query.values()) and not level and not start and not end
+        if start is not None and fields["time"][: len(start)] < start:
+            return False
+        if end is not None and fields["time"][: len(end)] > end:
+            return False
+        if any(value and fields[field] != value for field, value in query.items()):
+            return False
+        if min_level and logging.getLevelName(fields["level"]) < min_level:
+            return False
+        return regex is None or regex.search(text) is not None
+
+    stale_paths = [
+        path
+        for path in paths
+        if path.endswith(".log") and (rebuild or __index_is_stale(path))
+    ]
+    executor = None
+    if (workers or os.cpu_count() or 1) > 1 and len(stale_paths) > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {}
+        if executor is not None:
+            pending = {
+                path: executor.submit(__update_index_worker, path, rebuild)
+                for path in stale_paths
+            }
+        for path in paths:
+            file_fields = parse_log_file_name(os.path.basename(path))
+            file_logger = file_fields[1] if file_fields else None
+            if not path.endswith(".log"):  # Archive, seeks with the LogArchiver index
+                lines = (
+                    line.encode("utf8")
+                    for line in iter_archived_lines(path, start, end)
+                )
+                records = __iter_records(lines, file_logger)
+            else:
+                if path in pending:
+                    pending.pop(path).result()
+                    index = update_index(
+                        path
+                    )  # Only reads the index written by the worker
+                else:
+                    index = update_index(path, rebuild)
+                ranges = __candidate_ranges(index, start, end, token_groups)
+                records = __iter_file_ranges(path, ranges, file_logger)
+            for fields, text in records:
+                if matches(fields, text):
+                    yield path, text.decode("utf8", "replace")
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def __iter_file_ranges(
+    path: str, ranges: list[tuple[int, int]], file_logger: str | None
+):
+    with open(path, "rb") as f:
+        for range_start, range_end in ranges:
+            lines = (
+                line for _, line in __iter_complete_lines(f, range_start, range_end)
+            )
+            yield from __iter_records(lines, file_logger)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Read arguments from a command line."""
+    parser = argparse.ArgumentParser(description="Search the text log files")
+    parser.add_argument(
+        "--log-dir", type=str, default="./data/logs", help="Directory of the log files"
+    )
+    parser.add_argument(
+        "--start", type=str, help='From "YYYY-MM-DD HH:MM:SS" (or a prefix)'
+    )
+    parser.add_argument(
+        "--end", type=str, help='Until "YYYY-MM-DD HH:MM:SS" (or a prefix)'
+    )
+    parser.add_argument(
+        "--logger",
+        type=str,
+        help=f"Logger name, '{MAIN_LOGGER}' for the '<date>.<level>.log' files of the main logger",
+    )
+    parser.add_argument(
+        "--level",
+        type=str,
+        choices=[level.upper() for level in LEVEL_FILES],
+        help="Minimum level",
+    )
+    parser.add_argument("--module", type=str, help="Module of the 'detailed' format")
+    parser.add_argument("--func", type=str, help="Function of the 'detailed' format")
+    parser.add_argument("--grep", type=str, help="Regex searched in the record text")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes indexing new files (default cpu count)",
+    )
+    parser.add_argument("--reindex", action="store_true", help="Rebuild the indexes")
+    parser.add_argument(
+        "--show-file", action="store_true", help="Prefix each record with its file name"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    results = search_logs(
+        args.log_dir,
+        start=args.start,
+        end=args.end,
+        logger_name=args.logger,
+        level=args.level,
+        module=args.module,
+        func=args.func,
+        pattern=args.grep,
+        workers=args.workers,
+        rebuild=args.reindex,
+    )
+    try:
+        for path, text in results:
+            if args.show_file:
+                text = f"{os.path.basename(path)}: {text}"
+            sys.stdout.write(text)
+    except BrokenPipeError:  # e.g. piped into head
+        sys.stderr.close()
+
+
+if __name__ == "__main__":
+    main()
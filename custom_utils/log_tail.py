@@ -0,0 +1,399 @@
+"""
+Follow the five level files of a logger at once (tail -f), merged by time without duplicates
+python -m custom_utils.log_tail --logger customLogger --level WARNING --grep "timeout|refused"
+
+A record is written to every level file up to its level, it is shown once (matched by time, level and message,
+so the 'detailed' and 'simple' files of the same record are one record).
+The files of the next '<yyyy-mm-dd>.' prefix are picked up after a rollover, the old files are read to the end first.
+One thread polls every file with large reads (regular files are always 'ready' for select / poll,
+so the loop checks the file sizes and sleeps longer while nothing is written).
+Level / regex filters run on the raw bytes and the records are written to stdout without decoding them.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import heapq
+import logging
+import argparse
+from collections import OrderedDict
+from typing import Iterator
+
+from custom_utils.log_search import LEVEL_FILES, MAIN_LOGGER, parse_log_file_name
+
+READ_SIZE = 1024 * 1024  # (Bytes) Largest read of a file per poll
+HISTORY_RECORD_SIZE = 1024  # (Bytes) Read back per record of --lines when starting
+# "<asctime> | [<logger>][<levelname>][<module> - <funcName> / <filename>] | <message>"
+RECORD_HEADER = re.compile(
+    rb"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}[,.]?\d*) \| (?:\[[^\]]*\])?\[\s*([A-Z]+)\]\[[^\]]*\] \| "
+)
+LEVEL_NUMBERS = {
+    name.upper().encode("ascii"): logging.getLevelName(name.upper())
+    for name in LEVEL_FILES
+}
+
+
+def parse_record_header(line: bytes) -> tuple[bytes, bytes, bytes] | None:
+    """parse_record_header
+    Time, level and message of the first line of a record, in the text or JSON formats
+
+    Returns:
+        tuple[bytes, bytes, bytes] | None: None for the continuation lines of a record (e.g. a traceback)
+    """
+    if line[:1] == b"{":
+        try:
+            data = json.loads(line)
+            return (
+                str(data["asctime"]).encode("utf8"),
+                str(data.get("levelname", "")).encode("utf8"),
+                str(data.get("message", "")).encode("utf8"),
+            )
+        except (ValueError, KeyError, TypeError):
+            return None
+    match = RECORD_HEADER.match(line)
+    if match is None:
+        return None
+    return match.group(1), match.group(2), line[match.end() :]
+
+
+class FollowedFile:
+    """FollowedFile
+    Open level file with the read position and the record that may still get continuation lines
+    """
+
+    def __init__(self, path: str, level: str, position: int = 0):
+        self.path = path
+        self.level = level
+        self.fd = os.open(path, os.O_RDONLY)
+        self.inode = os.fstat(self.fd).st_ino
+        self.position = position
+        self.partial = b""  # Line without its newline yet
+        self.record = []  # Lines of the last record
+        self.record_header = None
+        self.record_read_at = 0.0
+        # Ended on the NUL padding of MmapPrefixedTimedRotatingFileHandler
+        self.padded = False
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def data_end(fd: int, size: int) -> int:
+    """data_end
+    End of the data of a file, before the NUL padding a memory mapped log file keeps while it is open
+    """
+    if size == 0 or os.pread(fd, 1, size - 1) != b"\x00":
+        return size
+    low, high = 0, size - 1  # The padding is one run of NULs at the end
+    while low < high:
+        middle = (low + high) // 2
+        if os.pread(fd, 1, middle) == b"\x00":
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+class LogFollower:
+    """LogFollower
+    Follows the level files of one logger and yields its records once, in time order
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        logger_name: str = MAIN_LOGGER,
+        level: str | None = None,
+        pattern: str | None = None,
+        history: int = 10,
+        merge_delay: float = 0.5,
+        poll_interval: float = 0.05,
+        max_poll_interval: float = 1.0,
+        rescan_interval: float = 1.0,
+        dedupe_window: float = 60.0,
+    ):
+        """__init__
+
+        Args:
+            log_dir (str): Directory of the log files
+            logger_name (str, optional): Logger name, MAIN_LOGGER for the '<date>.<level>.log' files. Defaults to MAIN_LOGGER.
+            level (str | None, optional): Minimum level, lower level files are not read. Defaults to None (DEBUG).
+            pattern (str | None, optional): Regex the record has to contain. Defaults to None.
+            history (int, optional): Records shown from before the start. Defaults to 10.
+            merge_delay (float, optional): (Seconds) Records are held this long to be merged in time order. Defaults to 0.5.
+            poll_interval (float, optional): (Seconds) Sleep after a poll without new data, doubled while idle. Defaults to 0.05.
+            max_poll_interval (float, optional): (Seconds) Longest sleep while idle. Defaults to 1.0.
+            rescan_interval (float, optional): (Seconds) Checks the directory for the files of a rollover. Defaults to 1.0.
+            dedupe_window (float, optional): (Seconds) Records are remembered this long to drop their copies in
+                                             the other level files. Defaults to 60.0.
+        """
+        self.log_dir = log_dir
+        self.logger_name = logger_name
+        self.min_level = logging.getLevelName(level.upper()) if level else logging.DEBUG
+        self.levels = [
+            name
+            for name in LEVEL_FILES
+            if logging.getLevelName(name.upper()) >= self.min_level
+        ]
+        self.regex = re.compile(pattern.encode("utf8")) if pattern else None
+        self.history = history
+        self.merge_delay = merge_delay
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.rescan_interval = rescan_interval
+        self.dedupe_window = dedupe_window
+        self.files: dict[str, FollowedFile] = {}
+        # (time, level, message) -> [read at, records shown, {level file: records read}]
+        self.seen = OrderedDict()
+        self.heap = []  # (time, sequence, read at, record)
+        self.sequence = 0
+        self.stopped = False
+
+    def latest_files(self) -> dict[str, str]:
+        """latest_files
+        Returns:
+            dict[str, str]: Level to the path of its newest '<yyyy-mm-dd>.' file
+        """
+        latest = {}
+        with os.scandir(self.log_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".log"):
+                    continue
+                fields = parse_log_file_name(entry.name)
+                if fields is None or fields[1] != self.logger_name:
+                    continue
+                date, _, level = fields
+                if level in self.levels and date > latest.get(level, ("",))[0]:
+                    latest[level] = (date, entry.path)
+        return {level: path for level, (_, path) in latest.items()}
+
+    def rescan(self, start: bool = False) -> None:
+        """rescan
+        Opens the level files created since the last scan, a file replaced by a newer one
+        (rollover / re-created) is read to its end and closed first
+        """
+        for level, path in self.latest_files().items():
+            followed = self.files.get(level)
+            if followed is not None:
+                try:
+                    same_file = (
+                        followed.path == path and os.stat(path).st_ino == followed.inode
+                    )
+                except FileNotFoundError:
+                    same_file = False
+                if same_file:
+                    continue
+                self.read(followed)
+                self.flush_record(followed, force=True)
+                followed.close()
+            position = 0
+            try:
+                followed = FollowedFile(path, level)
+            except FileNotFoundError:  # Removed by retention in the meantime
+                continue
+            if start:
+                end = data_end(followed.fd, os.fstat(followed.fd).st_size)
+                position = max(0, end - self.history * HISTORY_RECORD_SIZE)
+                if position:  # Start on a line
+                    before = os.pread(followed.fd, HISTORY_RECORD_SIZE, position - 1)
+                    newline = before.find(b"\n")
+                    position = position + newline if newline != -1 else end
+                followed.position = position
+            self.files[level] = followed
+
+    def read(self, followed: FollowedFile) -> int:
+        """read
+        Reads the new data of a file in large reads
+
+        Returns:
+            int: Bytes read
+        """
+        total = 0
+        while True:
+            if followed.padded:  # Probe for data written over the padding
+                chunk = os.pread(followed.fd, 4096, followed.position)
+                if not chunk or chunk[0] == 0:
+                    break
+            size = os.fstat(followed.fd).st_size
+            if size < followed.position:  # Truncated / replaced, start again
+                followed.position, followed.partial = 0, b""
+            if size == followed.position and not followed.padded:
+                break
+            chunk = os.pread(followed.fd, READ_SIZE, followed.position)
+            if not chunk:
+                break
+            padding = chunk.find(b"\x00")
+            followed.padded = padding != -1
+            if followed.padded:
+                chunk = chunk[:padding]
+            followed.position += len(chunk)
+            total += len(chunk)
+            self.add_lines(followed, chunk)
+            if followed.padded or len(chunk) < READ_SIZE:
+                break
+        return total
+
+    def add_lines(self, followed: FollowedFile, chunk: bytes) -> None:
+        lines = (followed.partial + chunk).split(b"\n")
+        followed.partial = lines.pop()
+        now = time.monotonic()
+        for line in lines:
+            header = parse_record_header(line)
+            if header is not None or not followed.record:
+                self.flush_record(followed, force=True)
+                followed.record_header = header
+            followed.record.append(line + b"\n")
+            followed.record_read_at = now
+
+    def flush_record(self, followed: FollowedFile, force: bool = False) -> None:
+        """flush_record
+        Queues the last record of a file, without force only once it had time to get its continuation lines
+        """
+        if not followed.record:
+            return
+        now = time.monotonic()
+        if not force and now - followed.record_read_at < self.merge_delay:
+            return
+        lines, header = followed.record, followed.record_header
+        followed.record, followed.record_header = [], None
+        record = b"".join(lines)
+        if header is not None:
+            record_level = LEVEL_NUMBERS.get(header[1], logging.NOTSET)
+            if record_level and record_level < self.min_level:
+                return
+        if self.regex is not None and self.regex.search(record) is None:
+            return
+        if header is not None:
+            key = (header[0], header[1], header[2] + record[len(lines[0]) :])
+            seen = self.seen.get(key)
+            if seen is None:
+                seen = self.seen[key] = [now, 0, {}]
+            seen[2][followed.level] = seen[2].get(followed.level, 0) + 1
+            if seen[2][followed.level] <= seen[1]:
+                return  # Copy of a record already read from another level file
+            seen[1] += 1
+        self.sequence += 1
+        record_time = header[0] if header is not None else b""
+        heapq.heappush(self.heap, (record_time, self.sequence, now, record))
+
+    def ready_records(self, flush: bool = False) -> list[bytes]:
+        """ready_records
+        Records read at least merge_delay ago, in time order
+        """
+        for followed in self.files.values():
+            self.flush_record(followed, force=flush)
+        now = time.monotonic()
+        records = []
+        while self.heap and (flush or now - self.heap[0][2] >= self.merge_delay):
+            records.append(heapq.heappop(self.heap)[3])
+        while self.seen:  # Forget records older than the dedupe window
+            key, seen = next(iter(self.seen.items()))
+            if now - seen[0] < self.dedupe_window:
+                break
+            self.seen.popitem(last=False)
+        return records
+
+    def follow(self) -> Iterator[list[bytes]]:
+        """follow
+        Yields the records (with line endings) that are ready after each poll until stop() is called
+        """
+        self.rescan(start=True)
+        for followed in self.files.values():
+            self.read(followed)
+        # Only the last 'history' records from before the start
+        history = (
+            self.ready_records(flush=True)[-self.history :] if self.history else []
+        )
+        if history:
+            yield history
+
+        interval = self.poll_interval
+        last_scan = time.monotonic()
+        while not self.stopped:
+            read = sum(self.read(followed) for followed in self.files.values())
+            if time.monotonic() - last_scan >= self.rescan_interval:
+                self.rescan()
+                last_scan = time.monotonic()
+            records = self.ready_records()
+            if records:
+                yield records
+            if read:
+                interval = self.poll_interval
+            else:
+                time.sleep(
+                    interval if not self.heap else min(interval, self.merge_delay)
+                )
+                interval = min(interval * 2, self.max_poll_interval)
+        records = self.ready_records(flush=True)
+        if records:
+            yield records
+
+    def stop(self) -> None:
+        self.stopped = True
+
+    def close(self) -> None:
+        for followed in self.files.values():
+            followed.close()
+        self.files.clear()
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Read arguments from a command line."""
+    parser = argparse.ArgumentParser(description="Follow the level files of a logger")
+    parser.add_argument(
+        "--log-dir", type=str, default="./data/logs", help="Directory of the log files"
+    )
+    parser.add_argument(
+        "--logger",
+        type=str,
+        default=MAIN_LOGGER,
+        help=f"Logger name, '{MAIN_LOGGER}' for the '<date>.<level>.log' files of the main logger",
+    )
+    parser.add_argument(
+        "--level",
+        type=str,
+        choices=[level.upper() for level in LEVEL_FILES],
+        help="Minimum level",
+    )
+    parser.add_argument("--grep", type=str, help="Regex the record has to contain")
+    parser.add_argument(
+        "-n",
+        "--lines",
+        type=int,
+        default=10,
+        help="Records shown from before the start",
+    )
+    parser.add_argument(
+        "--merge-delay",
+        type=float,
+        default=0.5,
+        help="(Seconds) Records are held this long to be merged in time order",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    follower = LogFollower(
+        args.log_dir,
+        logger_name=args.logger,
+        level=args.level,
+        pattern=args.grep,
+        history=args.lines,
+        merge_delay=args.merge_delay,
+    )
+    output = sys.stdout.buffer
+    try:
+        for records in follower.follow():
+            output.write(b"".join(records))
+            output.flush()
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+    finally:
+        follower.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,519 @@
 import os
-import glob
+import re
 import json
+import mmap
+import time
+import heapq
+import fnmatch
+import threading
+import itertools
+import contextlib
+import concurrent.futures
+from collections import OrderedDict
+from typing import IO, Any, Callable, Iterable, Iterator
 
+# Fastest JSON decoder available, orjson also parses a memoryview without a copy
+# (and is stricter than json, NaN / Infinity are not accepted)
+try:
+    import orjson
 
-def get_folder_files(path, extension="*.txt", reverse=True):
-    path = path + "/" + extension
-    list_of_files = glob.glob(path)  # * means all if need specific format then *.csv
-    list_of_files.sort(key=os.path.getmtime, reverse=reverse)
-    return list_of_files
+    json_decode = orjson.loads
+except ImportError:
+    orjson = None
 
+    def json_decode(data: bytes | bytearray | memoryview) -> Any:
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
 
-def check_create_folder(path):
-    if os.path.exists(path):
-        return path
+
+__folder_files_cache = OrderedDict()  # (folder, extension, recursive) -> listing
+__FOLDER_FILES_CACHE_SIZE = 64
+__folder_files_cache_lock = threading.Lock()
+__known_folders: set[str] = set()  # Folders that exist, created / seen by this process
+__json_cache = OrderedDict()  # path -> (mtime_ns, size, data)
+__JSON_CACHE_BYTES = 64 * 1024 * 1024  # Total size of the cached files
+__json_cache_bytes = 0
+__json_cache_lock = threading.Lock()
+# A file / folder modified this recently is not cached, a change in the same mtime tick would be missed
+__MTIME_CACHE_SETTLE = 1.0  # (Seconds)
+# Files larger than this are parsed from an mmap by load_json_folder
+__JSON_MMAP_SIZE = 1024 * 1024
+
+
+def __name_matcher(extension: str) -> Callable[[str], re.Match | None]:
+    """__name_matcher
+    Match of a file name against a glob pattern, hidden files only match a pattern starting with '.' (as glob)
+    """
+    pattern = fnmatch.translate(extension)
+    if not extension.startswith("."):
+        pattern = r"(?!\.)" + pattern
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile(pattern, flags).match
+
+
+def __scan_folder(
+    folder: str,
+    match: Callable[[str], re.Match | None],
+    with_mtime: bool,
+    with_folders: bool = False,
+) -> tuple[list[tuple[float, str]], list[str], int]:
+    """__scan_folder
+    One os.scandir pass, the file type comes from the directory entry and the mtime from DirEntry.stat
+    (no extra stat per file on Windows)
+
+    Returns:
+        tuple[list[tuple[float, str]], list[str], int]: (mtime, path) of the matching files, sub folders, folder mtime_ns
+    """
+    files, folders = [], []
+    try:
+        folder_mtime = os.stat(folder).st_mtime_ns
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                name = entry.name
+                try:
+                    if match(name) is not None and entry.is_file():
+                        mtime = entry.stat().st_mtime if with_mtime else 0.0
+                        files.append((mtime, entry.path))
+                    elif (
+                        with_folders
+                        and name[0] != "."
+                        and entry.is_dir(follow_symlinks=False)
+                    ):
+                        folders.append(entry.path)
+                except FileNotFoundError:  # Removed while scanning
+                    continue
+    except (FileNotFoundError, NotADirectoryError):
+        return [], [], -1
+    return files, folders, folder_mtime
+
+
+def __scan_tree(
+    path: str,
+    match: Callable[[str], re.Match | None],
+    with_mtime: bool,
+    workers: int | None,
+) -> tuple[list[tuple[float, str]], dict[str, int]]:
+    """__scan_tree
+    Scans path and every sub folder, each folder is scanned in a thread pool as soon as it is found
+
+    Returns:
+        tuple[list[tuple[float, str]], dict[str, int]]: (mtime, path) of the matching files, mtime_ns of every folder
+    """
+    files, folder_mtimes = [], {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(__scan_folder, path, match, with_mtime, True): path}
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                folder = pending.pop(future)
+                folder_files, sub_folders, folder_mtime = future.result()
+                files.extend(folder_files)
+                folder_mtimes[folder] = folder_mtime
+                for sub_folder in sub_folders:
+                    future = executor.submit(
+                        __scan_folder, sub_folder, match, with_mtime, True
+                    )
+                    pending[future] = sub_folder
+    return files, folder_mtimes
+
+
+def __folder_mtimes_unchanged(folder_mtimes: dict[str, int]) -> bool:
+    for folder, folder_mtime in folder_mtimes.items():
+        try:
+            if os.stat(folder).st_mtime_ns != folder_mtime:
+                return False
+        except OSError:
+            if folder_mtime != -1:
+                return False
+    return True
+
+
+def __list_folder_files(
+    path: str,
+    extension: str,
+    with_mtime: bool,
+    cache: bool,
+    recursive: bool,
+    workers: int | None,
+) -> list[tuple[float, str]]:
+    key = (os.path.abspath(path), extension, recursive)
+    with __folder_files_cache_lock:
+        cached = __folder_files_cache.get(key) if cache else None
+    if cached is not None and __folder_mtimes_unchanged(cached[1]):
+        with __folder_files_cache_lock:
+            if key in __folder_files_cache:
+                __folder_files_cache.move_to_end(key)
+        return cached[0]
+
+    scanned = time.time()
+    match = __name_matcher(extension)
+    if recursive:
+        files, folder_mtimes = __scan_tree(path, match, with_mtime or cache, workers)
     else:
-        os.makedirs(path)  # Creates all sub directories as needed
-        return path
+        files, _, folder_mtime = __scan_folder(path, match, with_mtime or cache)
+        folder_mtimes = {path: folder_mtime}
+
+    if cache and all(
+        scanned - folder_mtime / 1e9 > __MTIME_CACHE_SETTLE
+        for folder_mtime in folder_mtimes.values()
+    ):
+        files.sort()  # Later sorts of the cached listing are linear
+        with __folder_files_cache_lock:
+            __folder_files_cache[key] = (files, folder_mtimes)
+            __folder_files_cache.move_to_end(key)
+            while len(__folder_files_cache) > __FOLDER_FILES_CACHE_SIZE:
+                __folder_files_cache.popitem(last=False)
+    return files
+
+
+def get_folder_files(
+    path: str,
+    extension: str = "*.txt",
+    reverse: bool | None = True,
+    lazy: bool = False,
+    top_k: int | None = None,
+    cache: bool = False,
+    recursive: bool = False,
+    workers: int | None = None,
+) -> list[str] | Iterator[str]:
+    """get_folder_files
+    Files of a folder matching a glob pattern ordered by modified time, from one os.scandir pass
+
+    Args:
+        path (str): Folder
+        extension (str, optional): Glob pattern of the file names (*.csv). Defaults to "*.txt".
+        reverse (bool | None, optional): Newest first, None keeps the directory order without any stat. Defaults to True.
+        lazy (bool, optional): Return a generator, the order is kept with a heap so the first files come without a full sort. Defaults to False.
+        top_k (int | None, optional): Only the first top_k files of the order, selected with a heap. Defaults to None.
+        cache (bool, optional): Reuse the listing of an earlier call while the mtime of the folder (and its sub folders when recursive)
+            is unchanged. A file created / removed / renamed changes it, a file rewritten in place does not. Defaults to False.
+        recursive (bool, optional): Also the files of the sub folders (hidden folders and symlinks are skipped). Defaults to False.
+        workers (int | None, optional): Threads scanning the sub folders when recursive. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        list[str] | Iterator[str]: File paths, [] if the folder does not exist
+    """
+    files = __list_folder_files(
+        path, extension, reverse is not None, cache, recursive, workers
+    )
+    if reverse is None:
+        paths = (file_path for _, file_path in files)
+        if top_k is not None:
+            paths = itertools.islice(paths, top_k)
+        return paths if lazy else list(paths)
+
+    if top_k is not None:
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        selected = [file_path for _, file_path in select(top_k, files)]
+        return iter(selected) if lazy else selected
+    if lazy:
+        return __iter_ordered(files, reverse)
+    return [file_path for _, file_path in sorted(files, reverse=reverse)]
+
+
+def __iter_ordered(files: list[tuple[float, str]], reverse: bool) -> Iterator[str]:
+    """__iter_ordered
+    Yields the paths in mtime order, heapify is O(n) and every file after is O(log n)
+    """
+    heap = [(-mtime, file_path) for mtime, file_path in files] if reverse else files[:]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[1]
+
+
+def clear_folder_files_cache() -> None:
+    with __folder_files_cache_lock:
+        __folder_files_cache.clear()
+
+
+def __ensure_folder(folder: str) -> None:
+    """__ensure_folder
+    mkdir first and handle the errors (no exists check that can race), a missing parent is created the same way.
+    An existing folder costs one syscall, a folder of a known parent one mkdir
+    """
+    if folder in __known_folders:
+        return
+    try:
+        os.mkdir(folder)
+    except FileExistsError:
+        if not os.path.isdir(folder):
+            raise
+    except FileNotFoundError:
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            raise
+        __ensure_folder(parent)
+        try:
+            os.mkdir(folder)
+        except FileExistsError:  # Created by another process / thread meanwhile
+            if not os.path.isdir(folder):
+                raise
+    __known_folders.update(__parent_folders(folder))  # The parents exist too
+
+
+def __parent_folders(folder: str) -> list[str]:
+    """__parent_folders
+    The folder and every folder above it
+    """
+    folders = [folder]
+    while os.path.dirname(folders[-1]) != folders[-1]:
+        folders.append(os.path.dirname(folders[-1]))
+    return folders
+
+
+def ensure_folders(*paths: str) -> list[str]:
+    """ensure_folders
+    Creates every folder (with its parents) that does not exist yet, exist_ok semantics and safe to run
+    from several processes at once. Folders created / seen by this process are remembered and not checked again,
+    forget_folders() clears that if folders are removed while the process runs
+
+    Args:
+        *paths (str): Folders
+
+    Returns:
+        list[str]: Absolute paths of the folders
+    """
+    folders = [os.path.abspath(path) for path in paths]
+    for folder in sorted(set(folders)):  # Parents before their sub folders
+        __ensure_folder(folder)
+    return folders
+
+
+def forget_folders() -> None:
+    __known_folders.clear()
+
+
+def ensure_paths(folders: Iterable[str] = (), files: Iterable[str] = ()) -> None:
+    """ensure_paths
+    Creates a whole tree in one batch, the folders and the folders of the files first,
+    then every missing file empty (O_EXCL, an existing file is never truncated)
+
+    Args:
+        folders (Iterable[str], optional): Folders. Defaults to ().
+        files (Iterable[str], optional): Files. Defaults to ().
+    """
+    files = [os.path.abspath(path) for path in files]
+    ensure_folders(*folders, *{os.path.dirname(path) for path in files})
+    for path in files:
+        try:
+            with open(path, "x"):
+                pass
+        except FileExistsError:
+            continue
+
+
+def check_create_folder(path):
+    ensure_folders(path)
+    return path
 
 
 def check_create_file(path):
-    if os.path.exists(path):
-        return path
-    else:
-        folder = os.path.dirname(path)
-        check_create_file(folder)  # make sure folder for file exists
-        with open(path, "w") as _:  # create empty new file
+    ensure_paths(files=[path])
+    return path
+
+
+@contextlib.contextmanager
+def atomic_write(
+    path: str, mode: str = "w", encoding: str | None = None, durable: bool = False
+) -> Iterator[IO]:
+    """atomic_write
+    Writes a temporary file next to path and renames it over path when the block succeeds,
+    readers / other workers see the old file or the complete new one, never a partial write.
+    The temporary file is hidden ('.<name>.<random>.tmp') so get_folder_files does not list it
+
+    Args:
+        path (str): File to write, its folder is created if needed
+        mode (str, optional): "w" or "wb". Defaults to "w".
+        encoding (str | None, optional): Text encoding. Defaults to None.
+        durable (bool, optional): fsync the file and its folder so the rename survives a power loss. Defaults to False.
+
+    Yields:
+        Iterator[IO]: File object of the temporary file
+    """
+    if mode not in ("w", "wb"):
+        raise Exception(f"atomic_write mode '{mode}' is not 'w' or 'wb'")
+    path = os.path.abspath(path)
+    folder, name = os.path.split(path)
+    ensure_folders(folder)
+    while True:
+        temp_path = os.path.join(folder, f".{name}.{os.urandom(4).hex()}.tmp")
+        try:  # 0o666 & ~umask like open(), not the 0o600 of tempfile
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            break
+        except FileExistsError:
+            continue
+        except FileNotFoundError:  # Folder removed since this process created it
+            __known_folders.difference_update(__parent_folders(folder))
+            __ensure_folder(folder)
+    try:
+        with open(fd, mode, encoding=encoding) as temp_file:
+            yield temp_file
+            if durable:
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
             pass
+        raise
+    if durable and os.name != "nt":  # Folders can not be opened on Windows
+        folder_fd = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(folder_fd)
+        finally:
+            os.close(folder_fd)
+
+
+def atomic_write_text(path: str, text: str, encoding: str = "utf8") -> None:
+    with atomic_write(path, "w", encoding=encoding) as f:
+        f.write(text)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    with atomic_write(path, "wb") as f:
+        f.write(data)
+
+
+def atomic_write_json(path: str, data: Any, indent: int | None = None) -> None:
+    with atomic_write(path, "w", encoding="utf8") as f:
+        json.dump(data, f, indent=indent)
+
+
+def json_to_dict(path: str, cache: bool = False) -> Any:
+    """json_to_dict
+    Parses a JSON file with json.load, optionally memoised by its mtime and size.
+    Both paths use the same decoder, so the result and the errors (json.JSONDecodeError) do not depend on cache
+
+    Args:
+        path (str): JSON file
+        cache (bool, optional): Return the data of an earlier call while the mtime and size of the file are unchanged,
+            the cached data is shared between the calls and must not be modified. Defaults to False.
 
+    Returns:
+        Any: Parsed JSON
+    """
+    if not cache:
+        with open(path) as json_file:
+            json_data = json.load(json_file)
+        return json_data
 
-def json_to_dict(path):
-    with open(path) as json_file:
-        json_data = json.load(json_file)
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    with __json_cache_lock:
+        cached = __json_cache.get(key)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            __json_cache.move_to_end(key)
+            return cached[2]
+    with open(key) as json_file:
+        json_data = json.load(json_file)  # Same decoder as without the cache
+    if (
+        time.time() - stat.st_mtime > __MTIME_CACHE_SETTLE
+        and stat.st_size <= __JSON_CACHE_BYTES
+    ):
+        __cache_json(key, (stat.st_mtime_ns, stat.st_size, json_data))
     return json_data
+
+
+def __cache_json(key: str, entry: tuple[int, int, Any]) -> None:
+    """__cache_json
+    Adds to the json cache, the least recently used files are evicted above __JSON_CACHE_BYTES
+    """
+    global __json_cache_bytes
+    with __json_cache_lock:
+        previous = __json_cache.pop(key, None)
+        if previous is not None:
+            __json_cache_bytes -= previous[1]
+        __json_cache[key] = entry
+        __json_cache_bytes += entry[1]
+        while __json_cache_bytes > __JSON_CACHE_BYTES:
+            __json_cache_bytes -= __json_cache.popitem(last=False)[1][1]
+
+
+def clear_json_cache() -> None:
+    global __json_cache_bytes
+    with __json_cache_lock:
+        __json_cache.clear()
+        __json_cache_bytes = 0
+
+
+def iter_json_lines(path: str, skip_invalid: bool = False) -> Iterator[Any]:
+    """iter_json_lines
+    Parses a JSON Lines file one line at a time, only one line is held in memory
+
+    Args:
+        path (str): JSON Lines file, blank lines are skipped
+        skip_invalid (bool, optional): Skip lines that are not valid JSON instead of raising. Defaults to False.
+
+    Yields:
+        Iterator[Any]: Parsed value of every line
+    """
+    with open(path, "rb") as json_file:
+        for line_number, line in enumerate(json_file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json_decode(line)
+            except ValueError as e:
+                if skip_invalid:
+                    continue
+                raise Exception(f"Invalid JSON at {path}:{line_number}: {e}") from e
+
+
+def json_from_mmap(path: str) -> Any:
+    """json_from_mmap
+    Parses a large JSON file from a read only mmap, with orjson the pages are parsed in place
+    without reading the file into a bytes copy first (the json fallback needs one copy)
+
+    Args:
+        path (str): JSON file
+
+    Returns:
+        Any: Parsed JSON
+    """
+    with open(path, "rb") as json_file:
+        if os.fstat(json_file.fileno()).st_size == 0:
+            return json_decode(b"")  # Raises the decoder error of an empty document
+        with mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return json_decode(view)
+
+
+def __load_json_file(path: str) -> Any:
+    if os.path.getsize(path) > __JSON_MMAP_SIZE:
+        return json_from_mmap(path)
+    with open(path, "rb") as json_file:
+        return json_decode(json_file.read())
+
+
+def load_json_folder(
+    path: str,
+    extension: str = "*.json",
+    workers: int | None = None,
+    recursive: bool = False,
+) -> dict[str, Any]:
+    """load_json_folder
+    Parses every JSON file of a folder in a process pool, the parsed data is pickled back to this process
+    so it pays off for many / large files (parsing is the bulk of the work)
+
+    Args:
+        path (str): Folder
+        extension (str, optional): Glob pattern of the file names. Defaults to "*.json".
+        workers (int | None, optional): Processes, 1 parses in this process. Defaults to the cpu count.
+        recursive (bool, optional): Also the files of the sub folders. Defaults to False.
+
+    Returns:
+        dict[str, Any]: File path to parsed JSON, in directory order
+    """
+    files = get_folder_files(path, extension, reverse=None, recursive=recursive)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        return {file_path: __load_json_file(file_path) for file_path in files}
+    workers = min(workers, len(files))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        chunk_size = max(1, len(files) // (workers * 4))
+        return dict(
+            zip(files, executor.map(__load_json_file, files, chunksize=chunk_size))
+        )
@@ -1,8 +1,15 @@
 import os
 import time
 import signal
+import threading
 
-from config.settings import ENV_CONFIG, logger, getCustomLogger
+from config.settings import (
+    ENV_CONFIG,
+    logger,
+    getCustomLogger,
+    reload_logging,
+    shutdown_logging,
+)
 from config.logging_utils import LoggingColours
 
 
@@ -12,6 +19,7 @@ customLogger = getCustomLogger(
 
 
 def exit_functions():
+    shutdown_logging()  # Flush queued / buffered logs, os._exit skips atexit
     print("Goodbye cruel world")
 
 
@@ -34,9 +42,17 @@ def exit_gracefully(signum, frame):
     signal.signal(signal.SIGINT, exit_gracefully)
 
 
+def reload_config(signum, frame):
+    # Reload on a thread, the signal may arrive while this thread is writing a record
+    threading.Thread(target=reload_logging, name="logging_reload").start()
+
+
 if __name__ == "__main__":
     original_sigint = signal.getsignal(signal.SIGINT)
     signal.signal(signal.SIGINT, exit_gracefully)
+    # `kill -HUP <pid>` applies .env / logging yaml changes (not available on Windows)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, reload_config)
     for key, value in ENV_CONFIG.items():
         logger.info(f"{key}|{value}")
 
@@ -0,0 +1,63 @@
+"""
+Benchmark PrefixedTimedRotatingFileHandler with and without buffered writes
+python -m tests.bench_buffered_writes --records 100000
+"""
+
+import os
+import argparse
+import logging
+
+from config.logging_utils import PrefixedTimedRotatingFileHandler
+from tests.bench_utils import (
+    isolated_logger,
+    load_yaml_formats,
+    print_results,
+    temp_log_dir,
+    time_records,
+    write_syscalls,
+)
+
+FLUSH_POLICIES = {
+    "unbuffered (flush every record)": {},
+    "buffer_records=100": {"buffer_records": 100},
+    "buffer_size=64KB": {"buffer_size": 65536},
+    "buffer_size=1MB": {"buffer_size": 1048576},
+    "flush_interval=1s": {"flush_interval": 1},
+}
+
+
+def run(records: int) -> dict[str, float]:
+    detailed_format = load_yaml_formats()["detailed"]
+    results = {}
+    for name, policy in FLUSH_POLICIES.items():
+        with temp_log_dir() as log_dir:
+            handler = PrefixedTimedRotatingFileHandler(
+                filename=os.path.join(log_dir, "bench_debug.log"),
+                when="midnight",
+                backupCount=31,
+                encoding="utf8",
+                level="DEBUG",
+                **policy,
+            )
+            handler.setFormatter(logging.Formatter(detailed_format))
+            bench_logger = isolated_logger("bench_buffered", handler)
+
+            syscalls_before = write_syscalls()
+            results[name] = time_records(
+                lambda i: bench_logger.debug("Benchmark record %d", i), records
+            )
+            handler.close()
+            syscalls_after = write_syscalls()
+            if syscalls_before is not None:
+                print(
+                    f"  {name:<40} {syscalls_after - syscalls_before:>10,} write syscalls"
+                )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buffered file write benchmark")
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    print_results("DEBUG records to one level file", run(args.records))
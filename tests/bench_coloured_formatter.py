@@ -0,0 +1,131 @@
+"""
+Micro benchmark of ColouredLoggingFormatter.format against the previous str.replace implementation,
+the output of both is compared first for every yaml format (logger name added by getCustomLogger or '%(name)s')
+python -m tests.bench_coloured_formatter --records 200000
+"""
+
+import time
+import argparse
+import logging
+
+from config.logging_utils import ColouredLoggingFormatter, LoggingColours
+from tests.bench_utils import LEVEL_MIX, load_yaml_formats, print_results
+
+LOGGER_NAME = "customLogger"
+
+
+class ReplaceColouredLoggingFormatter(logging.Formatter):
+    """ReplaceColouredLoggingFormatter
+    Previous ColouredLoggingFormatter.format, colours injected with str.replace after formatting
+    """
+
+    def __init__(self, fmt, logger_name, logger_colour, colour_level):
+        super().__init__(fmt)
+        self.logger_name = logger_name
+        self.logger_colour = logger_colour
+        self.colour_level = colour_level
+        self.level_colour_mapping = {
+            logging.CRITICAL: LoggingColours.RED_BG,
+            logging.ERROR: LoggingColours.BOLD_RED,
+            logging.WARNING: LoggingColours.YELLOW,
+            logging.INFO: LoggingColours.GREY,
+            logging.DEBUG: LoggingColours.GREY,
+        }
+
+    def format(self, record):
+        log_message = super().format(record)
+        colour = self.level_colour_mapping[record.levelno]
+        if self.colour_level == "level":
+            log_message = log_message.replace(
+                record.levelname, colour + record.levelname + LoggingColours.RESET, 1
+            )
+            log_message = log_message.replace(
+                self.logger_name,
+                self.logger_colour + self.logger_name + LoggingColours.RESET,
+                1,
+            )
+        elif self.colour_level == "line":
+            log_message = colour + log_message + LoggingColours.RESET
+            log_message = log_message.replace(
+                self.logger_name,
+                self.logger_colour + self.logger_name + LoggingColours.RESET + colour,
+                1,
+            )
+        return log_message
+
+
+def make_records(count: int) -> list[logging.LogRecord]:
+    return [
+        logging.LogRecord(
+            LOGGER_NAME,
+            LEVEL_MIX[i % len(LEVEL_MIX)],
+            __file__,
+            i,
+            "Benchmark record %d",
+            (i,),
+            None,
+            "bench_function",
+        )
+        for i in range(count)
+    ]
+
+
+def check_same_output(records) -> None:
+    """check_same_output
+    Raises if the coloured lines differ from the previous implementation
+    """
+    for format_name, yaml_fmt in load_yaml_formats().items():
+        for fmt in [yaml_fmt, yaml_fmt.replace(" | ", f" | [{LOGGER_NAME}]", 1)]:
+            for colour_level in ["level", "line"]:
+                before = ReplaceColouredLoggingFormatter(
+                    fmt, LOGGER_NAME, LoggingColours.BLUE, colour_level
+                )
+                after = ColouredLoggingFormatter(
+                    fmt, LOGGER_NAME, LoggingColours.BLUE, colour_level, {}
+                )
+                for record in records:
+                    if before.format(record) != after.format(record):
+                        raise Exception(
+                            f"'{format_name}' ({colour_level}) differs: "
+                            f"{before.format(record)!r} != {after.format(record)!r}"
+                        )
+    print("[check] Coloured output is the same as before for every yaml format")
+
+
+def lines_per_second(formatter: logging.Formatter, records, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for record in records:
+            formatter.format(record)
+        best = min(best, time.perf_counter() - start)
+    return len(records) / best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ColouredLoggingFormatter benchmark")
+    parser.add_argument("--records", type=int, default=200000)
+    args = parser.parse_args()
+
+    fmt = load_yaml_formats()["detailed"].replace(" | ", f" | [{LOGGER_NAME}]", 1)
+    records = make_records(args.records)
+    check_same_output(records[: len(LEVEL_MIX)])
+    for colour_level in ["level", "line"]:
+        print_results(
+            f"colour_level='{colour_level}'",
+            {
+                "before (format + str.replace)": lines_per_second(
+                    ReplaceColouredLoggingFormatter(
+                        fmt, LOGGER_NAME, LoggingColours.BLUE, colour_level
+                    ),
+                    records,
+                ),
+                "after (precompiled level formats)": lines_per_second(
+                    ColouredLoggingFormatter(
+                        fmt, LOGGER_NAME, LoggingColours.BLUE, colour_level, {}
+                    ),
+                    records,
+                ),
+            },
+            unit="lines/s",
+        )
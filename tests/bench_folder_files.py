@@ -0,0 +1,108 @@
+"""
+Listing of a large folder with custom_utils.path_utils.get_folder_files against the previous glob + getmtime sort.
+python -m tests.bench_folder_files --files 100000 --top-k 10
+"""
+
+import os
+import glob
+import time
+import argparse
+
+from custom_utils.path_utils import clear_folder_files_cache, get_folder_files
+from tests.bench_utils import temp_log_dir
+
+
+def glob_folder_files(path, extension="*.txt", reverse=True):
+    """Previous get_folder_files, one stat per file after the glob"""
+    list_of_files = glob.glob(path + "/" + extension)
+    list_of_files.sort(key=os.path.getmtime, reverse=reverse)
+    return list_of_files
+
+
+def create_files(path: str, files: int, folders: int) -> None:
+    for i in range(files):
+        folder = os.path.join(path, f"part_{i % folders}") if folders else path
+        if i < folders:
+            os.makedirs(folder, exist_ok=True)
+        file_name = os.path.join(folder, f"{i:07d}.csv")
+        with open(file_name, "w"):
+            pass
+        os.utime(file_name, (1_600_000_000 + i, 1_600_000_000 + i))
+    settled = time.time() - 60  # Older than the settle time of the cache
+    for directory, _, _ in os.walk(path):
+        os.utime(directory, (settled, settled))
+
+
+def best_time(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Read arguments from a command line."""
+    parser = argparse.ArgumentParser(description="get_folder_files benchmark")
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--folders", type=int, default=64, help="Sub folders of the recursive run"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    with (
+        temp_log_dir(prefix="bench_folder_files_") as flat,
+        temp_log_dir(prefix="bench_folder_tree_") as tree,
+    ):
+        create_files(flat, args.files, 0)
+        create_files(tree, args.files, args.folders)
+        expected = glob_folder_files(flat, "*.csv")
+        assert get_folder_files(flat, "*.csv") == expected
+        assert (
+            get_folder_files(flat, "*.csv", top_k=args.top_k) == expected[: args.top_k]
+        )
+
+        cases = {
+            "glob + getmtime sort": lambda: glob_folder_files(flat, "*.csv"),
+            "scandir sort": lambda: get_folder_files(flat, "*.csv"),
+            "scandir directory order": lambda: get_folder_files(
+                flat, "*.csv", reverse=None
+            ),
+            f"scandir top {args.top_k}": lambda: get_folder_files(
+                flat, "*.csv", top_k=args.top_k
+            ),
+            "scandir lazy first file": lambda: next(
+                get_folder_files(flat, "*.csv", lazy=True)
+            ),
+            "scandir cached": lambda: get_folder_files(flat, "*.csv", cache=True),
+            f"glob ** ({args.folders} folders)": lambda: sorted(
+                glob.glob(tree + "/**/*.csv", recursive=True),
+                key=os.path.getmtime,
+                reverse=True,
+            ),
+            f"scandir recursive ({args.folders} folders)": lambda: get_folder_files(
+                tree, "*.csv", recursive=True
+            ),
+            "scandir recursive cached": lambda: get_folder_files(
+                tree, "*.csv", recursive=True, cache=True
+            ),
+        }
+        print(f"{args.files:,} files")
+        baseline = None
+        for name, function in cases.items():
+            clear_folder_files_cache()
+            if "cached" in name:
+                function()  # Fills the cache
+            elapsed = best_time(function, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{name:<36} {elapsed * 1000:>9.1f} ms {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
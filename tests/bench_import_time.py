@@ -0,0 +1,72 @@
+"""
+Startup cost of the config package, measured with `python -X importtime` in a fresh interpreter per run
+python -m tests.bench_import_time --repeat 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+from tests.bench_utils import print_results
+
+project_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+SCENARIOS = {
+    "import config": "import config",
+    "import config.settings": "import config.settings",
+    "import config.logging_utils": "import config.logging_utils",
+    "from config.settings import ENV_CONFIG": "from config.settings import ENV_CONFIG",
+    "getCustomLogger('bench')": "from config.settings import getCustomLogger; getCustomLogger('bench')",
+}
+
+
+def import_time(statement: str) -> tuple[float, float, list[tuple[int, str]]]:
+    """import_time
+    Runs the statement in a new interpreter with -X importtime
+
+    Returns:
+        tuple[float, float, list[tuple[int, str]]]: (Import microseconds, wall microseconds, (cumulative us, module) of the top level imports)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=project_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = (time.perf_counter() - start) * 1e6
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        if not module.startswith("  "):  # Not imported by another module
+            top_level.append((int(cumulative), module.strip()))
+    return sum(us for us, _ in top_level), wall, top_level
+
+
+def run(repeat: int, top: int) -> tuple[dict[str, float], dict[str, float]]:
+    import_results, wall_results = {}, {}
+    for name, statement in SCENARIOS.items():
+        runs = [import_time(statement) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r[0])
+        import_results[name] = best[0]
+        wall_results[name] = min(r[1] for r in runs)
+        slowest = sorted(best[2], reverse=True)[:top]
+        print(f"  {name}: " + ", ".join(f"{m} {us:,}us" for us, m in slowest))
+    return import_results, wall_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="config package import time benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    import_results, wall_results = run(args.repeat, args.top)
+    print_results("Import time (-X importtime cumulative)", import_results, unit="us")
+    print_results("Wall time (interpreter start to exit)", wall_results, unit="us")
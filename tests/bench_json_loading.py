@@ -0,0 +1,150 @@
+"""
+Throughput and memory of the JSON loaders of custom_utils.path_utils against json.load.
+Memory is the tracemalloc peak of Python allocations, the pages of an mmap are not counted (they are the page cache).
+python -m tests.bench_json_loading --records 500000 --files 2000
+"""
+
+import os
+import json
+import time
+import argparse
+import tracemalloc
+
+from custom_utils import path_utils
+from tests.bench_utils import temp_log_dir
+
+
+def write_corpus(path: str, records: int, files: int) -> tuple[str, str, str]:
+    """write_corpus
+    Returns:
+        tuple[str, str, str]: Large JSON file, JSON Lines file with the same records, folder of small JSON files
+    """
+    rows = [
+        {
+            "id": i,
+            "name": f"item_{i}",
+            "price": i * 0.25,
+            "tags": ["a", "b", str(i % 7)],
+            "active": i % 3 == 0,
+        }
+        for i in range(records)
+    ]
+    large_file = os.path.join(path, "large.json")
+    with open(large_file, "w") as f:
+        json.dump(rows, f)
+    lines_file = os.path.join(path, "large.jsonl")
+    with open(lines_file, "w") as f:
+        f.writelines(json.dumps(row) + "\n" for row in rows)
+    folder = os.path.join(path, "configs")
+    os.makedirs(folder)
+    per_file = max(1, records // files)
+    for i in range(files):
+        with open(os.path.join(folder, f"{i:05d}.json"), "w") as f:
+            json.dump({"rows": rows[i * per_file : (i + 1) * per_file]}, f)
+    settled = time.time() - 60  # Older than the settle time of the json cache
+    for directory, _, file_names in os.walk(path):
+        for file_name in file_names:
+            os.utime(os.path.join(directory, file_name), (settled, settled))
+    return large_file, lines_file, folder
+
+
+def measure(function) -> tuple[float, int]:
+    """measure
+    Returns:
+        tuple[float, int]: Seconds and tracemalloc peak bytes of one call
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def timed(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def read_decode(path: str):
+    with open(path, "rb") as f:
+        return path_utils.json_decode(f.read())
+
+
+def count_lines(path: str) -> int:
+    return sum(1 for _ in path_utils.iter_json_lines(path))
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Read arguments from a command line."""
+    parser = argparse.ArgumentParser(description="JSON loading benchmark")
+    parser.add_argument("--records", type=int, default=500000)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processes of load_json_folder"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    decoder = "orjson" if path_utils.orjson else "json"
+    with temp_log_dir(prefix="bench_json_") as work_dir:
+        large_file, lines_file, folder = write_corpus(
+            work_dir, args.records, args.files
+        )
+        size_mb = os.path.getsize(large_file) / 1e6
+        print(f"{args.records:,} records, {size_mb:.1f} MB, decoder {decoder}")
+        print(f"{'case':<40} {'seconds':>9} {'MB/s':>8} {'peak MB':>9}")
+        cases = {
+            "json_to_dict (json.load)": lambda: path_utils.json_to_dict(large_file),
+            f"read + {decoder}.loads": lambda: read_decode(large_file),
+            "json_from_mmap": lambda: path_utils.json_from_mmap(large_file),
+            "iter_json_lines (streamed count)": lambda: count_lines(lines_file),
+        }
+        for name, function in cases.items():
+            timed(function, 1)  # Page cache warm
+            elapsed = timed(function, args.repeat)
+            _, peak = measure(function)
+            print(
+                f"{name:<40} {elapsed:>9.3f} {size_mb / elapsed:>8.1f} {peak / 1e6:>9.1f}"
+            )
+
+        print(f"\n{args.files:,} files of {folder}")
+        folder_cases = {
+            "json_to_dict loop": lambda: [
+                path_utils.json_to_dict(file_path)
+                for file_path in path_utils.get_folder_files(
+                    folder, "*.json", reverse=None
+                )
+            ],
+            "load_json_folder workers=1": lambda: path_utils.load_json_folder(
+                folder, workers=1
+            ),
+            f"load_json_folder workers={args.workers or os.cpu_count()}": (
+                lambda: path_utils.load_json_folder(folder, workers=args.workers)
+            ),
+            "json_to_dict loop cached": lambda: [
+                path_utils.json_to_dict(file_path, cache=True)
+                for file_path in path_utils.get_folder_files(
+                    folder, "*.json", reverse=None
+                )
+            ],
+        }
+        baseline = None
+        for name, function in folder_cases.items():
+            function()  # Page cache warm, fills the json cache
+            elapsed = timed(function, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{name:<40} {elapsed:>9.3f} {baseline / elapsed:>7.1f}x")
+        path_utils.clear_json_cache()
+
+
+if __name__ == "__main__":
+    main()
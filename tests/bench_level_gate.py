@@ -0,0 +1,86 @@
+"""
+Cost of a disabled debug call on a logger whose handlers all start at INFO
+python -m tests.bench_level_gate --records 1000000
+"""
+
+import os
+import argparse
+import logging
+
+from config.logging_utils import PrefixedTimedRotatingFileHandler, apply_level_gate
+from tests.bench_utils import print_results, temp_log_dir, time_records
+
+LEVELS = ["info", "warning", "error", "critical"]
+
+
+def build_logger(name: str, log_dir: str) -> logging.Logger:
+    """build_logger
+    Logger at NOTSET with five INFO+ handlers, like getCustomLogger before the level was applied
+    """
+    bench_logger = logging.getLogger(name)
+    bench_logger.propagate = False
+    for level in LEVELS:
+        handler = PrefixedTimedRotatingFileHandler(
+            filename=os.path.join(log_dir, f"{name}_{level}.log"),
+            when="midnight",
+            backupCount=31,
+            encoding="utf8",
+            level=level.upper(),
+            delay=True,
+        )
+        handler.setLevel(level.upper())
+        bench_logger.addHandler(handler)
+    console = logging.StreamHandler(open(os.devnull, "w"))
+    console.setLevel(logging.INFO)
+    bench_logger.addHandler(console)
+    return bench_logger
+
+
+def run(records: int) -> dict[str, float]:
+    results = {}
+    payload = {"user": 1234, "items": list(range(10))}
+    with temp_log_dir() as log_dir:
+        not_set = build_logger("bench_gate_notset", log_dir)
+        logging.root.setLevel(
+            logging.DEBUG
+        )  # Every record is created and offered to the handlers
+        results["logger NOTSET, handlers drop it"] = time_records(
+            lambda i: not_set.debug("Benchmark record %d %s", i, payload), records
+        )
+
+        levelled = build_logger("bench_gate_level", log_dir)
+        levelled.setLevel(
+            logging.INFO
+        )  # Minimum handler level, as getCustomLogger sets it
+        results["logger level INFO"] = time_records(
+            lambda i: levelled.debug("Benchmark record %d %s", i, payload), records
+        )
+        results["logger level INFO, f-string"] = time_records(
+            lambda i: levelled.debug(f"Benchmark record {i} {payload}"), records
+        )
+
+        gated = build_logger("bench_gate_gated", log_dir)
+        gated.setLevel(logging.INFO)
+        apply_level_gate(gated)
+        results["level gate (no-op method)"] = time_records(
+            lambda i: gated.debug("Benchmark record %d %s", i, payload), records
+        )
+        results["level gate, f-string"] = time_records(
+            lambda i: gated.debug(f"Benchmark record {i} {payload}"), records
+        )
+        results["guard, f-string"] = time_records(
+            lambda i: gated.debug_enabled and gated.debug(f"Record {i} {payload}"),
+            records,
+        )
+        for bench_logger in [not_set, levelled, gated]:
+            for handler in bench_logger.handlers:
+                handler.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Disabled debug call benchmark")
+    parser.add_argument("--records", type=int, default=1000000)
+    args = parser.parse_args()
+
+    print_results("Disabled DEBUG calls", run(args.records), unit="calls/s")
@@ -0,0 +1,83 @@
+"""
+Flood of repeated messages from a hot loop (like main.py) through the five level files,
+without a filter and with each of RateLimitFilter / SamplingFilter / DuplicateFilter
+python -m tests.bench_log_filters --records 50000
+"""
+
+import argparse
+
+from config.logging_utils import (
+    DuplicateFilter,
+    RateLimitFilter,
+    SamplingFilter,
+    MultiLevelFileHandler,
+)
+from tests.bench_multi_level_handler import build_file_handlers
+from tests.bench_utils import (
+    LEVEL_MIX,
+    folder_size,
+    isolated_logger,
+    print_results,
+    temp_log_dir,
+    time_records,
+)
+
+FILTERS = {
+    "no filter": lambda: None,
+    "RateLimitFilter (10/s, burst 50)": lambda: RateLimitFilter(rate=10, burst=50),
+    "SamplingFilter (10%)": lambda: SamplingFilter(rate=0.1),
+    "DuplicateFilter (10s window)": lambda: DuplicateFilter(window=10),
+}
+
+
+def run(records: int, attach: str, combine: bool) -> tuple[dict, dict]:
+    """run
+    Args:
+        records (int): Records logged per filter
+        attach (str): 'logger' or 'handler' (one filter shared by the five level files)
+        combine (bool): Write the level files through one MultiLevelFileHandler
+
+    Returns:
+        tuple[dict, dict]: Records per second and bytes written by filter name
+    """
+    results, written = {}, {}
+    for name, build_filter in FILTERS.items():
+        with temp_log_dir() as log_dir:
+            handlers = build_file_handlers(log_dir)
+            log_filter = build_filter()
+            if log_filter is not None and attach == "handler":
+                for handler in handlers:
+                    handler.addFilter(log_filter)
+            if combine:
+                handlers = [MultiLevelFileHandler(handlers)]
+            bench_logger = isolated_logger(f"bench_filter_{attach}", *handlers)
+            if log_filter is not None and attach == "logger":
+                bench_logger.addFilter(log_filter)
+
+            def log_function(i):
+                bench_logger.log(LEVEL_MIX[i % len(LEVEL_MIX)], "Processed item %d", i)
+
+            results[name] = time_records(log_function, records, repeat=1)
+            if log_filter is not None:
+                log_filter.close()  # Pending "N similar messages" summaries
+            for handler in handlers:
+                handler.close()
+            bench_logger.filters.clear()
+            written[name] = folder_size(log_dir)
+            if log_filter is not None:
+                print(f"  {name}: {log_filter.stats()}")
+    return results, written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log flood filter benchmark")
+    parser.add_argument("--records", type=int, default=50000)
+    args = parser.parse_args()
+
+    for attach, combine in [("logger", False), ("handler", True)]:
+        title = f"Filter on the {attach}" + (
+            ", MultiLevelFileHandler" if combine else ", 5 level files"
+        )
+        results, written = run(args.records, attach, combine)
+        print_results(title, results)
+        print_results(f"{title} (bytes written)", written, unit="bytes")
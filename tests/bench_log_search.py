@@ -0,0 +1,130 @@
+"""
+Query 31 days of level files with custom_utils.log_search against scanning every line (like grep)
+python -m tests.bench_log_search --days 31 --lines 20000
+"""
+
+import os
+import re
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from custom_utils.log_search import LEVEL_FILES, search_logs
+from tests.bench_utils import print_results, temp_log_dir
+
+FUNCTIONS = [("worker", "process_item"), ("api", "handle_request"), ("db", "query")]
+
+
+def write_day(log_dir: str, day: datetime, logger_name: str | None, lines: int):
+    """write_day
+    One day of the five level files of a logger in the 'detailed' format, sorted by time
+    """
+    prefix = f"{logger_name}_" if logger_name else ""
+    name_field = f"[{logger_name}]" if logger_name else ""
+    files = {
+        level: open(
+            os.path.join(log_dir, f"{day:%Y-%m-%d}.{prefix}{level}.log"),
+            "w",
+            encoding="utf8",
+        )
+        for level in LEVEL_FILES
+    }
+    seconds = sorted(random.randrange(86400) for _ in range(lines))
+    for i, second in enumerate(seconds):
+        level = random.choices(range(5), weights=[60, 30, 7, 2, 1])[0]
+        module, func = random.choice(FUNCTIONS)
+        created = day + timedelta(seconds=second)
+        line = (
+            f"{created:%Y-%m-%d %H:%M:%S},{i % 1000:03d} | {name_field}[{LEVEL_FILES[level].upper():>8}]"
+            f"[{module} - {func}] | Processed item {i} in {random.random():.3f}s\n"
+        )
+        for file_level in range(level + 1):
+            files[LEVEL_FILES[file_level]].write(line)
+    for f in files.values():
+        f.close()
+
+
+def full_scan(
+    log_dir: str, start: str, end: str, logger_name: str, func: str | None = None
+) -> int:
+    """full_scan
+    Reads every line of every file, the way the logs were searched before
+
+    Returns:
+        int: Distinct matching records (a record is in every level file up to its level)
+    """
+    func_pattern = re.escape(func) if func else r"[^\]]*"
+    line_pattern = re.compile(
+        rf"^(\S+ \S+),\d+ \| \[{logger_name}\]\[\s*(ERROR|CRITICAL)\]\[[^\]]* - {func_pattern}\]"
+    )
+    matches = set()
+    for file_name in sorted(os.listdir(log_dir)):
+        path = os.path.join(log_dir, file_name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, "r", encoding="utf8") as f:
+            for line in f:
+                match = line_pattern.match(line)
+                if match and start <= match.group(1) <= end:
+                    matches.add(line)
+    return len(matches)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indexed log search benchmark")
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument(
+        "--lines", type=int, default=20000, help="Records per day and logger"
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    first_day = datetime(2024, 1, 1)
+    last_day = first_day + timedelta(days=args.days - 1)
+    query_day = f"{first_day + timedelta(days=args.days // 2):%Y-%m-%d}"
+    queries = {
+        "one hour": (f"{query_day} 12:00:00", f"{query_day} 12:59:59", None),
+        "every day, func=query": (
+            f"{first_day:%Y-%m-%d} 00:00:00",
+            f"{last_day:%Y-%m-%d} 23:59:59",
+            "query",
+        ),
+    }
+    with temp_log_dir() as log_dir:
+        for day_offset in range(args.days):
+            day = first_day + timedelta(days=day_offset)
+            for logger_name in [None, "customLogger"]:
+                write_day(log_dir, day, logger_name, args.lines)
+
+        for query_name, (start, end, func) in queries.items():
+
+            def indexed_query() -> int:
+                results = search_logs(
+                    log_dir,
+                    start=start,
+                    end=end,
+                    logger_name="customLogger",
+                    level="ERROR",
+                    func=func,
+                )
+                return sum(1 for _ in results)
+
+            timings, counts = {}, {}
+            for name, query in [
+                (
+                    "full scan of every file",
+                    lambda: full_scan(log_dir, start, end, "customLogger", func),
+                ),
+                ("log_search (builds the indexes)", indexed_query),
+                ("log_search (indexed)", indexed_query),
+            ]:
+                started = time.perf_counter()
+                counts[name] = query()
+                timings[name] = 1 / (time.perf_counter() - started)
+            print_results(
+                f"ERROR+ records of customLogger, {query_name} ({args.days} days), "
+                f"matches {list(counts.values())}",
+                timings,
+                unit="queries/s",
+            )
@@ -0,0 +1,77 @@
+"""
+Benchmark the memory mapped writer against the stream writer of PrefixedTimedRotatingFileHandler
+python -m tests.bench_mmap_writes --records 100000
+"""
+
+import os
+import argparse
+import logging
+
+from config.logging_utils import (
+    MmapPrefixedTimedRotatingFileHandler,
+    PrefixedTimedRotatingFileHandler,
+)
+from tests.bench_utils import (
+    isolated_logger,
+    load_yaml_formats,
+    print_results,
+    temp_log_dir,
+    time_records,
+    write_syscalls,
+)
+
+WRITERS = {
+    "stream (flush every record)": (PrefixedTimedRotatingFileHandler, {}),
+    "stream buffer_size=64KB": (
+        PrefixedTimedRotatingFileHandler,
+        {"buffer_size": 65536},
+    ),
+    "mmap chunk=1MB": (
+        MmapPrefixedTimedRotatingFileHandler,
+        {"mmap_chunk_size": 1048576},
+    ),
+    "mmap chunk=4MB": (
+        MmapPrefixedTimedRotatingFileHandler,
+        {"mmap_chunk_size": 4194304},
+    ),
+}
+
+
+def run(records: int) -> dict[str, float]:
+    detailed_format = load_yaml_formats()["detailed"]
+    results = {}
+    for name, (handler_class, options) in WRITERS.items():
+        with temp_log_dir() as log_dir:
+            handler = handler_class(
+                filename=os.path.join(log_dir, "bench_debug.log"),
+                when="midnight",
+                backupCount=31,
+                encoding="utf8",
+                level="DEBUG",
+                **options,
+            )
+            handler.setFormatter(logging.Formatter(detailed_format))
+            bench_logger = isolated_logger("bench_mmap", handler)
+
+            syscalls_before = write_syscalls()
+            results[name] = time_records(
+                lambda i: bench_logger.debug("Benchmark record %d", i), records
+            )
+            handler.close()
+            syscalls_after = write_syscalls()
+            size = os.path.getsize(handler.baseFilename)
+            syscalls = (
+                f"{syscalls_after - syscalls_before:>10,} write syscalls"
+                if syscalls_before is not None
+                else ""
+            )
+            print(f"  {name:<40} {size:>12,} bytes {syscalls}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory mapped file write benchmark")
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    print_results("DEBUG records to one level file", run(args.records))
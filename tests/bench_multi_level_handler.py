@@ -0,0 +1,83 @@
+"""
+Benchmark five PrefixedTimedRotatingFileHandler per logger against one MultiLevelFileHandler
+python -m tests.bench_multi_level_handler --records 50000
+"""
+
+import os
+import argparse
+import logging
+
+from config.logging_utils import MultiLevelFileHandler, PrefixedTimedRotatingFileHandler
+from tests.bench_utils import (
+    LEVEL_MIX,
+    isolated_logger,
+    load_yaml_formats,
+    print_results,
+    temp_log_dir,
+    time_records,
+)
+
+# Same level / formatter layout as the '<LOG_TYPE>_file_handler' in the yaml
+FILE_LAYOUT = {
+    "debug": "detailed",
+    "info": "simple",
+    "warning": "simple",
+    "error": "simple",
+    "critical": "detailed",
+}
+
+
+def build_file_handlers(log_dir: str) -> list[PrefixedTimedRotatingFileHandler]:
+    formats = load_yaml_formats()
+    handlers = []
+    for level, formatter in FILE_LAYOUT.items():
+        handler = PrefixedTimedRotatingFileHandler(
+            filename=os.path.join(log_dir, f"bench_{level}.log"),
+            when="midnight",
+            interval=1,
+            backupCount=31,
+            encoding="utf8",
+            level=level.upper(),
+        )
+        handler.setLevel(level.upper())
+        handler.setFormatter(logging.Formatter(formats[formatter]))
+        handlers.append(handler)
+    return handlers
+
+
+def run(records: int, level_mix: list[int]) -> dict[str, float]:
+    results = {}
+    for name, combine in [
+        ("5x PrefixedTimedRotatingFileHandler", False),
+        ("MultiLevelFileHandler", True),
+    ]:
+        with temp_log_dir() as log_dir:
+            handlers = build_file_handlers(log_dir)
+            if combine:
+                handlers = [MultiLevelFileHandler(handlers)]
+            bench_logger = isolated_logger(f"bench_{combine}", *handlers)
+
+            def log_function(i):
+                bench_logger.log(
+                    level_mix[i % len(level_mix)], "Benchmark record %d", i
+                )
+
+            results[name] = time_records(log_function, records)
+            for handler in handlers:
+                handler.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MultiLevelFileHandler benchmark")
+    parser.add_argument("--records", type=int, default=50000)
+    args = parser.parse_args()
+
+    print_results(
+        "Mixed levels (60% debug / 30% info / 10% warning)",
+        run(args.records, LEVEL_MIX),
+    )
+    print_results(
+        "Critical only (written to all five files)",
+        run(args.records, [logging.CRITICAL]),
+    )
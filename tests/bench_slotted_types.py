@@ -0,0 +1,108 @@
+"""
+Slotted classes of custom_types.slottedType against DotDict and plain dicts:
+attribute reads, from_dict / to_dict and the memory of many instances (tracemalloc).
+python -m tests.bench_slotted_types --instances 1000000
+"""
+
+import gc
+import timeit
+import argparse
+import tracemalloc
+
+from custom_types.sampleDictType import DotDict, SampleDict, SampleDictType
+from custom_types.slottedType import slotted_class
+
+FrozenSampleDict = slotted_class(SampleDictType, frozen=True)
+SHARED_LIST = [1, 2, 3]  # Values shared by every instance, only the containers differ
+
+
+def make_record(i: int) -> dict:
+    return {
+        "string": "hello",
+        "integer": i,
+        "float": 1.5,
+        "boolean": True,
+        "list": SHARED_LIST,
+        "dictionary": {"test": "test", "nested": "nested"},
+    }
+
+
+def instances_memory(build, instances: int) -> float:
+    """instances_memory
+    Returns:
+        float: Bytes per instance (with its nested dict / object) held after building them
+    """
+    gc.collect()
+    tracemalloc.start()
+    held = [build(make_record(i)) for i in range(instances)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    gc.collect()
+    return size / instances
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Read arguments from a command line."""
+    parser = argparse.ArgumentParser(description="Slotted class benchmark")
+    parser.add_argument("--instances", type=int, default=1000000)
+    parser.add_argument("--reads", type=int, default=2000000)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    record = make_record(1000)
+    objects = {
+        "dict": dict(record),
+        "DotDict": DotDict(record),
+        "SampleDict": SampleDict.from_dict(record),
+        "SampleDict frozen": FrozenSampleDict.from_dict(record),
+    }
+    reads = {
+        "dict": ('value["integer"]', 'value["dictionary"]["test"]'),
+        "DotDict": ("value.integer", 'value.dictionary["test"]'),
+        "SampleDict": ("value.integer", "value.dictionary.test"),
+        "SampleDict frozen": ("value.integer", "value.dictionary.test"),
+    }
+    print(f"{'attribute reads':<20} {'top level ns':>13} {'nested ns':>10}")
+    for name, value in objects.items():
+        timings = [
+            min(timeit.repeat(statement, globals={"value": value}, number=args.reads))
+            / args.reads
+            * 1e9
+            for statement in reads[name]
+        ]
+        print(f"{name:<20} {timings[0]:>13.1f} {timings[1]:>10.1f}")
+
+    conversions = {
+        "dict(data)": lambda: dict(record),
+        "DotDict(data)": lambda: DotDict(record),
+        "SampleDict.from_dict": lambda: SampleDict.from_dict(record),
+        "frozen from_dict": lambda: FrozenSampleDict.from_dict(record),
+        "SampleDict(**) nested": lambda: SampleDict(
+            **{**record, "dictionary": objects["SampleDict"].dictionary}
+        ),
+        "SampleDict.to_dict": objects["SampleDict"].to_dict,
+    }
+    print(f"\n{'conversion':<24} {'ns':>8}")
+    for name, function in conversions.items():
+        elapsed = min(timeit.repeat(function, number=args.reads // 10, repeat=3))
+        print(f"{name:<24} {elapsed / (args.reads // 10) * 1e9:>8.1f}")
+
+    builders = {
+        "dict": dict,
+        "DotDict": DotDict,
+        "SampleDict": SampleDict.from_dict,
+        "SampleDict frozen": FrozenSampleDict.from_dict,
+    }
+    print(f"\n{args.instances:,} instances {'bytes each':>12} {'MB total':>9}")
+    for name, build in builders.items():
+        per_instance = instances_memory(build, args.instances)
+        print(
+            f"{name:<20} {per_instance:>12.0f} {per_instance * args.instances / 1e6:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
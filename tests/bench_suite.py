@@ -0,0 +1,328 @@
+"""
+Throughput / latency benchmark of the project loggers (logger_init and getCustomLogger) with the yaml file handlers.
+Every combination of the options runs in its own process (own log directory, peak RSS and syscall counters),
+a rollover of every file handler is forced half way through each run.
+python -m tests.bench_suite --records 20000 --threads 1 4 --sizes 128 --colour level line none --output bench.json
+python -m tests.bench_suite --compare bench.json  # Ratios against an earlier run (e.g. another commit)
+
+The .env of the project is not read, options are set with LOGGING_<OPTION> environment variables.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+import subprocess
+import threading
+import traceback
+from array import array
+
+from tests.bench_utils import LEVEL_MIX, temp_log_dir, write_syscalls
+
+project_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+LEVEL_MIXES = {
+    "mixed": LEVEL_MIX,  # 60% debug / 30% info / 10% warning
+    "info": [20],
+    "error": [40],  # Written to four level files
+}
+PIPELINES = {  # LOGGING_<OPTION> of the yaml 'pipeline' section
+    "default": {},
+    "queue": {"LOGGING_QUEUE": "True", "LOGGING_QUEUE_MAXSIZE": "0"},
+    "multi_level_files": {"LOGGING_MULTI_LEVEL_FILES": "True"},
+}
+SCENARIO_FIELDS = ["logger", "colour", "threads", "size", "mix", "pipeline"]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[
+        min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    ]
+
+
+def peak_rss() -> int | None:
+    """peak_rss
+    Returns:
+        int | None: Peak resident memory of this process in bytes (None on Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # KiB on Linux
+
+
+def folder_bytes(path: str) -> int:
+    total = 0
+    for directory, _, file_names in os.walk(path):
+        total += sum(
+            os.path.getsize(os.path.join(directory, name)) for name in file_names
+        )
+    return total
+
+
+def file_handlers(bench_logger) -> list:
+    """file_handlers
+    Handlers of the logger that roll over, behind the queue / multi level wrappers
+    """
+    from config import settings
+
+    pipelines = {
+        pipeline.queue_handler: pipeline for pipeline in settings.queue_pipelines
+    }
+    pending, handlers = list(bench_logger.handlers), []
+    while pending:
+        handler = pending.pop()
+        if handler in pipelines:
+            pending.extend(pipelines[handler].handlers)
+            continue
+        pending.extend(getattr(handler, "sinks", []))
+        if hasattr(handler, "rolloverAt"):
+            handlers.append(handler)
+    return handlers
+
+
+def run_scenario(scenario: dict, records: int, rollover: bool) -> dict:
+    """run_scenario
+    Runs in the child process, the working directory is an empty temporary directory
+    """
+    from config import settings
+    from config.logging_utils import LoggingColours
+
+    if scenario["logger"] == "custom":
+        bench_logger = settings.getCustomLogger(
+            "benchLogger",
+            colour_logging_level=scenario["colour"],
+            text_colour=LoggingColours.BLUE,
+        )
+    else:
+        bench_logger = settings.logger_init(
+            settings.ENV_CONFIG.LOGGING_LEVEL,
+            colour_logging_level=scenario["colour"],
+        )
+    levels = LEVEL_MIXES[scenario["mix"]]
+    message = "x" * scenario["size"]
+    threads = scenario["threads"]
+    per_thread = records // threads
+    latencies = [array("q") for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+    rollover_at = per_thread // 2 if rollover else -1
+
+    def worker(thread_id: int) -> None:
+        thread_latencies = latencies[thread_id]
+        log = bench_logger.log
+        clock = time.perf_counter_ns
+        barrier.wait()
+        for i in range(per_thread):
+            if i == rollover_at and thread_id == 0:
+                for handler in file_handlers(bench_logger):
+                    handler.rolloverAt = 0  # The next record rolls the file over
+            started = clock()
+            log(levels[i % len(levels)], "record %d %s", i, message)
+            thread_latencies.append(clock() - started)
+
+    syscalls_before = write_syscalls()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    emitted = time.perf_counter() - started
+    settings.shutdown_logging()  # Queued / buffered records are written
+    elapsed = time.perf_counter() - started
+    syscalls_after = write_syscalls()
+
+    all_latencies = sorted(itertools.chain.from_iterable(latencies))
+    return {
+        "records": per_thread * threads,
+        "records_per_second": per_thread * threads / elapsed,
+        "emit_records_per_second": per_thread * threads / emitted,
+        "latency_ns": {
+            "p50": percentile(all_latencies, 0.5),
+            "p99": percentile(all_latencies, 0.99),
+            "p999": percentile(all_latencies, 0.999),
+            "max": all_latencies[-1] if all_latencies else 0,
+        },
+        "bytes_written": folder_bytes(os.path.join("data", "logs")),
+        "write_syscalls": (
+            syscalls_after - syscalls_before
+            if syscalls_before is not None and syscalls_after is not None
+            else None
+        ),
+        "peak_rss_bytes": peak_rss(),
+    }
+
+
+def scenario_name(scenario: dict) -> str:
+    return " ".join(f"{field}={scenario[field]}" for field in SCENARIO_FIELDS)
+
+
+def run_child(scenario: dict, records: int, rollover: bool) -> dict:
+    with temp_log_dir(prefix="bench_suite_") as work_dir:
+        result_path = os.path.join(work_dir, "result.json")
+        # The yaml file handlers write to ./data/logs of the working directory
+        os.makedirs(os.path.join(work_dir, "data", "logs"))
+        env = {
+            **os.environ,
+            **PIPELINES[scenario["pipeline"]],
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [project_path, os.environ.get("PYTHONPATH")])
+            ),
+            "LOGGING_LEVEL": "ALL",
+            "LOGGING_CONFIG_SNAPSHOT": "False",
+        }
+        command = [
+            sys.executable,
+            "-m",
+            "tests.bench_suite",
+            "--child",
+            json.dumps(scenario),
+        ]
+        command += ["--records", str(records), "--result", result_path]
+        command += [] if rollover else ["--no-rollover"]
+        completed = subprocess.run(
+            command, cwd=work_dir, env=env, stderr=subprocess.PIPE
+        )
+        if completed.returncode != 0 or not os.path.exists(result_path):
+            raise Exception(
+                f"Benchmark '{scenario_name(scenario)}' failed:\n{completed.stderr.decode(errors='replace')}"
+            )
+        with open(result_path, "r") as f:
+            return json.load(f)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_header() -> None:
+    print(
+        f"{'scenario':<84} {'records/s':>11} {'p50 us':>8} {'p99 us':>8} {'p999 us':>8}"
+        f" {'MB':>7} {'syscalls':>9} {'RSS MB':>7}"
+    )
+
+
+def print_result(result: dict, baseline: dict[str, dict] | None = None) -> None:
+    latency = result["latency_ns"]
+    line = (
+        f"{result['name']:<84} {result['records_per_second']:>11,.0f} {latency['p50'] / 1000:>8.1f}"
+        f" {latency['p99'] / 1000:>8.1f} {latency['p999'] / 1000:>8.1f}"
+        f" {result['bytes_written'] / 1e6:>7.1f} {result['write_syscalls'] or 0:>9,}"
+        f" {(result['peak_rss_bytes'] or 0) / 1e6:>7.1f}"
+    )
+    previous = (baseline or {}).get(result["name"])
+    if previous is not None:
+        line += (
+            f"  ({result['records_per_second'] / previous['records_per_second']:.2f}x records/s,"
+            f" {latency['p99'] / max(1, previous['latency_ns']['p99']):.2f}x p99)"
+        )
+    print(line)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Read arguments from a command line."""
+    parser = argparse.ArgumentParser(description="Logging benchmark suite")
+    parser.add_argument(
+        "--records", type=int, default=20000, help="Records per scenario"
+    )
+    parser.add_argument(
+        "--logger", nargs="+", default=["main", "custom"], choices=["main", "custom"]
+    )
+    parser.add_argument(
+        "--colour",
+        nargs="+",
+        default=["level", "line", "none"],
+        choices=["level", "line", "none"],
+    )
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 4])
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[128], help="Message sizes (bytes)"
+    )
+    parser.add_argument(
+        "--mixes", nargs="+", default=["mixed"], choices=list(LEVEL_MIXES)
+    )
+    parser.add_argument(
+        "--pipelines", nargs="+", default=["default"], choices=list(PIPELINES)
+    )
+    parser.add_argument(
+        "--no-rollover", action="store_true", help="Do not force a rollover"
+    )
+    parser.add_argument(
+        "--output", type=str, help="Write the results to this JSON file"
+    )
+    parser.add_argument("--compare", type=str, help="JSON results of an earlier run")
+    parser.add_argument("--child", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--result", type=str, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if args.child:
+        scenario = json.loads(args.child)
+        scenario["colour"] = (
+            None if scenario["colour"] == "none" else scenario["colour"]
+        )
+        sys.stdout = sys.stderr = open(os.devnull, "w")  # Console handlers write here
+        try:
+            result = run_scenario(scenario, args.records, not args.no_rollover)
+        except Exception:
+            traceback.print_exc(file=sys.__stderr__)
+            raise SystemExit(1)
+        with open(args.result, "w") as f:
+            json.dump(result, f)
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = {result["name"]: result for result in json.load(f)["results"]}
+
+    print_header()
+    results = []
+    for values in itertools.product(
+        args.logger, args.colour, args.threads, args.sizes, args.mixes, args.pipelines
+    ):
+        scenario = dict(zip(SCENARIO_FIELDS, values))
+        result = {"name": scenario_name(scenario), "scenario": scenario}
+        result.update(run_child(scenario, args.records, not args.no_rollover))
+        results.append(result)
+        print_result(result, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "records": args.records,
+                    "rollover": not args.no_rollover,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
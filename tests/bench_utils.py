@@ -0,0 +1,101 @@
+"""
+Shared helpers for the benchmark scripts in tests/
+Run the benchmarks from the project root e.g. `python -m tests.bench_multi_level_handler`
+"""
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import contextlib
+
+import yaml
+
+file_path = os.path.dirname(os.path.realpath(__file__))
+LOGGING_YAML_PATH = os.path.join(
+    os.path.dirname(file_path), "config", "prefixed_logger_setting.yaml"
+)
+LEVEL_MIX = [logging.DEBUG] * 6 + [logging.INFO] * 3 + [logging.WARNING]
+
+
+def load_yaml_formats() -> dict:
+    """load_yaml_formats
+    Returns:
+        dict: Formatter name to format string from prefixed_logger_setting.yaml
+    """
+    with open(LOGGING_YAML_PATH, "r") as f:
+        yaml_config = yaml.safe_load(f)
+    return {
+        name: formatter["format"]
+        for name, formatter in yaml_config["formatters"].items()
+        if "format" in formatter
+    }
+
+
+@contextlib.contextmanager
+def temp_log_dir(prefix: str = "bench_logs_"):
+    """temp_log_dir
+    Temporary directory that is removed with its log files afterwards
+    """
+    path = tempfile.mkdtemp(prefix=prefix)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def isolated_logger(name: str, *handlers: logging.Handler) -> logging.Logger:
+    """isolated_logger
+    Logger with only the given handlers that does not propagate to the project loggers
+    """
+    bench_logger = logging.getLogger(name)
+    for handler in bench_logger.handlers[:]:
+        bench_logger.removeHandler(handler)
+    for handler in handlers:
+        bench_logger.addHandler(handler)
+    bench_logger.setLevel(logging.DEBUG)
+    bench_logger.propagate = False
+    return bench_logger
+
+
+def time_records(log_function, records: int, repeat: int = 3) -> float:
+    """time_records
+    Calls log_function(i) for every record, keeping the best of `repeat` runs
+
+    Returns:
+        float: Records per second
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(records):
+            log_function(i)
+        best = min(best, time.perf_counter() - start)
+    return records / best
+
+
+def write_syscalls() -> int | None:
+    """write_syscalls
+    Returns:
+        int | None: Write syscalls made by this process so far (Linux only)
+    """
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("syscw:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def folder_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def print_results(title: str, results: dict[str, float], unit: str = "records/s"):
+    print(f"\n{title}")
+    baseline = next(iter(results.values()))
+    for name, value in results.items():
+        print(f"  {name:<40} {value:>14,.0f} {unit}  ({value / baseline:.2f}x)")
@@ -0,0 +1,131 @@
+"""
+Check of reload_logging while other threads keep logging.
+The logging yaml and .env are changed several times (new handler options, formatter, queue, multi level files,
+logging level) and every record must end up exactly once in the log files.
+The yaml / .env are restored afterwards, the console output is discarded.
+python -m tests.config_reload_check --threads 4 --records 5000
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import shutil
+import argparse
+import threading
+from collections import Counter
+
+project_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+YAML_PATH = os.path.join(project_path, "config", "prefixed_logger_setting.yaml")
+DOT_ENV_PATH = os.path.join(project_path, ".env")
+LOGS_PATH = os.path.join(project_path, "data", "logs")
+
+# (description, yaml replacements, .env content or None to keep it)
+RELOAD_STEPS = [
+    ("buffered debug file", [("buffer_size: 0 ", "buffer_size: 65536 ")], None),
+    ("detailed info format", [("formatter: simple", "formatter: detailed")], None),
+    (
+        "queue",  # Large enough that no record is dropped
+        [("queue: False", "queue: True"), ("queue_maxsize: 10000", "queue_maxsize: 0")],
+        None,
+    ),
+    (
+        "multi level files",
+        [("multi_level_files: False", "multi_level_files: True")],
+        None,
+    ),
+    ("logging level PROD", [], 'LOGGING_LEVEL = "PROD"\n'),
+    ("original config", [], None),
+]
+
+
+def write_step(original_yaml: str, original_env: str | None, step: tuple) -> None:
+    _, replacements, env_content = step
+    yaml_content = original_yaml
+    for old, new in replacements:
+        yaml_content = yaml_content.replace(old, new)
+    with open(YAML_PATH, "w") as f:
+        f.write(yaml_content)
+    env_content = env_content if env_content is not None else original_env
+    if env_content is None:
+        if os.path.exists(DOT_ENV_PATH):
+            os.remove(DOT_ENV_PATH)
+    else:
+        with open(DOT_ENV_PATH, "w") as f:
+            f.write(env_content)
+
+
+def count_records(pattern: str, message: str) -> Counter:
+    counts = Counter()
+    for path in glob.glob(os.path.join(LOGS_PATH, pattern)):
+        with open(path, "r", encoding="utf8") as f:
+            counts.update(re.findall(message, f.read()))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging config reload check")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--records", type=int, default=5000)
+    args = parser.parse_args()
+
+    shutil.rmtree(LOGS_PATH, ignore_errors=True)
+    with open(YAML_PATH, "r") as f:
+        original_yaml = f.read()
+    original_env = None
+    if os.path.exists(DOT_ENV_PATH):
+        with open(DOT_ENV_PATH, "r") as f:
+            original_env = f.read()
+
+    console = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = open(os.devnull, "w")  # Console handlers write here
+    try:
+        from config.settings import getCustomLogger, logger, reload_logging
+        from config.settings import shutdown_logging
+
+        check_logger = getCustomLogger("reloadCheck", colour_logging_level=None)
+
+        def log_records(thread_id: int) -> None:
+            for i in range(args.records):
+                check_logger.critical(f"check t{thread_id} r{i} end")
+                logger.critical(f"main t{thread_id} r{i} end")
+                if i % 500 == 0:
+                    time.sleep(0.01)
+
+        threads = [
+            threading.Thread(target=log_records, args=(thread_id,))
+            for thread_id in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for step in RELOAD_STEPS:
+            write_step(original_yaml, original_env, step)
+            changes = reload_logging()
+            print(f"{step[0]}: {', '.join(changes) or 'no change'}", file=console[0])
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+        shutdown_logging()
+    finally:
+        write_step(original_yaml, original_env, ("restore", [], None))
+        sys.stdout, sys.stderr = console
+
+    expected = args.threads * args.records
+    failures = 0
+    for name, pattern, message in [
+        ("custom logger", "*.reloadCheck_critical.log", r"check t\d+ r\d+ end"),
+        ("main logger", "*.critical.log", r"main t\d+ r\d+ end"),
+    ]:
+        counts = count_records(pattern, message)
+        duplicated = sum(1 for count in counts.values() if count > 1)
+        ok = len(counts) == expected and not duplicated
+        failures += not ok
+        print(
+            f"{name}: expected {expected} records, unique {len(counts)}, duplicated {duplicated} -> {'OK' if ok else 'FAILED'}"
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,325 @@
+"""
+Synthetic log corpus in the files / formats of PrefixedTimedRotatingFileHandler, for retention, search and load tests.
+Each logger gets the five '<yyyy-mm-dd>.<name>_<level>.log' files per day ('<yyyy-mm-dd>.<level>.log' for the main logger),
+a record is written to every level file up to its level with the formatter of that handler in the logging yaml.
+Days are generated in parallel processes, each file is written in large chunks.
+python -m tests.generate_fake_logs --days 35 --loggers main customLogger --records-per-day 2000
+python -m tests.generate_fake_logs --days 31 --loggers main api worker db --size 2GB --output /tmp/corpus
+"""
+
 import os
-from datetime import datetime, timedelta
+import re
+import random
+import argparse
+import tempfile
+import concurrent.futures
+from datetime import date, datetime, timedelta
+
+import yaml
+
+file_path = os.path.dirname(os.path.realpath(__file__))
+LOGGING_YAML_PATH = os.path.join(
+    os.path.dirname(file_path), "config", "prefixed_logger_setting.yaml"
+)
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+LEVEL_WEIGHTS = [60, 30, 7, 2.5, 0.5]  # Percent of the records of each level
+MAIN_LOGGER = "main"
+CHUNK_SIZE = 4 * 1024 * 1024  # (Bytes) Buffered per file before it is written
+SIZE_UNITS = {"": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+
+SOURCES = [  # (module, funcName)
+    ("api", "handle_request"),
+    ("api", "authenticate"),
+    ("worker", "process_item"),
+    ("worker", "run"),
+    ("db", "query"),
+    ("db", "connect"),
+    ("cache", "get"),
+    ("scheduler", "tick"),
+]
+MESSAGES = {
+    "DEBUG": [
+        "Cache lookup key=%s hit=%s",
+        "Processing item %s of batch %s",
+        "Query took %s ms rows=%s",
+    ],
+    "INFO": [
+        "Request %s completed status=%s",
+        "Job %s finished in %s s",
+        "Connected to %s:%s",
+    ],
+    "WARNING": [
+        "Slow response from %s took %s ms",
+        "Retrying %s attempt %s",
+    ],
+    "ERROR": [
+        "Failed to process item %s: %s",
+        "Connection to %s refused attempt %s",
+    ],
+    "CRITICAL": ["Service %s unavailable for %s s"],
+}
+TRACEBACK = (
+    "\nTraceback (most recent call last):\n"
+    '  File "/app/{module}.py", line {line}, in {func}\n'
+    "    result = client.call(payload)\n"
+    "ConnectionError: connection reset by peer"
+)
+
+
+def parse_size(size: str) -> int:
+    """parse_size
+    "2GB" / "500 MB" / "1048576" -> bytes
+    """
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?B?)\s*", size.upper())
+    if match is None:
+        raise Exception(f"Invalid size '{size}', e.g. 500MB / 2GB")
+    unit = match.group(2) if match.group(2) != "B" else ""
+    return int(float(match.group(1)) * SIZE_UNITS[unit])
+
+
+def load_level_formats(yaml_path: str = LOGGING_YAML_PATH) -> dict[str, str]:
+    """load_level_formats
+    Returns:
+        dict[str, str]: Level to the format string of its '<level>_file_handler' in the logging yaml
+    """
+    with open(yaml_path, "r") as f:
+        yaml_config = yaml.safe_load(f)
+    formats = {}
+    for level in LEVELS:
+        handler = yaml_config["handlers"][f"{level.lower()}_file_handler"]
+        formats[level] = yaml_config["formatters"][handler["formatter"]]["format"]
+    return formats
+
+
+def logger_formats(formats: dict[str, str], logger_name: str) -> dict[str, str]:
+    """logger_formats
+    Formats of a custom logger, getCustomLogger adds '[<logger name>]' after the time
+    """
+    if logger_name == MAIN_LOGGER:
+        return formats
+    return {
+        level: fmt.replace(" | ", f" | [{logger_name}]", 1) if " | " in fmt else fmt
+        for level, fmt in formats.items()
+    }
+
+
+def log_file_name(day: date, logger_name: str, level: str) -> str:
+    if logger_name == MAIN_LOGGER:
+        return f"{day:%Y-%m-%d}.{level.lower()}.log"
+    return f"{day:%Y-%m-%d}.{logger_name}_{level.lower()}.log"
+
+
+def record_times(
+    rng: random.Random, records: int, bursts: int, burst_fraction: float
+) -> list[tuple[int, bool]]:
+    """record_times
+    Sorted (millisecond of the day, part of a burst) of the records, bursts are short windows
+    (a hot loop / incident) holding burst_fraction of the records of the day
+
+    Returns:
+        list[tuple[int, bool]]: One entry per record
+    """
+    burst_records = int(records * burst_fraction) if bursts else 0
+    times = [(rng.randrange(86_400_000), False) for _ in range(records - burst_records)]
+    for burst in range(bursts):
+        start = rng.randrange(86_400_000 - 10_000)
+        length = rng.randrange(500, 10_000)  # (Milliseconds)
+        count = burst_records // bursts + (burst < burst_records % bursts)
+        times.extend((start + rng.randrange(length), True) for _ in range(count))
+    times.sort()
+    return times
+
+
+def generate_day(
+    output: str,
+    day: date,
+    logger_name: str,
+    records: int,
+    seed: int,
+    bursts: int = 3,
+    burst_fraction: float = 0.2,
+    traceback_fraction: float = 0.3,
+    formats: dict[str, str] | None = None,
+) -> tuple[int, int]:
+    """generate_day
+    Writes the five level files of one logger for one day
+
+    Args:
+        output (str): Log directory
+        day (date): Date of the files
+        logger_name (str): Logger name, MAIN_LOGGER for the '<date>.<level>.log' files
+        records (int): Records of the day
+        seed (int): Seed of the corpus, the day / logger get their own random sequence from it
+        bursts (int, optional): Bursts of one repeated message. Defaults to 3.
+        burst_fraction (float, optional): Part of the records in the bursts. Defaults to 0.2.
+        traceback_fraction (float, optional): Part of the ERROR / CRITICAL records with a traceback. Defaults to 0.3.
+        formats (dict[str, str] | None, optional): Level to format string. Defaults to the logging yaml formats.
+
+    Returns:
+        tuple[int, int]: Records and bytes written
+    """
+    rng = random.Random(f"{seed}-{day}-{logger_name}")
+    formats = logger_formats(formats or load_level_formats(), logger_name)
+    paths = {
+        level: os.path.join(output, log_file_name(day, logger_name, level))
+        for level in LEVELS
+    }
+    files = {level: open(path, "w", encoding="utf8") for level, path in paths.items()}
+    buffers = {level: [] for level in LEVELS}
+    buffered = dict.fromkeys(LEVELS, 0)
+    burst_record = None
+    written = 0
+    try:
+        for millisecond, in_burst in record_times(rng, records, bursts, burst_fraction):
+            if in_burst and burst_record is not None and rng.random() < 0.95:
+                level, module, func, message = burst_record  # Same message repeated
+            else:
+                level = rng.choices(LEVELS, weights=LEVEL_WEIGHTS)[0]
+                module, func = rng.choice(SOURCES)
+                template = rng.choice(MESSAGES[level])
+                message = template % tuple(
+                    rng.randrange(100_000) for _ in range(template.count("%s"))
+                )
+                if level in ("ERROR", "CRITICAL") and rng.random() < traceback_fraction:
+                    message += TRACEBACK.format(
+                        module=module, func=func, line=rng.randrange(10, 500)
+                    )
+                if in_burst:
+                    burst_record = (level, module, func, message)
+            seconds, milliseconds = divmod(millisecond, 1000)
+            minutes, seconds = divmod(seconds, 60)
+            hours, minutes = divmod(minutes, 60)
+            fields = {
+                "asctime": f"{day:%Y-%m-%d} {hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}",
+                "levelname": level,
+                "name": logger_name,
+                "module": module,
+                "funcName": func,
+                "filename": f"{module}.py",
+                "lineno": 42,
+                "message": message,
+            }
+            for file_level in LEVELS[: LEVELS.index(level) + 1]:
+                line = formats[file_level] % fields + "\n"
+                buffers[file_level].append(line)
+                buffered[file_level] += len(line)
+                if buffered[file_level] >= CHUNK_SIZE:
+                    written += files[file_level].write("".join(buffers[file_level]))
+                    buffers[file_level], buffered[file_level] = [], 0
+        for level in LEVELS:
+            written += files[level].write("".join(buffers[level]))
+    finally:
+        for f in files.values():
+            f.close()
+
+    end_of_day = datetime.combine(day, datetime.max.time()).timestamp()
+    for path in paths.values():
+        os.utime(
+            path, (end_of_day, end_of_day)
+        )  # Modified on the day, like the real files
+    return records, written
+
+
+def estimate_record_bytes(loggers: list[str], formats: dict[str, str]) -> float:
+    """estimate_record_bytes
+    Average bytes written per record (over all its level files) from a small sample day
+    """
+    total_records = total_bytes = 0
+    with tempfile.TemporaryDirectory(prefix="fake_logs_sample_") as sample_dir:
+        for logger_name in loggers:
+            records, written = generate_day(
+                sample_dir, date(2000, 1, 1), logger_name, 2000, 0, formats=formats
+            )
+            total_records += records
+            total_bytes += written
+    return total_bytes / total_records
 
-# Define the base path for the logs
-base_path = "data/logs"
 
-# Create logs directory if it doesn't exist
-os.makedirs(base_path, exist_ok=True)
+def parse_arguments() -> argparse.Namespace:
+    """Read arguments from a command line."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic log corpus")
+    parser.add_argument("--output", type=str, default="data/logs", help="Log directory")
+    parser.add_argument("--days", type=int, default=35, help="Days up to --end-date")
+    parser.add_argument(
+        "--end-date", type=str, default=None, help="Last day YYYY-MM-DD (default today)"
+    )
+    parser.add_argument(
+        "--loggers",
+        nargs="+",
+        default=[MAIN_LOGGER, "customLogger"],
+        help=f"Logger names, '{MAIN_LOGGER}' writes the '<date>.<level>.log' files",
+    )
+    parser.add_argument(
+        "--records-per-day", type=int, default=2000, help="Records per day and logger"
+    )
+    parser.add_argument(
+        "--size",
+        type=str,
+        default=None,
+        help="Total size e.g. 2GB, overrides --records-per-day",
+    )
+    parser.add_argument(
+        "--bursts", type=int, default=3, help="Bursts per day and logger"
+    )
+    parser.add_argument(
+        "--burst-fraction",
+        type=float,
+        default=0.2,
+        help="Part of the records in bursts",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processes (default cpu count)"
+    )
+    return parser.parse_args()
 
-# Generate logs for the past 35 days
-for i in range(35):
-    log_date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
 
-    print(log_date)
-    # Define log file names
-    custom_logger_file = os.path.join(base_path, f"{log_date}.customLogger_debug.log")
-    debug_file = os.path.join(base_path, f"{log_date}.debug.log")
+def main():
+    args = parse_arguments()
+    os.makedirs(args.output, exist_ok=True)
+    formats = load_level_formats()
+    end_date = date.fromisoformat(args.end_date) if args.end_date else date.today()
+    days = [end_date - timedelta(days=i) for i in range(args.days)]
+    records_per_day = args.records_per_day
+    if args.size:
+        record_bytes = estimate_record_bytes(args.loggers, formats)
+        records_per_day = max(
+            1, int(parse_size(args.size) / record_bytes / len(days) / len(args.loggers))
+        )
+    print(
+        f"Generating {len(days)} days x {len(args.loggers)} loggers x {records_per_day:,} records "
+        f"into {args.output}"
+    )
 
-    with open(custom_logger_file, "a") as custom_log:
-        custom_log.write(f"{log_date} - CUSTOM_LOGGER - Debug message for {log_date}\n")
+    started = datetime.now()
+    total_records = total_bytes = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        tasks = [
+            executor.submit(
+                generate_day,
+                args.output,
+                day,
+                logger_name,
+                records_per_day,
+                args.seed,
+                args.bursts,
+                args.burst_fraction,
+                0.3,
+                formats,
+            )
+            for day in days
+            for logger_name in args.loggers
+        ]
+        for task in concurrent.futures.as_completed(tasks):
+            records, written = task.result()
+            total_records += records
+            total_bytes += written
+    elapsed = (datetime.now() - started).total_seconds()
+    print(
+        f"Wrote {total_records:,} records, {len(tasks) * len(LEVELS)} files, "
+        f"{total_bytes / 1024**2:,.1f} MB in {elapsed:.1f}s ({total_bytes / 1024**2 / elapsed:,.1f} MB/s)"
+    )
 
-    with open(debug_file, "a") as debug_log:
-        debug_log.write(f"{log_date} - DEBUG - Debug message for {log_date}\n")
 
-print("Log files created successfully.")
+if __name__ == "__main__":
+    main()
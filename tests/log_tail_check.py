@@ -0,0 +1,132 @@
+"""
+Check of custom_utils.log_tail: records written to the five level files of a logger (detailed / simple formats,
+tracebacks, a NUL padded file like MmapPrefixedTimedRotatingFileHandler and a rollover to the next '<date>.' prefix)
+must be followed once each, in time order.
+python -m tests.log_tail_check --records 5000
+"""
+
+import os
+import re
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta
+
+from custom_utils.log_search import LEVEL_FILES
+from custom_utils.log_tail import LogFollower
+from tests.bench_utils import temp_log_dir
+
+DETAILED_LEVELS = {"debug", "critical"}  # Files using the 'detailed' format in the yaml
+PADDED_CHUNK = 1024 * 1024
+
+
+class LevelFiles:
+    """LevelFiles
+    The five level files of the 'check' logger for one date, the debug file is written in place over NUL padding
+    """
+
+    def __init__(self, log_dir: str, date: str):
+        self.files = {}
+        for level in LEVEL_FILES:
+            path = os.path.join(log_dir, f"{date}.check_{level}.log")
+            self.files[level] = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+        os.ftruncate(self.files["debug"], PADDED_CHUNK)
+        self.debug_position = 0
+
+    def write(self, level: str, data: bytes) -> None:
+        if level == "debug":
+            os.pwrite(self.files[level], data, self.debug_position)
+            self.debug_position += len(data)
+        else:
+            os.write(self.files[level], data)
+
+    def close(self) -> None:
+        os.ftruncate(self.files["debug"], self.debug_position)
+        for fd in self.files.values():
+            os.close(fd)
+
+
+def write_records(log_dir: str, records: int) -> None:
+    start = datetime(2024, 1, 1, 23, 0, 0)
+    rollover = datetime(2024, 1, 2)
+    files = None
+    for i in range(records):
+        created = start + timedelta(seconds=i * 7200 / records)
+        if files is None or (
+            created >= rollover and files.date < f"{rollover:%Y-%m-%d}"
+        ):
+            if files is not None:
+                files.close()
+            files = LevelFiles(log_dir, f"{created:%Y-%m-%d}")
+            files.date = f"{created:%Y-%m-%d}"
+        level = LEVEL_FILES[i % len(LEVEL_FILES)]
+        timestamp = f"{created:%Y-%m-%d %H:%M:%S},{created.microsecond // 1000:03d}"
+        message = f"record {i}\n"
+        if level in ("error", "critical") and i % 7 == 0:
+            message += 'Traceback (most recent call last):\n  File "check.py"\nValueError: check\n'
+        for file_level in LEVEL_FILES[: LEVEL_FILES.index(level) + 1]:
+            source = (
+                "check - write_records" if file_level in DETAILED_LEVELS else "check.py"
+            )
+            files.write(
+                file_level,
+                f"{timestamp} | [check][{level.upper():>8}][{source}] | {message}".encode(
+                    "utf8"
+                ),
+            )
+        if i % 200 == 0:
+            time.sleep(0.01)
+    files.close()
+
+
+def run(records: int, level: str | None) -> bool:
+    with temp_log_dir() as log_dir:
+        follower = LogFollower(
+            log_dir,
+            logger_name="check",
+            level=level,
+            history=0,
+            merge_delay=0.2,
+            rescan_interval=0.1,
+            max_poll_interval=0.1,
+        )
+        followed = []
+
+        def follow():
+            for batch in follower.follow():
+                followed.extend(batch)
+
+        thread = threading.Thread(target=follow)
+        thread.start()
+        time.sleep(0.2)  # Started before the files exist, like following a new day
+        write_records(log_dir, records)
+        time.sleep(1)
+        follower.stop()
+        thread.join()
+        follower.close()
+
+    min_index = LEVEL_FILES.index(level.lower()) if level else 0
+    expected = [i for i in range(records) if i % len(LEVEL_FILES) >= min_index]
+    numbers = [int(re.search(rb"record (\d+)", record).group(1)) for record in followed]
+    tracebacks = sum(record.count(b"ValueError: check") for record in followed)
+    expected_tracebacks = sum(
+        1 for i in expected if i % len(LEVEL_FILES) >= 3 and i % 7 == 0
+    )
+    ok = numbers == expected and tracebacks == expected_tracebacks
+    if not ok:
+        print(f"missing {sorted(set(expected) - set(numbers))[:10]}")
+    print(
+        f"level {level or 'DEBUG'}: expected {len(expected)} records, followed {len(numbers)}, "
+        f"unique {len(set(numbers))}, in order {numbers == sorted(numbers)}, "
+        f"tracebacks {tracebacks}/{expected_tracebacks} -> {'OK' if ok else 'FAILED'}"
+    )
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log tail check")
+    parser.add_argument("--records", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = [run(args.records, None), run(args.records, "ERROR")]
+    raise SystemExit(0 if all(results) else 1)
@@ -0,0 +1,84 @@
+"""
+Crash consistency check of MmapPrefixedTimedRotatingFileHandler.
+A child process logs through the memory mapped writer and is killed without closing the file
+(optionally in the middle of a record), the file must be trimmed to its complete records when it is opened again.
+python -m tests.mmap_recovery_check --records 10000
+"""
+
+import os
+import sys
+import glob
+import argparse
+import logging
+import subprocess
+
+from config.logging_utils import MmapPrefixedTimedRotatingFileHandler
+from tests.bench_utils import isolated_logger, temp_log_dir
+
+
+def open_handler(log_dir: str) -> MmapPrefixedTimedRotatingFileHandler:
+    handler = MmapPrefixedTimedRotatingFileHandler(
+        filename=os.path.join(log_dir, "check_debug.log"),
+        when="midnight",
+        backupCount=31,
+        encoding="utf8",
+        level="DEBUG",
+        mmap_chunk_size=65536,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def run_child(log_dir: str, records: int, torn: bool) -> None:
+    handler = open_handler(log_dir)
+    child_logger = isolated_logger("mmap_check", handler)
+    for i in range(records):
+        child_logger.info(f"record {i}")
+    if torn:  # Part of a record copied into the mapping before the crash
+        handler.stream.write("record torn without its termin")
+    os._exit(0)  # No close, the preallocated chunk is left in the file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory mapped writer recovery check")
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--log-dir", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--torn", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.log_dir:
+        run_child(args.log_dir, args.records, args.torn)
+        return
+
+    failures = 0
+    for torn in [False, True]:
+        with temp_log_dir() as log_dir:
+            child_args = ["--log-dir", log_dir, "--records", str(args.records)]
+            if torn:
+                child_args.append("--torn")
+            subprocess.run(
+                [sys.executable, "-m", "tests.mmap_recovery_check", *child_args],
+                check=True,
+            )
+            (log_path,) = glob.glob(os.path.join(log_dir, "*.log"))
+            crashed_size = os.path.getsize(log_path)
+
+            handler = open_handler(log_dir)  # Recovers the file
+            handler.close()
+            with open(log_path, "rb") as f:
+                lines = f.read().split(b"\n")
+            complete = lines[:-1] == [
+                f"record {i}".encode() for i in range(args.records)
+            ]
+            ok = complete and lines[-1] == b""
+            failures += not ok
+            print(
+                f"{'torn record' if torn else 'no close'}: {crashed_size:,} bytes after the crash, "
+                f"{os.path.getsize(log_path):,} after recovery, "
+                f"{len(lines) - 1:,} records -> {'OK' if ok else 'FAILED'}"
+            )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
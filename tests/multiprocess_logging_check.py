@@ -0,0 +1,88 @@
+"""
+Local check of the multi-process logging mode, no external service needed.
+Workers start before the log writer (their records are buffered locally), the writer is started
+afterwards and every record must end up exactly once in the writer's log files.
+python -m tests.multiprocess_logging_check --workers 4 --records 500
+"""
+
+import os
+import sys
+import glob
+import time
+import socket
+import argparse
+import subprocess
+
+
+def free_local_address() -> str:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return f"localhost:{s.getsockname()[1]}"
+
+
+def run_worker(logger_name: str, records: int) -> None:
+    from config.settings import getCustomLogger
+
+    worker_logger = getCustomLogger(logger_name, colour_logging_level=None)
+    for i in range(records):
+        worker_logger.info(f"worker {os.getpid()} record {i}")
+        if i == records // 2:
+            time.sleep(2)  # The writer comes up while the worker is running
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process logging check")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--worker-name", type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--keep", action="store_true", help="Keep the log files")
+    args = parser.parse_args()
+
+    if args.worker_name:
+        run_worker(args.worker_name, args.records)
+        return
+
+    logger_name = f"mpCheck{os.getpid()}"
+    env = {
+        **os.environ,
+        "LOGGING_MULTIPROCESS_ADDRESS": free_local_address(),
+        "LOGGING_QUEUE": "False",
+    }
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "tests.multiprocess_logging_check"]
+            + ["--worker-name", logger_name, "--records", str(args.records)],
+            env={**env, "LOGGING_MULTIPROCESS": "worker"},
+            stdout=subprocess.DEVNULL,
+        )
+        for _ in range(args.workers)
+    ]
+    time.sleep(1)
+    writer = subprocess.Popen(
+        [sys.executable, "-m", "config.log_writer"],
+        env={**env, "LOGGING_MULTIPROCESS": "writer"},
+        stdout=subprocess.DEVNULL,
+    )
+    for worker in workers:
+        worker.wait()
+    writer.terminate()
+    writer.wait()
+
+    log_files = glob.glob(os.path.join("data", "logs", f"*.{logger_name}_info.log"))
+    lines = set()
+    total = 0
+    for log_file in log_files:
+        with open(log_file, "r") as f:
+            for line in f:
+                total += 1
+                lines.add(line.split(" | ", 2)[-1])
+    expected = args.workers * args.records
+    print(f"Expected {expected} records, written {total}, unique {len(lines)}")
+    if not args.keep:
+        for log_file in glob.glob(os.path.join("data", "logs", f"*.{logger_name}_*")):
+            os.remove(log_file)
+    sys.exit(0 if total == len(lines) == expected else 1)
+
+
+if __name__ == "__main__":
+    main()